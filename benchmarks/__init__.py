@@ -0,0 +1 @@
+"""Micro-benchmarks for the board and the ai"""
@@ -0,0 +1,64 @@
+"""Compares the throughput of get_best_moves against calling
+get_best_move in a loop, on a batch of positions taken from random games
+the way many waiting games would look at once.
+
+Run with: python -m benchmarks.batch_moves
+"""
+
+import random
+import time
+
+from src.ai import get_best_move, get_best_moves
+from src.board import Board, GAME_STATE
+
+BATCH_SIZE = 2000
+
+
+def random_positions(count: int, seed: int = 0) -> list:
+    """Plays random games and packs a position still being played from each"""
+    rng = random.Random(seed)
+    positions = []
+
+    while len(positions) < count:
+        board = Board()
+        for _ in range(rng.randint(0, 7)):
+            if board.state == GAME_STATE.GAME_OVER:
+                break
+            board.play(*rng.choice(board.available_positions()))
+
+        if board.state == GAME_STATE.PLAYING:
+            positions.append(board.pack())
+
+    return positions
+
+
+def positions_per_second(function, positions: list) -> float:
+    """Times function over the positions and returns the positions per second"""
+    start = time.perf_counter()
+    function(positions)
+    return len(positions) / (time.perf_counter() - start)
+
+
+def run():
+    """Prints the loop and batch throughput for both difficulties"""
+    positions = random_positions(BATCH_SIZE)
+    print(f"{len(positions)} positions, {len(set(positions))} distinct")
+    print(f"{'difficulty':<10} {'loop':>14} {'batch':>14} {'speedup':>8}")
+
+    for is_hard in (False, True):
+        loop = positions_per_second(
+            lambda batch: [
+                get_best_move(Board.from_packed(packed), is_hard) for packed in batch
+            ],
+            positions,
+        )
+        batch = positions_per_second(
+            lambda batch: get_best_moves(batch, is_hard), positions
+        )
+
+        name = "hard" if is_hard else "easy"
+        print(f"{name:<10} {loop:>12,.0f}/s {batch:>12,.0f}/s {batch / loop:>7.2f}x")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,243 @@
+"""Measures how many play + undo pairs the board can do per second.
+
+- "list board": the original board, a list of lists of strings that ran
+  the full check_state scan after every play and undo, copied here as
+  ListBoard since src.board no longer has it
+- "bitboard rescan": the current board with the full check_state scan
+  run after every play and undo, which is what the bitboard cost before
+  the win/draw state was tracked incrementally
+- "incremental": the current play/undo
+
+Each is measured on boards with a different number of pieces already on
+them, to show the cost no longer depends on the board contents.
+
+Run with: python -m benchmarks.board_play_undo
+"""
+
+import time
+
+from src.board import GAME_STATE, Board
+from src.utils import (
+    InvalidPositionError,
+    PlayingAfterGameOverError,
+    PositionAlreadyPlayedOnError,
+)
+
+# moves played before measuring, chosen so nobody has won yet
+PREFIXES = {
+    "empty": [],
+    "4 pieces": [(1, 1), (0, 0), (2, 0), (0, 2)],
+    "7 pieces": [(1, 1), (0, 0), (2, 0), (0, 2), (0, 1), (2, 1), (1, 2)],
+}
+
+
+class ListBoard:
+    """The Board of src.board as it was before the bitboards, copied as it
+    shipped: a list of rows of "x", "o" and " ", searched in full for a
+    winner after every play and undo"""
+
+    def __init__(self):
+        self.__board = [[" " for _ in range(3)] for _ in range(3)]
+        self.__played_move = []
+        self.turn = "x"
+        self.depth = 0
+
+        self.state = GAME_STATE.PLAYING
+        self.winner = None
+
+    def get_position(self, file: int, rank: int):
+        """Get a specified position on the board
+
+        Args:
+            file (int): the file to get it from
+            rank (int): the rank to get it from
+
+        Raises:
+            InvalidPositionError: It is raised when the position is invalid
+
+        Returns:
+            _type_: object which contains the position info
+        """
+        try:
+            return self.__board[rank][file]
+        except IndexError as error:
+            raise InvalidPositionError((file, rank)) from error
+
+    def play(self, file: int, rank: int):
+        """Plays a move on the board
+        and then changes the current_player
+
+        Args:
+            file (int): the file to play the move on
+            rank (int): the rank to play the move on
+
+        Raises:
+            InvalidPositionError: It is raised when the position is invalid
+        """
+        if self.state == GAME_STATE.GAME_OVER:
+            raise PlayingAfterGameOverError()
+
+        if self.__board[rank][file] != " ":
+            raise PositionAlreadyPlayedOnError((file, rank))
+        try:
+            self.__board[rank][file] = self.turn
+            self.__played_move.append((file, rank))
+            self.check_state()
+            self.turn = "o" if self.turn == "x" else "x"
+            self.depth += 1
+        except IndexError as error:
+            raise InvalidPositionError((file, rank)) from error
+
+    def undo(self):
+        """Undos the last played move and resets the current_player"""
+        if len(self.__played_move) == 0:
+            raise Exception("you cant undo at the beginning of the game")
+
+        last_move = self.__played_move.pop(-1)
+        self.__board[last_move[1]][last_move[0]] = " "
+        self.depth -= 1
+
+        self.state = GAME_STATE.PLAYING
+        self.winner = None
+        self.check_state()
+
+        self.turn = "o" if self.turn == "x" else "x"
+
+    @property
+    def last_move(self):
+        """gets the last move of the board"""
+        if len(self.__played_move) == 0:
+            return None
+        return self.__played_move[-1]
+
+    def available_positions(self) -> list:
+        """Returns a list of all available_positions on the board"""
+        _available_positions = []
+
+        for file in range(3):
+            for rank in range(3):
+                if self.get_position(file, rank) == " ":
+                    _available_positions.append((file, rank))
+
+        return _available_positions
+
+    def check_state(self):
+        """Checks wheter any side has won or its a draw"""
+
+        # check the rows
+        for columns in range(3):
+            winner_present = (
+                self.__board[0][columns]
+                == self.__board[1][columns]
+                == self.__board[2][columns]
+                != " "
+            )
+            if winner_present:
+                self.winner = self.__board[0][columns]
+                self.state = GAME_STATE.GAME_OVER
+                return
+
+        # check the columns
+        for columns in range(3):
+            winner_present = (
+                self.__board[columns][0]
+                == self.__board[columns][1]
+                == self.__board[columns][2]
+                != " "
+            )
+            if winner_present:
+                self.winner = self.__board[columns][0]
+                self.state = GAME_STATE.GAME_OVER
+                return
+
+        # check diagonals
+        winner_present = (
+            self.__board[0][0] == self.__board[1][1] == self.__board[2][2] != " "
+        )
+        if winner_present:
+            self.winner = self.__board[1][1]
+            self.state = GAME_STATE.GAME_OVER
+            return
+
+        winner_present = (
+            self.__board[2][0] == self.__board[1][1] == self.__board[0][2] != " "
+        )
+        if winner_present:
+            self.winner = self.__board[1][1]
+            self.state = GAME_STATE.GAME_OVER
+            return
+
+        if len(self.available_positions()) == 0:
+            self.state = GAME_STATE.GAME_OVER
+
+    def reset_board(self):
+        """Resets the board to its initial state"""
+        self.__board = [[" " for _ in range(3)] for _ in range(3)]
+        self.__played_move = []
+        self.turn = "x"
+
+        self.state = GAME_STATE.PLAYING
+        self.winner = None
+
+    def get_board(self):
+        """Return the board"""
+
+        return self.__board
+
+
+def pairs_per_second(board, rescan: bool, duration: float = 0.5) -> float:
+    """Plays and undos every available move on the board for a while
+
+    Args:
+        board (Board | ListBoard): the board to play on
+        rescan (bool): whether to also run the full check_state after
+            every play and undo
+        duration (float, optional): how long to measure for. Defaults to 0.5.
+
+    Returns:
+        float: the number of play + undo pairs per second
+    """
+    moves = board.available_positions()
+    pairs = 0
+    start = time.perf_counter()
+    deadline = start + duration
+
+    while time.perf_counter() < deadline:
+        for move in moves:
+            board.play(*move)
+            if rescan:
+                board.check_state()
+            board.undo()
+            if rescan:
+                board.check_state()
+        pairs += len(moves)
+
+    return pairs / (time.perf_counter() - start)
+
+
+def run():
+    """Prints the play + undo throughput for every prefix"""
+    print(
+        f"{'position':<10} {'list board':>14} {'bitboard rescan':>16}"
+        f" {'incremental':>14} {'speedup':>8}"
+    )
+
+    for name, prefix in PREFIXES.items():
+        list_board = ListBoard()
+        board = Board()
+        for move in prefix:
+            list_board.play(*move)
+            board.play(*move)
+
+        # ListBoard runs the full scan itself, like the original board did
+        original = pairs_per_second(list_board, rescan=False)
+        rescan = pairs_per_second(board, rescan=True)
+        incremental = pairs_per_second(board, rescan=False)
+        print(
+            f"{name:<10} {original:>12,.0f}/s {rescan:>14,.0f}/s"
+            f" {incremental:>12,.0f}/s {incremental / original:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,293 @@
+"""Load tests bot.py without discord. Fake channels, messages, contexts
+and interactions stand in for the gateway and the REST api, and a fake
+rate limiter holds REST calls to discord's per channel limits.
+
+Thousands of simulated players start a game with the tictactoe command,
+answer its questions through get_input, click squares through
+on_interaction until the game ends, then say no to another game so
+end_game runs. It reports the moves played a second, how long a click
+takes to show on the board and the computer to reply, and how late the
+event loop wakes up.
+
+Run with: python -m benchmarks.discord_load [players]
+"""
+
+import asyncio
+import os
+import random
+import re
+import statistics
+import sys
+import time
+from itertools import count
+
+os.environ.setdefault("APPLICATION_ID", "0")
+os.environ.setdefault("SESSIONS_PATH", ":memory:")
+
+import bot
+from src.edit_scheduler import TokenBucket
+
+PLAYERS = 1000
+PLAYERS_PER_CHANNEL = 1
+
+# discord allows about 5 messages sent or edited every 5 seconds a channel
+ROUTE_RATE = 1.0
+ROUTE_BURST = 5
+
+# how long a REST call takes to come back, in seconds
+REST_LATENCY = 0.02
+
+TICK = 0.01
+
+STATE = re.compile(r"^State: (.*)$", re.MULTILINE)
+GAME_OVER_STATES = ("You Won!!", "Its a Draw!!", "Computer Won!!")
+
+
+def percentile(values: list, fraction: float) -> float:
+    """Gets the value below which the fraction of values fall"""
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+class FakeRateLimiter:
+    """Makes every REST call wait for its route's rate limit and for the
+    round trip, counting the calls that would have been told to retry"""
+
+    def __init__(self):
+        self.buckets = {}
+        self.calls = 0
+        self.rate_limited = 0
+
+    async def request(self, route: tuple):
+        self.calls += 1
+        bucket = self.buckets.get(route)
+        if bucket is None:
+            bucket = self.buckets[route] = TokenBucket(ROUTE_RATE, ROUTE_BURST)
+
+        delay = bucket.reserve()
+        if delay:
+            self.rate_limited += 1
+        while delay:
+            await asyncio.sleep(delay)
+            delay = bucket.reserve()
+
+        await asyncio.sleep(REST_LATENCY)
+
+
+class FakeUser:
+    def __init__(self, user_id: int):
+        self.id = user_id
+        self.name = f"player{user_id}"
+        self.mention = f"<@{user_id}>"
+        self.bot = False
+
+
+class FakeResponse:
+    async def defer(self):
+        pass
+
+    async def send_message(self, content=None, **fields):
+        pass
+
+
+class FakeInteraction:
+    def __init__(self, user: FakeUser, custom_id: str):
+        self.user = user
+        self.data = {"component_type": 2, "custom_id": custom_id}
+        self.response = FakeResponse()
+
+
+class FakeMessage:
+    """A sent message that remembers its view and wakes whoever waits on an edit"""
+
+    ids = count(1)
+
+    def __init__(self, channel, content=None, embed=None, view=None):
+        self.id = next(self.ids)
+        self.channel = channel
+        self.content = content
+        self.embed = embed
+        self.view = view
+        self.edits = 0
+        self.edited = asyncio.Condition()
+
+    async def edit(self, embed=None, view=None, **fields):
+        await self.channel.limiter.request(("edit", self.channel.id))
+        self.embed, self.view = embed, view
+        async with self.edited:
+            self.edits += 1
+            self.edited.notify_all()
+
+    async def delete(self):
+        await self.channel.limiter.request(("delete", self.channel.id))
+
+    async def add_reaction(self, emoji):
+        await self.channel.limiter.request(("reaction", self.channel.id))
+
+    async def wait_for_state(self, states: tuple, after: int = 0) -> str:
+        """Waits for an edit after the first few to show one of the states"""
+        async with self.edited:
+            while True:
+                if self.edits > after:
+                    match = STATE.search(self.embed.description)
+                    if match and match.group(1) in states:
+                        return match.group(1)
+                await self.edited.wait()
+
+
+class FakeChannel:
+    """A channel that hands the questions sent in it to the player asked"""
+
+    def __init__(self, channel_id: int, limiter: FakeRateLimiter):
+        self.id = channel_id
+        self.limiter = limiter
+        self.messages = {}
+        self.questions = {}
+
+    def questions_for(self, user_id: int) -> asyncio.Queue:
+        return self.questions.setdefault(user_id, asyncio.Queue())
+
+    async def send(self, content=None, embed=None, view=None, **fields):
+        await self.limiter.request(("send", self.id))
+        message = FakeMessage(self, content, embed, view)
+        self.messages[message.id] = message
+
+        asked = re.match(r"<@(\d+)>", content or "")
+        if asked and view is not None:
+            await self.questions_for(int(asked.group(1))).put(message)
+        return message
+
+    def get_partial_message(self, message_id: int) -> FakeMessage:
+        return self.messages[message_id]
+
+
+class FakeContext:
+    def __init__(self, user: FakeUser, channel: FakeChannel):
+        self.author = user
+        self.channel = channel
+        self.guild = None
+
+    async def send(self, content=None, **fields):
+        return await self.channel.send(content, **fields)
+
+
+class Results:
+    def __init__(self):
+        self.moves = 0
+        self.shown = []
+        self.replies = []
+
+
+async def answer(channel: FakeChannel, user: FakeUser, value: str):
+    """Clicks the button with the value on the next question to the player"""
+    question = await channel.questions_for(user.id).get()
+    for button in question.view.children:
+        if button.custom_id.endswith(f":{value}"):
+            # discord.py runs every callback in a task of its own
+            asyncio.create_task(
+                button.callback(FakeInteraction(user, button.custom_id))
+            )
+            return
+    raise ValueError(f"no {value} button in {question.content}")
+
+
+async def play(user: FakeUser, channel: FakeChannel, results: Results, seed: int):
+    """Plays one game as a simulated player"""
+    rng = random.Random(seed)
+    ctx = FakeContext(user, channel)
+    side = rng.choice("xo")
+
+    command = asyncio.create_task(bot.tictactoe.callback(ctx, "3x3"))
+    await answer(channel, user, side)
+    await answer(channel, user, "hard")
+    await command
+
+    game = bot.games[user.id]
+    message = channel.get_partial_message(game.message_id)
+    state = await message.wait_for_state(("Your Turn",))
+
+    while state == "Your Turn":
+        square = rng.choice(game.board.available_positions())
+        edits = message.edits
+        clicked = time.perf_counter()
+        asyncio.create_task(
+            bot.on_interaction(
+                FakeInteraction(user, f"board:{user.id}:{square[0]}:{square[1]}")
+            )
+        )
+        results.moves += 1
+
+        async with message.edited:
+            await message.edited.wait_for(lambda: message.edits > edits)
+        results.shown.append(time.perf_counter() - clicked)
+
+        state = await message.wait_for_state(("Your Turn",) + GAME_OVER_STATES, edits)
+        results.replies.append(time.perf_counter() - clicked)
+
+    await answer(channel, user, "no")
+    while user.id in bot.games:
+        await asyncio.sleep(TICK)
+
+
+async def load_test(players: int) -> tuple:
+    """Runs every player at once and measures the event loop while they play"""
+    limiter = FakeRateLimiter()
+    channels = {
+        index: FakeChannel(index, limiter)
+        for index in range(1, players // PLAYERS_PER_CHANNEL + 2)
+    }
+    bot.bot.get_partial_messageable = lambda channel_id, **kwargs: channels[channel_id]
+
+    lags = []
+
+    async def tick():
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(TICK)
+            lags.append(time.perf_counter() - start - TICK)
+
+    results = Results()
+    ticker = asyncio.create_task(tick())
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            play(
+                FakeUser(user_id),
+                channels[1 + user_id // PLAYERS_PER_CHANNEL],
+                results,
+                user_id,
+            )
+            for user_id in range(players)
+        )
+    )
+    elapsed = time.perf_counter() - start
+    ticker.cancel()
+    bot.engine.shutdown()
+
+    return elapsed, results, lags, limiter
+
+
+def run(players: int = PLAYERS):
+    """Prints the throughput, latencies and loop lag of a load test"""
+    elapsed, results, lags, limiter = asyncio.run(load_test(players))
+
+    print(f"{players} players, {PLAYERS_PER_CHANNEL} a channel, {elapsed:.1f}s")
+    print(f"moves          {results.moves / elapsed:>10,.1f}/s")
+    for name, values in (("move shown", results.shown), ("reply", results.replies)):
+        print(
+            f"{name:<14} p50 {statistics.median(values) * 1000:>8.1f}ms"
+            f"   p99 {percentile(values, 0.99) * 1000:>8.1f}ms"
+        )
+    print(
+        f"{'loop lag':<14} p50 {statistics.median(lags) * 1000:>8.1f}ms"
+        f"   p99 {percentile(lags, 0.99) * 1000:>8.1f}ms"
+        f"   max {max(lags) * 1000:>8.1f}ms"
+    )
+    print(
+        f"rest calls     {limiter.calls:,}, {limiter.rate_limited:,} rate limited,"
+        f" {bot.edits.merged:,} edits merged, {bot.edits.skipped:,} skipped"
+    )
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else PLAYERS)
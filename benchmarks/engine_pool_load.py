@@ -0,0 +1,98 @@
+"""Measures how late the event loop wakes up while many games ask the ai
+for a move at once, searching on the loop itself the way start_computer
+used to against searching through an EnginePool.
+
+Run with: python -m benchmarks.engine_pool_load
+"""
+
+import asyncio
+import random
+import statistics
+import time
+
+from src.ai import get_best_move
+from src.board import Board, GAME_STATE, VARIANTS
+from src.engine_pool import EnginePool
+
+GAMES = 32
+MOVES_PER_GAME = 3
+TIME_LIMIT = 0.05
+TICK = 0.01
+
+
+def percentile(values: list, fraction: float) -> float:
+    """Gets the value below which the fraction of values fall"""
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+async def play_game(ask_move, seed: int):
+    """Plays a random move for the person and asks the ai for its reply"""
+    rng = random.Random(seed)
+    board = Board(*VARIANTS["5x5"])
+
+    for _ in range(MOVES_PER_GAME):
+        board.play(*rng.choice(board.available_positions()))
+        if board.state == GAME_STATE.GAME_OVER:
+            return
+        board.play(*await ask_move(board))
+        if board.state == GAME_STATE.GAME_OVER:
+            return
+
+
+async def measure(ask_move) -> tuple:
+    """Runs all the games together and records how late every tick wakes up"""
+    lags = []
+
+    async def tick():
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(TICK)
+            lags.append(time.perf_counter() - start - TICK)
+
+    ticker = asyncio.create_task(tick())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    await asyncio.gather(*(play_game(ask_move, seed) for seed in range(GAMES)))
+    elapsed = time.perf_counter() - start
+
+    # let a tick that was blocked the whole time record how late it was
+    await asyncio.sleep(2 * TICK)
+    ticker.cancel()
+
+    return elapsed, lags
+
+
+def run():
+    """Prints the loop lag for every way of running the ai"""
+
+    async def inline(board: Board) -> tuple:
+        return get_best_move(board, True, time_limit=TIME_LIMIT)
+
+    threads = EnginePool(use_processes=False)
+    processes = EnginePool()
+    runners = {
+        "inline": inline,
+        "threads": lambda board: threads.best_move(board, True, TIME_LIMIT),
+        "processes": lambda board: processes.best_move(board, True, TIME_LIMIT),
+    }
+
+    print(f"{GAMES} games, {MOVES_PER_GAME} ai moves each, {TIME_LIMIT}s per move")
+    print(
+        f"{'runner':<10} {'total':>8} {'lag p50':>10} {'lag p99':>10} {'lag max':>10}"
+    )
+    for name, ask_move in runners.items():
+        elapsed, lags = asyncio.run(measure(ask_move))
+        print(
+            f"{name:<10} {elapsed:>7.2f}s"
+            f" {statistics.median(lags) * 1000:>8.1f}ms"
+            f" {percentile(lags, 0.99) * 1000:>8.1f}ms"
+            f" {max(lags) * 1000:>8.1f}ms"
+        )
+
+    threads.shutdown()
+    processes.shutdown()
+
+
+if __name__ == "__main__":
+    run()
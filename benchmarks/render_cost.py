@@ -0,0 +1,81 @@
+"""Measures what rendering the board part of a game message costs per
+update. "rebuild" renders the emoji grid and the button styles from the
+board every time, the way update_messages used to. "cached" is the
+current render_board, on positions from games being replayed, so most
+renders are cache hits like they are for a busy bot.
+
+Run with: python -m benchmarks.render_cost
+"""
+
+import random
+import time
+
+from src.board import Board, GAME_STATE, VARIANTS
+from src.render import COMPUTER, EMOJI_DICT, EMPTY, PLAYER, render_board
+
+UPDATES = 20_000
+
+
+def rebuild(board: Board, player: str) -> tuple:
+    """Renders the board the way update_messages used to"""
+    update = lambda row: map(lambda text: EMOJI_DICT[text], row)
+    grid = "\n".join([" | ".join(update(row)) for row in board.get_board()])
+
+    owners = []
+    for rank in range(board.height):
+        for file in range(board.width):
+            piece = board.get_position(file, rank)
+            if piece == " ":
+                owners.append(EMPTY)
+            else:
+                owners.append(PLAYER if piece == player else COMPUTER)
+
+    return grid, tuple(owners)
+
+
+def cached(board: Board, player: str) -> tuple:
+    """Renders the board with render_board"""
+    return render_board(board.pack(), player, board.width, board.height)
+
+
+def game_positions(variant: tuple, count: int, seed: int = 0) -> list:
+    """Plays random games from a few openings and keeps every position,
+    so positions repeat the way they do across many games"""
+    rng = random.Random(seed)
+    boards = []
+
+    while len(boards) < count:
+        board = Board(*variant)
+        board.play(*rng.choice(board.available_positions()[:3]))
+        while board.state == GAME_STATE.PLAYING and len(boards) < count:
+            boards.append(Board.from_packed(board.pack(), *variant))
+            board.play(*rng.choice(board.available_positions()))
+
+    return boards
+
+
+def microseconds_per_update(render, boards: list) -> float:
+    """Times render over the boards and returns the microseconds each took"""
+    start = time.perf_counter()
+    for board in boards:
+        render(board, "x")
+    return (time.perf_counter() - start) / len(boards) * 1_000_000
+
+
+def run():
+    """Prints the render cost per update for every variant"""
+    print(f"{'variant':<8} {'rebuild':>10} {'cached':>10} {'speedup':>8}")
+
+    for name, variant in VARIANTS.items():
+        boards = game_positions(variant, UPDATES)
+        for board in boards:
+            assert rebuild(board, "x") == cached(board, "x")
+
+        render_board.cache_clear()
+        slow = microseconds_per_update(rebuild, boards)
+        fast = microseconds_per_update(cached, boards)
+        print(f"{name:<8} {slow:>8.1f}us {fast:>8.1f}us {slow / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,88 @@
+"""Compares how many nodes the hard search visits on a fixed set of
+positions.
+
+"minimax" is hard mode as it used to be: plain minimax from every
+available move. "negamax" is the ordered alpha beta search without a
+transposition table and "negamax + table" is the same search with a
+fresh table per position.
+
+Run with: python -m benchmarks.search_nodes
+"""
+
+from math import inf
+
+from src.ai import SearchContext, minimax, search_best_move
+from src.board import Board
+from src.transposition import TranspositionTable
+
+POSITIONS = {
+    "empty": [],
+    "center": [(1, 1)],
+    "corner": [(0, 0)],
+    "edge": [(1, 0)],
+    "corner, center": [(0, 0), (1, 1)],
+    "center, corner": [(1, 1), (0, 0)],
+    "two corners": [(0, 0), (1, 1), (2, 2)],
+    "fork threat": [(0, 0), (1, 1), (2, 2), (2, 0)],
+    "midgame": [(1, 1), (0, 0), (2, 0), (0, 2), (0, 1)],
+}
+
+
+class CountingBoard(Board):
+    """A board that counts the moves played on it"""
+
+    def __init__(self):
+        super().__init__()
+        self.plays = 0
+
+    def play(self, file: int, rank: int):
+        self.plays += 1
+        super().play(file, rank)
+
+
+def minimax_nodes(moves: list) -> int:
+    """Counts the nodes the old hard mode searched for a position"""
+    board = CountingBoard()
+    for move in moves:
+        board.play(*move)
+    board.plays = 0
+
+    for move in board.available_positions():
+        board.play(*move)
+        minimax(board, -inf, inf, board.turn == "x", False)
+        board.undo()
+
+    # every play is one node, plus the root
+    return board.plays + 1
+
+
+def negamax_nodes(moves: list, table=None) -> int:
+    """Counts the nodes negamax searches for a position"""
+    board = Board()
+    for move in moves:
+        board.play(*move)
+
+    context = SearchContext(table)
+    search_best_move(board, context)
+    return context.nodes
+
+
+def run():
+    """Prints the node counts for every position"""
+    print(f"{'position':<16} {'minimax':>9} {'negamax':>9} {'negamax + table':>16}")
+
+    totals = [0, 0, 0]
+    for name, moves in POSITIONS.items():
+        counts = (
+            minimax_nodes(moves),
+            negamax_nodes(moves),
+            negamax_nodes(moves, TranspositionTable()),
+        )
+        totals = [total + count for total, count in zip(totals, counts)]
+        print(f"{name:<16} {counts[0]:>9,} {counts[1]:>9,} {counts[2]:>16,}")
+
+    print(f"{'total':<16} {totals[0]:>9,} {totals[1]:>9,} {totals[2]:>16,}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,117 @@
+"""Measures the memory an idle game takes in the bot.
+
+"before" rebuilds the game the way it used to be kept: a board object
+with its move history, a view with a button for every square and the
+message it was sent in. The real games also held the member that
+started them and a full discord.Message, which are left out here, so
+the "before" numbers are lower than they really were. "after" is the
+current Game.
+
+Run with: python -m benchmarks.session_memory
+"""
+
+import asyncio
+import os
+import random
+import tracemalloc
+
+os.environ.setdefault("APPLICATION_ID", "0")
+os.environ.setdefault("SESSIONS_PATH", ":memory:")
+
+import discord
+
+import bot
+from src.board import Board, GAME_STATE, VARIANTS
+
+SESSIONS = 2000
+
+
+class LegacyGame:
+    """The attributes a game used to keep"""
+
+    def __init__(self, author_id: int, message, variant: tuple, moves: list):
+        self.message = message
+        self.view = discord.ui.View(timeout=None)
+        for rank in range(variant[1]):
+            for file in range(variant[0]):
+                self.view.add_item(
+                    discord.ui.Button(
+                        label=" - ",
+                        style=bot.BUTTON_GREY,
+                        row=rank,
+                        custom_id=f"board:{author_id}:{file}:{rank}",
+                    )
+                )
+
+        self.author_id = author_id
+        self.board = Board(*variant)
+        for move in moves:
+            self.board.play(*move)
+        self.player_name = f"player{author_id}"
+        self.state = "Your Turn"
+        self.player = "x"
+        self.is_hard = True
+
+        self.is_computing_next_game = False
+        self.channel = message.channel
+
+        self.wins = 0
+        self.loses = 0
+        self.draws = 0
+
+
+def random_moves(variant: tuple, rng: random.Random) -> list:
+    """Plays a few random moves and returns them"""
+    board = Board(*variant)
+    moves = []
+    for _ in range(rng.randint(0, 6)):
+        if board.state == GAME_STATE.GAME_OVER:
+            break
+        move = rng.choice(board.available_positions())
+        board.play(*move)
+        moves.append(move)
+    return moves
+
+
+def bytes_per_session(make_session) -> float:
+    """Creates SESSIONS sessions and returns the memory each one takes"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = [make_session(user_id) for user_id in range(SESSIONS)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    assert len(sessions) == SESSIONS
+    return (after - before) / SESSIONS
+
+
+async def measure(variant: tuple) -> tuple:
+    """Measures both kinds of session on a board size"""
+    rng = random.Random(0)
+    games = [random_moves(variant, rng) for _ in range(SESSIONS)]
+    channel = bot.bot.get_partial_messageable(1)
+
+    def legacy(user_id: int) -> LegacyGame:
+        message = channel.get_partial_message(user_id)
+        return LegacyGame(user_id, message, variant, games[user_id])
+
+    def compact(user_id: int) -> bot.Game:
+        game = bot.Game(user_id, f"player{user_id}", "x", True, 1, user_id, variant)
+        for move in games[user_id]:
+            game.play(move)
+        return game
+
+    return bytes_per_session(legacy), bytes_per_session(compact)
+
+
+def run():
+    """Prints the bytes per idle session before and after"""
+    print(f"{'variant':<8} {'before':>10} {'after':>10} {'ratio':>7}")
+
+    for name in ("3x3", "4x4", "5x5"):
+        before, after = asyncio.run(measure(VARIANTS[name]))
+        print(f"{name:<8} {before:>9,.0f}B {after:>9,.0f}B {before / after:>6.1f}x")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,188 @@
+"""Runs the engine and board benchmarks and prints the results as JSON, so
+they can be saved and compared between releases.
+
+- "board": play + undo pairs, check_state and available_positions a second
+- "solve": seconds to pick a move on the empty 3x3 board in easy and hard
+  mode, and to solve every 3x3 position for the solution table
+- "nodes": the nodes every search visits for each position of a fixed corpus
+- "memory": bytes a board takes, with and without moves played on it
+
+Run with: python -m benchmarks.suite [--quick] [--output results.json]
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from src.ai import SearchContext, get_best_move, iterative_deepening, search_best_move
+from src.board import Board, VARIANTS
+from src.solution import solve_all
+from src.transposition import TranspositionTable
+
+from .search_nodes import POSITIONS, minimax_nodes, negamax_nodes
+
+# 5x5 positions searched to a fixed depth for the node counts
+BIG_POSITIONS = {
+    "5x5 empty": [],
+    "5x5 center": [(2, 2)],
+    "5x5 open three": [(1, 1), (1, 3), (2, 1), (2, 3), (3, 1)],
+}
+BIG_DEPTH = 3
+
+# moves played on the boards the board ops are measured on, nobody has won yet
+OPS_POSITIONS = {
+    "3x3": [(1, 1), (0, 0), (2, 0), (0, 2)],
+    "5x5": [(2, 2), (1, 1), (3, 3), (1, 3), (3, 1)],
+    "7x7": [(3, 3), (2, 2), (4, 4), (2, 4), (4, 2)],
+}
+
+MEMORY_BOARDS = 1000
+
+
+def ops_per_second(operation, duration: float) -> float:
+    """Repeats operation for a while and returns how often it ran a second"""
+    runs = 0
+    start = time.perf_counter()
+    end = start + duration
+
+    while True:
+        for _ in range(100):
+            operation()
+        runs += 100
+        now = time.perf_counter()
+        if now >= end:
+            return runs / (now - start)
+
+
+def board_benchmarks(duration: float) -> dict:
+    """Measures the board operations on every size"""
+    results = {}
+
+    for name, moves in OPS_POSITIONS.items():
+        board = Board(*VARIANTS[name])
+        for move in moves:
+            board.play(*move)
+        move = board.available_positions()[0]
+
+        def play_undo():
+            board.play(*move)
+            board.undo()
+
+        results[name] = {
+            "play_undo": ops_per_second(play_undo, duration),
+            "check_state": ops_per_second(board.check_state, duration),
+            "available_positions": ops_per_second(board.available_positions, duration),
+        }
+
+    return results
+
+
+def seconds(function, *args) -> float:
+    """Times one call"""
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def solve_benchmarks() -> dict:
+    """Times the solves of the whole 3x3 tree"""
+    return {
+        "easy": seconds(get_best_move, Board(), False),
+        "hard_table": seconds(get_best_move, Board(), True),
+        "hard_search": seconds(
+            search_best_move, Board(), SearchContext(TranspositionTable())
+        ),
+        "solve_all": seconds(solve_all),
+    }
+
+
+def node_benchmarks(quick: bool) -> dict:
+    """Counts the nodes searched over the corpus"""
+    results = {}
+
+    for name, moves in POSITIONS.items():
+        results[name] = {
+            "negamax": negamax_nodes(moves),
+            "negamax_table": negamax_nodes(moves, TranspositionTable()),
+        }
+        if not quick:
+            results[name]["minimax"] = minimax_nodes(moves)
+
+    for name, moves in BIG_POSITIONS.items():
+        board = Board(*VARIANTS["5x5"])
+        for move in moves:
+            board.play(*move)
+        # a fresh table, the shared one would remember the earlier searches
+        result = iterative_deepening(
+            board, max_depth=BIG_DEPTH, table=TranspositionTable()
+        )
+        results[name] = {f"depth_{BIG_DEPTH}": result.nodes}
+
+    return results
+
+
+def bytes_per_board(variant: tuple, moves: list) -> float:
+    """Creates many boards and returns the memory each one takes"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+
+    boards = [Board(*variant) for _ in range(MEMORY_BOARDS)]
+    for board in boards:
+        for move in moves:
+            board.play(*move)
+
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / len(boards)
+
+
+def memory_benchmarks() -> dict:
+    """Measures the memory of boards of every size"""
+    return {
+        name: {
+            "empty": bytes_per_board(VARIANTS[name], []),
+            "played": bytes_per_board(VARIANTS[name], moves),
+        }
+        for name, moves in OPS_POSITIONS.items()
+    }
+
+
+def run(quick: bool = False) -> dict:
+    """Runs every benchmark
+
+    Args:
+        quick (bool, optional): measures for less time and skips the
+            slow plain minimax counts. Defaults to False.
+
+    Returns:
+        dict: the results, ready to be dumped as JSON
+    """
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "quick": quick,
+        "board": board_benchmarks(0.05 if quick else 0.5),
+        "solve": solve_benchmarks(),
+        "nodes": node_benchmarks(quick),
+        "memory": memory_benchmarks(),
+    }
+
+
+def main(argv: list):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="run a shorter suite")
+    parser.add_argument("--output", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = json.dumps(run(args.quick), indent=2)
+    print(results)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(results + "\n")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -4,42 +4,155 @@ Implementation. THis mainly takes care of the discord
 connection and messaging
 """
 
+import io
 import os
+import sys
 import asyncio
-from copy import copy
+import logging
 from typing import Optional
 
 import discord
 from discord.ext import commands
 from dotenv import load_dotenv
 
-from src.board import Board, GAME_STATE
-from src.ai import get_best_move
+from src.board import Board, GAME_STATE, VARIANTS
+from src.edit_scheduler import EditScheduler
+from src.engine_pool import EnginePool
+from src.interaction_router import DISPATCH, InteractionRouter
+from src.loop_watchdog import LoopWatchdog, Stall
+from src.metrics import Metrics
+from src.profiler import SamplingProfiler
+from src.render import COMPUTER, EMPTY, PLAYER, render_board
+from src.session_registry import SessionRegistry
+from src.session_store import DEFAULT_PATH, GameRecord, SessionStore
+from src.sharding import ShardPlan, launch
 from src.utils import PlayingAfterGameOverError, PositionAlreadyPlayedOnError
 
 load_dotenv()
 TOKEN = os.getenv("DISCORD_TOKEN")
 BOT_ID = int(os.getenv("APPLICATION_ID"))  # type: ignore
 
-intents = discord.Intents.all()
-bot = commands.Bot(
-    command_prefix="t#",
-    description="Tik Tak Toe Bot",
-    case_insensitive=True,
-    intents=intents,
-    owner_id=912949047650824282,
+# the ai runs in worker processes (or threads) so it never blocks the bot
+engine = EnginePool(
+    workers=int(os.getenv("ENGINE_WORKERS", "0")) or None,
+    use_processes=os.getenv("ENGINE_EXECUTOR", "process") == "process",
+    max_pending=int(os.getenv("ENGINE_MAX_PENDING", "64")),
 )
 
+# logs the SearchStats of every computer move
+LOG_SEARCH_STATS = os.getenv("LOG_SEARCH_STATS", "0") == "1"
+logger = logging.getLogger("tiktaktoe")
+
+# the gateway shards this process runs, see src/sharding.py
+shard_plan = ShardPlan.from_env()
+
+intents = discord.Intents.all()
+if shard_plan.shard_count > 1:
+    bot = commands.AutoShardedBot(
+        command_prefix="t#",
+        description="Tik Tak Toe Bot",
+        case_insensitive=True,
+        intents=intents,
+        owner_id=912949047650824282,
+        **shard_plan.bot_options(),
+    )
+else:
+    bot = commands.Bot(
+        command_prefix="t#",
+        description="Tik Tak Toe Bot",
+        case_insensitive=True,
+        intents=intents,
+        owner_id=912949047650824282,
+    )
+
 BUTTON_GREY = discord.ButtonStyle.gray
 BUTTON_BLUE = discord.ButtonStyle.blurple
 BUTTON_GREEN = discord.ButtonStyle.green
 BUTTON_RED = discord.ButtonStyle.red
 
-EMOJI_DICT = {
-    "x": ":regional_indicator_x:",
-    "o": ":regional_indicator_o:",
-    " ": ":blue_square:",
-}
+# the style of the button of a square, by who owns the square
+BUTTON_STYLES = {EMPTY: BUTTON_GREY, PLAYER: BUTTON_GREEN, COMPUTER: BUTTON_RED}
+
+# discord fits at most 5 rows of 5 buttons in a message
+MAX_BUTTON_ROWS = 5
+
+# the longest the computer may think about a move on the bigger boards, in seconds
+MOVE_TIME_LIMIT = 1.0
+
+# discord lets a channel have about 5 message edits every 5 seconds
+EDIT_RATE = 1.0
+EDIT_BURST = 5
+
+# merges the edits of every game message and keeps them under the rate limits
+edits = EditScheduler(EDIT_RATE, EDIT_BURST)
+
+# how long a question waits for its answer, in seconds
+PROMPT_TIMEOUT = 120.0
+
+# sends every button click straight to the question it answers
+prompts = InteractionRouter()
+
+# the games being played, saved so they survive a restart
+store = SessionStore(os.getenv("SESSIONS_PATH", DEFAULT_PATH))
+
+# games nobody has played for this many seconds are ended, checked every
+# SESSION_SWEEP_INTERVAL seconds, and past MAX_SESSIONS the least recently
+# played game is ended
+SESSION_TTL = float(os.getenv("SESSION_TTL", "1800"))
+SESSION_SWEEP_INTERVAL = 60.0
+MAX_SESSIONS = int(os.getenv("MAX_SESSIONS", "10000"))
+
+# served at http://METRICS_HOST:METRICS_PORT/metrics when METRICS_PORT is
+# set, every process of a sharded bot on the port after the one before
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+
+# the event loop is checked every LOOP_LAG_INTERVAL seconds, and what kept
+# it LOOP_STALL_THRESHOLD seconds late is logged with its stack
+LOOP_LAG_INTERVAL = 0.1
+LOOP_STALL_THRESHOLD = float(os.getenv("LOOP_STALL_THRESHOLD", "0.25"))
+
+metrics = Metrics()
+engine_latency = metrics.histogram(
+    "tiktaktoe_engine_seconds",
+    "Seconds from asking for a computer move to getting it",
+    labels=("difficulty",),
+)
+edit_latency = metrics.histogram(
+    "tiktaktoe_message_edit_seconds", "Seconds a message.edit call takes"
+)
+loop_lag = metrics.histogram(
+    "tiktaktoe_event_loop_lag_seconds",
+    f"Seconds the event loop wakes up late from a {LOOP_LAG_INTERVAL}s sleep",
+)
+
+
+def log_stall(stall: Stall):
+    """Logs what blocked the event loop"""
+    logger.warning(
+        "event loop blocked for %.0fms in %s\n%s",
+        stall.lag * 1000,
+        " > ".join(stall.coroutines) or "a callback",
+        "".join(stall.stack),
+    )
+
+
+watchdog = LoopWatchdog(
+    LOOP_LAG_INTERVAL,
+    LOOP_STALL_THRESHOLD,
+    on_lag=loop_lag.observe,
+    on_stall=log_stall,
+)
+metrics.counter(
+    "tiktaktoe_event_loop_stalls_total",
+    f"Times the event loop was blocked for {LOOP_STALL_THRESHOLD}s or more",
+    lambda: watchdog.stall_count,
+)
+metrics.gauge(
+    "tiktaktoe_event_loop_lag_p99_seconds",
+    "The 99th percentile of the latest event loop lags",
+    lambda: watchdog.percentiles((0.99,))[0.99],
+)
 
 INFO_MSG = """
 Hello And Welcome To TicTacToe!
@@ -47,7 +160,8 @@ This is a very simple bot created by KidCoderT
 that allows people to play tictactoe against an unbeatable ai!
 
 To start any game type **t#tictactoe** after which you can start playing
-and the computer will guid u through.
+and the computer will guid u through. For a bigger board add its size,
+like **t#tictactoe 4x4** or **t#tictactoe 5x5** (4 in a row).
 
 If ever u feel u want to quit just type **t#quit** or react with
 the 🚫 sign.
@@ -76,82 +190,218 @@ def run_asynchronously(func_, *args, **kwargs):
 class Game:
     """The game class contains all the methods
     and interactions and details for all the game instance
+
+    A game only keeps ids, the packed position and the score, so idle
+    games take little memory. The board, the channel, the message and the
+    buttons are all made from those when they are needed.
     """
 
+    __slots__ = (
+        "author_id",
+        "player_name",
+        "player",
+        "is_hard",
+        "channel_id",
+        "message_id",
+        "guild_id",
+        "variant",
+        "packed",
+        "state",
+        "is_computing_next_game",
+        "wins",
+        "loses",
+        "draws",
+    )
+
     def __init__(
         self,
-        author: discord.Member | discord.User,
+        author_id: int,
+        player_name: str,
         player: str,
         is_hard: bool,
-        message: discord.Message,
-        view: discord.ui.View,
+        channel_id: int,
+        message_id: int,
+        variant: tuple = VARIANTS["3x3"],
+        guild_id: Optional[int] = None,
     ):
-        self.message = message
-        self.view = view
-
-        self.author = author
-        self.board = Board()
-        self.player_name = self.author.name
-        self.state = "Your Turn"  # Your Turn | Computer is Thinking
+        self.author_id = author_id
+        self.player_name = player_name
         self.player = player  # x or o
         self.is_hard = is_hard
 
+        self.channel_id = channel_id
+        self.message_id = message_id
+        self.guild_id = guild_id
+
+        self.variant = variant
+        self.packed = 0
+        self.state = "Your Turn"  # Your Turn | Computer is Thinking
         self.is_computing_next_game = False
-        self.channel = self.message.channel
 
         self.wins = 0
         self.loses = 0
         self.draws = 0
 
+    @property
+    def board(self) -> Board:
+        """the position, as a board made from the packed position"""
+        return Board.from_packed(self.packed, *self.variant)
+
+    @property
+    def channel(self) -> discord.PartialMessageable:
+        """the channel the game is played in"""
+        return bot.get_partial_messageable(self.channel_id)
+
+    @property
+    def message(self) -> discord.PartialMessage:
+        """the message showing the game"""
+        return self.channel.get_partial_message(self.message_id)
+
+    @property
+    def mention(self) -> str:
+        """the mention of the person playing"""
+        return f"<@{self.author_id}>"
+
+    @property
+    def is_playing(self) -> bool:
+        """whether this game is still the one registered for its player,
+        it isn't once it was quit, evicted or replaced by a new game"""
+        return games.get(self.author_id) is self
+
+    @classmethod
+    def restore(cls, record: GameRecord):
+        """Brings back a game saved before a restart
+
+        Args:
+            record (GameRecord): the saved game
+
+        Returns:
+            Game: the game
+        """
+        game = cls(
+            record.user_id,
+            record.player_name,
+            record.player,
+            record.is_hard,
+            record.channel_id,
+            record.message_id,
+            (record.width, record.height, record.k),
+            record.guild_id,
+        )
+
+        game.packed = record.packed
+        game.wins, game.loses, game.draws = record.wins, record.loses, record.draws
+
+        return game
+
+    def record(self) -> GameRecord:
+        """Gets everything needed to restore the game"""
+        return GameRecord(
+            self.author_id,
+            self.player_name,
+            self.channel_id,
+            self.message_id,
+            self.packed,
+            *self.variant,
+            self.player,
+            self.is_hard,
+            self.wins,
+            self.loses,
+            self.draws,
+            self.guild_id,
+        )
+
+    def play(self, move: tuple) -> Board:
+        """Plays a move and returns the board after it"""
+        board = self.board
+        board.play(*move)
+        self.packed = board.pack()
+        return board
+
     def reset_values(self):
         self.is_computing_next_game = False
-        self.board.reset_board()
-
-        for button in self.view.children:
-            button.reset()  # type: ignore
+        self.packed = 0
 
     async def start_computer(self):
         """Plays the computers move"""
         self.is_computing_next_game = True
         self.state = "Computer Thinking..."
 
-        best_move = get_best_move(copy(self.board), self.is_hard)
+        try:
+            with engine_latency.time("hard" if self.is_hard else "easy"):
+                if LOG_SEARCH_STATS:
+                    best_move, stats = await engine.best_move_with_stats(
+                        self.board, self.is_hard, MOVE_TIME_LIMIT
+                    )
+                    logger.info(
+                        "computer played %s against %s: %s, %s",
+                        best_move,
+                        self.author_id,
+                        stats,
+                        stats.root_moves,
+                    )
+                else:
+                    best_move = await engine.best_move(
+                        self.board, self.is_hard, MOVE_TIME_LIMIT
+                    )
+        except Exception:
+            # nothing awaits this task, so the game would wait for the move forever
+            logger.exception("the computer failed to move against %s", self.author_id)
+            self.is_computing_next_game = False
+            self.state = "Computer Failed!!"
+            if self.is_playing:
+                await self.channel.send(
+                    f"{self.mention} The Computer couldn't play its move!!\n"
+                    + "click any square to make it try again"
+                )
+                await self.update_messages()
+            return
 
         if not self.is_hard:
             await asyncio.sleep(1)
 
-        self.board.play(*best_move)
+        # the game may have been quit while the computer was thinking
+        if not self.is_playing:
+            return
 
-        index = best_move[0] + best_move[1] * 3
-        self.view.children[index].style = BUTTON_RED  # type: ignore
-        self.view.children[index].disabled = True  # type: ignore
+        board = self.play(best_move)
 
         self.state = "Your Turn"
         self.is_computing_next_game = False
-        await self.update(game_finished=(self.board.state == GAME_STATE.GAME_OVER))
+        await self.update(game_finished=(board.state == GAME_STATE.GAME_OVER))
+
+    async def edit_message(self, content, force=False, **fields):
+        """Edits the game message through the edit scheduler, which merges
+        it with edits still waiting and skips it if content hasn't changed"""
+
+        async def send():
+            with edit_latency.time():
+                await self.message.edit(**fields)
+
+        await edits.edit(
+            self.message_id, ("message.edit", self.channel_id), content, send, force
+        )
 
-    async def update_messages(self):
+    async def update_messages(self, force=False):
         """Updates the embed & view to
         show the current message"""
-        turn = self.board.turn
+        board = self.board
+        turn = board.turn
         difficulty = "Easy" if not self.is_hard else "Hard"
 
-        if self.board.state == GAME_STATE.GAME_OVER:
+        if board.state == GAME_STATE.GAME_OVER:
             turn = "NA"
 
-            if self.board.winner is None:
+            if board.winner is None:
                 self.state = "Its a Draw!!"
                 self.draws += 1
-            elif self.board.winner == self.player:
+            elif board.winner == self.player:
                 self.state = "You Won!!"
                 self.wins += 1
             else:
                 self.state = "Computer Won!!"
                 self.loses += 1
 
-            for button in self.view.children:
-                button.disabled = True  # type: ignore
-
         description = "\n".join(
             map(
                 lambda x: f"{x[0]}: {x[1]}",
@@ -167,64 +417,58 @@ class Game:
             )
         )
 
-        update = lambda row: map(lambda text: EMOJI_DICT[text], row)
-        board_ui = "\n".join(
-            [" | ".join(update(row)) for row in self.board.get_board()]
-        )
-        description = description + "\n\n" + board_ui
+        # the board only depends on the position, so its render is cached
+        rendered = render_board(self.packed, self.player, board.width, board.height)
+        description = description + "\n\n" + rendered.grid
 
         embed = discord.Embed(
             title=":regional_indicator_x: __**TICTACTOE**__ :regional_indicator_o:",
             description=description,
         )
 
-        for rank in range(3):
-            for file in range(3):
-                index = file + rank * 3
-                piece = self.board.get_position(file, rank)
-
-                if piece != " ":
-                    if piece != self.player:
-                        self.view.children[index].style = BUTTON_RED
-                    else:
-                        self.view.children[index].style = BUTTON_GREEN
-
-                    self.view.children[index].disabled = True
+        view = board_view(
+            self.author_id,
+            board.width,
+            rendered.owners,
+            board.state == GAME_STATE.GAME_OVER,
+        )
 
-                else:
-                    if self.state == GAME_STATE.GAME_OVER:
-                        self.view.children[index].disabled = True
+        # everything the buttons show follows from the owners and the description
+        await self.edit_message(
+            (description, rendered.owners), force, embed=embed, view=view
+        )
 
-        await self.message.edit(embed=embed, view=self.view)
+        # saving a game that was quit would bring it back after a restart
+        if self.is_playing:
+            store.save(self.record())
 
     async def update(self, move: Optional[tuple] = None, game_finished=False):
         """Updates the Game in the backend"""
         if move is not None:
             if self.is_computing_next_game:
                 await self.channel.send(
-                    f"{self.author.mention} Wait!! The Computer has not\n"
+                    f"{self.mention} Wait!! The Computer has not\n"
                     + "yet finished playing his move!!"
                 )
+            elif self.board.turn != self.player:
+                # the computer failed to move, it tries again below
+                pass
             else:
                 try:
-                    self.board.play(*move)
-
-                    index = move[0] + move[1] * 3
-                    self.view.children[index].style = BUTTON_GREEN  # type: ignore
-                    self.view.children[index].disabled = True  # type: ignore
-
-                    game_finished = self.board.state == GAME_STATE.GAME_OVER
+                    board = self.play(move)
+                    game_finished = board.state == GAME_STATE.GAME_OVER
                 except PlayingAfterGameOverError:
                     pass
                 except PositionAlreadyPlayedOnError:
                     pass
 
-        if self.board.state != GAME_STATE.GAME_OVER:
-            if self.board.turn != self.player:
+        board = self.board
+        if board.state != GAME_STATE.GAME_OVER:
+            if board.turn != self.player:
                 self.state = "Computer Thinking..."
                 run_asynchronously(self.start_computer)
 
-            if self.board.turn == self.player:
+            if board.turn == self.player:
                 self.state = "Your Turn"
 
         await self.update_messages()
@@ -235,24 +479,28 @@ class Game:
                     self.channel,
                     "Want to play again??",
                     [("Yes", BUTTON_GREEN, "yes"), ("No", BUTTON_RED, "no")],
-                    self.author.id,
+                    self.author_id,
                 )
                 == "yes"
             )
 
             if should_continue:
-                self.reset_values()
-                self.player = await get_input(
+                player = await get_input(
                     self.channel,
                     "Choose who u are!!",
                     [("X", BUTTON_BLUE, "x"), ("O", BUTTON_GREEN, "o")],
-                    self.author.id,
+                    self.author_id,
                 )
 
-                await self.update()
-                return
+                # the player may have quit, or started a new game, while asked
+                if player is not None and self.is_playing:
+                    self.reset_values()
+                    self.player = player
+                    await self.update()
+                    return
 
-            await end_game(self.author.id)
+            if self.is_playing:
+                await end_game(self.author_id)
 
     async def quit(self):
         """Quit the game"""
@@ -277,24 +525,92 @@ class Game:
             description=description,
         )
 
-        await self.message.edit(embed=embed, view=None)
+        await self.edit_message(description, embed=embed, view=None)
+        edits.forget(self.message_id)
 
 
-games: dict[int, Game] = {}
+async def evict_game(user_id: int, game: Game):
+    """Finishes a game that was ended for being idle or to make room"""
+    try:
+        await game.quit()
+    finally:
+        # a game that failed to quit still shouldn't come back after a restart
+        store.delete(user_id, game.guild_id)
+
+
+games = SessionRegistry(SESSION_TTL, MAX_SESSIONS, evict_game)
+
+metrics.gauge("tiktaktoe_games", "Games being played", lambda: len(games))
+metrics.counter(
+    "tiktaktoe_games_evicted_total",
+    "Games ended for sitting idle or to make room",
+    lambda: games.evictions,
+)
+metrics.gauge(
+    "tiktaktoe_game_bytes",
+    "Approximate memory one game takes",
+    games.approximate_bytes,
+)
+metrics.gauge(
+    "tiktaktoe_engine_pending",
+    "Computer moves being searched or waiting for a worker",
+    lambda: engine.pending,
+)
+metrics.gauge(
+    "tiktaktoe_prompts_pending",
+    "get_input questions waiting for an answer",
+    lambda: prompts.pending,
+)
+metrics.gauge(
+    "tiktaktoe_message_edits_queued",
+    "Game messages with an edit waiting to be sent",
+    lambda: edits.queue_depth,
+)
+metrics.counter(
+    "tiktaktoe_message_edits_total", "message.edit calls sent", lambda: edits.sent
+)
+metrics.counter(
+    "tiktaktoe_message_edit_errors_total",
+    "message.edit calls that raised",
+    lambda: edits.errors,
+)
+metrics.counter(
+    "tiktaktoe_message_edits_merged_total",
+    "Edits merged into an edit still waiting",
+    lambda: edits.merged,
+)
+metrics.counter(
+    "tiktaktoe_message_edits_skipped_total",
+    "Edits skipped because the message already showed them",
+    lambda: edits.skipped,
+)
+metrics.gauge(
+    "tiktaktoe_session_writes_pending",
+    "Game saves and deletes not written to the database yet",
+    lambda: store.pending,
+)
 
 
 async def end_game(user_id: int):
     """Ends a game based on the player's ID'
     Args: id (int): the id of the player playing the game
     """
-    await games[user_id].channel.send(
-        f"{bot.get_user(user_id).mention} Thx for Playing!!"
-    )
-    await games[user_id].quit()
+    game = games.get(user_id)
+    if game is None:
+        return
+
+    # forgotten before awaiting anything, so ending it twice at once, or
+    # evicting it while it ends, can't quit it twice
     del games[user_id]
+    store.delete(user_id, game.guild_id)
+
+    await game.channel.send(f"<@{user_id}> Thx for Playing!!")
+    await game.quit()
 
 
-async def get_input(ctx, question, buttons, user_id=None) -> str:
+async def get_input(
+    ctx, question, buttons, user_id=None, timeout=PROMPT_TIMEOUT
+) -> Optional[str]:
     """This function allows for getting user input
     based on button interactions from the user.
 
@@ -303,75 +619,114 @@ async def get_input(ctx, question, buttons, user_id=None) -> str:
         question (_type_): the question to be displayed
         buttons (_type_): the buttons data
         id (_type_, optional): the id if its not accessible through ctx. Defaults to None.
+        timeout (float, optional): the seconds to wait for an answer. Defaults to PROMPT_TIMEOUT.
 
     Returns:
-        str: the custom_id of the selected button
+        str | None: the value of the selected button, or None if nobody answered in time
     """
     if user_id is None:
         user_id = ctx.author.id
 
-    view = discord.ui.View()
+    custom_ids, answer = prompts.create([value for (_, _, value) in buttons], user_id)
+    view = discord.ui.View(timeout=timeout)
 
     async def callback(interaction: discord.Interaction):
-        await message.delete()
+        result = prompts.dispatch(interaction.data["custom_id"], interaction.user.id)  # type: ignore
+
+        if result == DISPATCH.WRONG_USER:
+            await interaction.response.send_message(
+                f"{interaction.user.mention} This question isn't for u!!",
+                ephemeral=True,
+            )
+        else:
+            await interaction.response.defer()
 
     for (label, style, value) in buttons:
         button = discord.ui.Button(
-            label=label, style=style, custom_id=f"{user_id} {value}"
+            label=label, style=style, custom_id=custom_ids[value]
         )
         button.callback = callback
 
         view.add_item(button)
 
-    message = await ctx.send(f"{bot.get_user(user_id).mention} {question}", view=view)
-
-    def check(interaction: discord.Interaction):
-        return (
-            interaction.data["component_type"] == 2  # type: ignore
-            and "custom_id" in interaction.data.keys()
-        )
+    try:
+        message = await ctx.send(f"<@{user_id}> {question}", view=view)
+        value = await prompts.wait(answer, timeout)
+    finally:
+        # a question that failed to send would wait in prompts forever, and
+        # discord.py keeps a view that isn't stopped until it times out
+        prompts.close(answer)
+        view.stop()
 
-    res: discord.Interaction = await bot.wait_for(
-        "interaction",
-        check=check,
-    )
+    try:
+        await message.delete()
+    except discord.NotFound:
+        pass
 
-    return res.data["custom_id"].split()[-1]  # type: ignore
+    return value
 
 
 class PositionalButton(discord.ui.Button):
     """My Custom Discord Button"""
 
-    def __init__(self, user_id: int, file, rank):
-        super().__init__(label=" - ", style=BUTTON_GREY, row=rank)
-        self.user_id = user_id
-        self.file, self.rank = file, rank
+    def __init__(self, user_id: int, file, rank, owner=EMPTY, disabled=False):
+        # the custom_id stays the same across restarts so old messages keep
+        # working, clicks on it are played by on_interaction
+        super().__init__(
+            label=" - ",
+            style=BUTTON_STYLES[owner],
+            row=rank,
+            custom_id=f"board:{user_id}:{file}:{rank}",
+            disabled=disabled or owner != EMPTY,
+        )
 
-    async def callback(self, interaction):
 
-        if interaction.user.id != self.user_id:
-            await interaction.response.send_message(
-                f"{interaction.user.mention} This is someone elses game u cant interfere!!"
-            )
-            return
+def board_view(
+    user_id: int, width: int, owners: tuple, game_over: bool = False
+) -> discord.ui.View:
+    """Creates the buttons of a game, one for every square, showing who
+    owns each square. The view is stopped so discord.py doesn't keep it
+    after the message is sent"""
+    view = discord.ui.View(timeout=None)
 
-        game = games[self.user_id]
-        if self.style == BUTTON_GREY:
-            await interaction.response.defer()
-            await game.update((self.file, self.rank))
+    for square, owner in enumerate(owners):
+        file, rank = square % width, square // width
+        view.add_item(PositionalButton(user_id, file, rank, owner, game_over))
 
-        else:
-            await interaction.response.send_message(
-                f"{bot.get_user(self.user_id).mention} The position has already been played on!!"
-            )
+    view.stop()
+    return view
 
-    def reset(self):
-        """resets the button
-        to original state
-        and color!!
-        """
-        self.disabled = False
-        self.style = BUTTON_GREY
+
+async def play_clicked(interaction: discord.Interaction, user_id: int, file, rank):
+    """Plays a square clicked on the board of a game
+
+    Args:
+        interaction (discord.Interaction): the click
+        user_id (int): the id of the player the board belongs to
+        file (int): the file of the square clicked
+        rank (int): the rank of the square clicked
+    """
+    if interaction.user.id != user_id:
+        await interaction.response.send_message(
+            f"{interaction.user.mention} This is someone elses game u cant interfere!!"
+        )
+        return
+
+    game = games.get(user_id)
+    if game is None:
+        await interaction.response.send_message(
+            f"{interaction.user.mention} This game has ended!!"
+        )
+        return
+
+    if game.board.get_position(file, rank) == " ":
+        await interaction.response.defer()
+        await game.update((file, rank))
+
+    else:
+        await interaction.response.send_message(
+            f"{game.mention} The position has already been played on!!"
+        )
 
 
 # tictactoe
@@ -382,13 +737,24 @@ class PositionalButton(discord.ui.Button):
 
 
 @bot.command()
-async def tictactoe(ctx: commands.Context):
+async def tictactoe(ctx: commands.Context, size: str = "3x3"):
     """Starts a new Game With the Bot
 
     Args:
         ctx (commands.Context): the channel
+        size (str, optional): the board to play on. Defaults to "3x3".
     """
     author = ctx.author.id
+    size = size.lower()
+
+    if size not in VARIANTS:
+        await ctx.send(f"{ctx.author.mention} the board can be {', '.join(VARIANTS)}!!")
+        return
+
+    width, height, _ = VARIANTS[size]
+    if width > MAX_BUTTON_ROWS or height > MAX_BUTTON_ROWS:
+        await ctx.send(f"{ctx.author.mention} {size} is too big for discord buttons!!")
+        return
 
     if author not in games:
 
@@ -398,14 +764,18 @@ async def tictactoe(ctx: commands.Context):
             [("X", BUTTON_BLUE, "x"), ("O", BUTTON_GREEN, "o")],
             author,
         )
-        is_hard = (
-            await get_input(
+        difficulty = None
+        if player is not None:
+            difficulty = await get_input(
                 ctx,
                 "Choose your difficulty level!!",
                 [("Easy", BUTTON_GREEN, "easy"), ("Hard", BUTTON_RED, "hard")],
             )
-            == "hard"
-        )
+
+        if difficulty is None:
+            await ctx.send(f"{ctx.author.mention} u took too long to answer!!")
+            return
+        is_hard = difficulty == "hard"
 
         description = "loading...."
         embed = discord.Embed(
@@ -413,23 +783,21 @@ async def tictactoe(ctx: commands.Context):
             description=description,
         )
 
-        view = discord.ui.View(timeout=None)
-
-        for rank in range(3):
-            for file in range(3):
-                btn = PositionalButton(author, file, rank)
-                view.add_item(btn)
+        view = board_view(author, width, (EMPTY,) * (width * height))
 
         message = await ctx.send(embed=embed, view=view)
         await message.add_reaction("🚫")
         await message.add_reaction("🔃")
 
         new_game = Game(
-            ctx.author,
+            author,
+            ctx.author.name,
             player,
             is_hard,
-            message,
-            view,
+            message.channel.id,
+            message.id,
+            VARIANTS[size],
+            ctx.guild.id if ctx.guild else None,
         )
         games[author] = new_game
 
@@ -487,6 +855,8 @@ async def clear_all(ctx: commands.Context, length):
             await ctx.channel.purge(limit=int(length), check=is_bot_message)  # type: ignore
             await ctx.send(f"{ctx.author.mention} Deleted all previous Messages!!")
 
+            for user_id in games:
+                store.delete(user_id, games.get(user_id).guild_id)
             games.clear()
         except ValueError:
             await ctx.send(f"{ctx.author.mention} length needs to be a number!!")
@@ -498,6 +868,59 @@ async def clear_all(ctx: commands.Context, length):
     )
 
 
+# profile <seconds>
+# - samples where the bot spends its time and memory for a while and
+#   sends the summary as a file
+# - only possible if bot maker
+
+# the longest the profile command samples for, in seconds
+PROFILE_MAX_SECONDS = 300.0
+
+# held while a profile is running, only one can run at a time
+profiling = asyncio.Lock()
+
+
+@bot.command()
+async def profile(ctx: commands.Context, seconds="30"):
+    """Profile the whole bot process for a while.
+
+    Args:
+        ctx (commands.Context): the COntext
+        seconds (str): how many seconds to profile for
+    """
+    if ctx.author.id != bot.owner_id:
+        await ctx.send(
+            f"{ctx.author.mention} You dont have the permission to profile!!"
+        )
+        return
+
+    try:
+        seconds = float(seconds)
+    except ValueError:
+        await ctx.send(f"{ctx.author.mention} seconds needs to be a number!!")
+        return
+
+    if not 0 < seconds <= PROFILE_MAX_SECONDS:
+        await ctx.send(
+            f"{ctx.author.mention} seconds needs to be more than 0"
+            f" and at most {PROFILE_MAX_SECONDS:g}!!"
+        )
+        return
+
+    if profiling.locked():
+        await ctx.send(f"{ctx.author.mention} A profile is already running!!")
+        return
+
+    async with profiling:
+        await ctx.send(f"{ctx.author.mention} Profiling for {seconds:g}s...")
+        report = await SamplingProfiler().run(seconds)
+
+    await ctx.send(
+        f"{ctx.author.mention} Here is the profile!!",
+        file=discord.File(io.BytesIO(report.encode()), filename="profile.txt"),
+    )
+
+
 @bot.event
 async def on_reaction_add(reaction: discord.Reaction, user: discord.User):
     """This is the method called when the user
@@ -521,7 +944,7 @@ async def on_reaction_add(reaction: discord.Reaction, user: discord.User):
     if emoji == "🔃":
         try:
             game = games[user.id]
-            await game.update_messages()
+            await game.update_messages(force=True)
         except KeyError:
             pass
 
@@ -543,11 +966,58 @@ async def on_reaction_remove(reaction: discord.Reaction, user: discord.User):
     if emoji == "🔃":
         try:
             game = games[user.id]
-            await game.update_messages()
+            await game.update_messages(force=True)
         except KeyError:
             pass
 
 
+@bot.event
+async def setup_hook():
+    """Brings back the games saved before the bot restarted. Clicks on
+    their boards are routed by custom_id, so the old messages work as soon
+    as the bot is online"""
+    restored = []
+
+    # the other processes restore the games of the guilds on their shards
+    for record in store.load_all(shard_plan.owns):
+        game = Game.restore(record)
+        games[record.user_id] = game
+        restored.append(game)
+
+    asyncio.create_task(store.run())
+    asyncio.create_task(games.run(SESSION_SWEEP_INTERVAL))
+    asyncio.create_task(resume_games(restored))
+    asyncio.create_task(watchdog.run())
+
+    if METRICS_PORT:
+        await metrics.serve(METRICS_HOST, shard_plan.port(METRICS_PORT))
+
+
+@bot.event
+async def on_interaction(interaction: discord.Interaction):
+    """Plays the squares clicked on game boards. Boards have no view kept
+    for them, so their clicks are found by their custom_id here"""
+    custom_id = (interaction.data or {}).get("custom_id", "")
+    if not custom_id.startswith("board:"):
+        return
+
+    _, user_id, file, rank = custom_id.split(":")
+    await play_clicked(interaction, int(user_id), int(file), int(rank))
+
+
+async def resume_games(restored: list):
+    """Carries on the restored games that were waiting on the computer,
+    and starts a new round of the ones that had finished"""
+    await bot.wait_until_ready()
+
+    for game in restored:
+        if game.board.state == GAME_STATE.GAME_OVER:
+            game.reset_values()
+            await game.update()
+        elif game.board.turn != game.player:
+            await game.update()
+
+
 # help
 # - gives the instructions to use bot
 
@@ -560,4 +1030,13 @@ async def _help(ctx: commands.Context):
 
 
 if __name__ == "__main__":
-    bot.run(TOKEN, reconnect=True)  # type: ignore
+    if shard_plan.process_count > 1 and "PROCESS_INDEX" not in os.environ:
+        # run a process for every block of shards instead
+        raise SystemExit(
+            launch(sys.argv, shard_plan.process_count, shard_plan.shard_count)
+        )
+
+    try:
+        bot.run(TOKEN, reconnect=True)  # type: ignore
+    finally:
+        store.close()
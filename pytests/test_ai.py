@@ -1,7 +1,21 @@
 import pytest
+from math import inf
 from random import randint
-from src.ai import evaluate_board, get_best_move
-from src.board import Board
+from src import ai
+from src.ai import (
+    SearchContext,
+    SearchStats,
+    evaluate_board,
+    get_best_move,
+    minimax,
+    negamax,
+)
+from src.ai import count_lines, get_best_moves, iterative_deepening, search_best_move
+from src.board import Board, GAME_STATE
+from src.solution import SolutionTable
+from src.symmetry import MASK_TABLES, unique_moves
+from src.transposition import TranspositionTable
+from src.utils import PlayingAfterGameOverError
 
 
 @pytest.fixture()
@@ -65,3 +79,205 @@ def test_get_best_move_method(my_board):
     assert my_board.turn == "o"
     assert my_board.winner == "x"
     assert my_board.state == Board.GAME_STATE.GAME_OVER
+
+
+def test_unique_moves_collapse_symmetric_moves():
+    """3. Only moves that differ up to symmetry are searched at the root"""
+    assert unique_moves(0, 0) == [(1, 1), (2, 1), (2, 2)]
+    assert unique_moves(1 << 4, 0) == [(2, 1), (2, 2)]
+    assert len(unique_moves(1 << 0, 1 << 5)) == 7
+
+
+def test_symmetry_pruned_moves_are_optimal(monkeypatch):
+    """4. The searched move is always one of the best moves"""
+    monkeypatch.setattr(ai, "SOLUTION_TABLE", None)
+    solutions = SolutionTable()
+    seen = set()
+
+    def check(board):
+        key = (board.x_bits, board.o_bits)
+        if key in seen or board.state == GAME_STATE.GAME_OVER:
+            return
+        seen.add(key)
+
+        file, rank = get_best_move(board, True)
+        _, best_moves = solutions.lookup(board.x_bits, board.o_bits)
+        assert best_moves & (1 << (file + rank * 3))
+
+        for position in board.available_positions():
+            board.play(*position)
+            check(board)
+            board.undo()
+
+    check(Board())
+    solutions.close()
+    assert len(seen) == 4520
+
+
+def test_negamax_scores_match_minimax():
+    """5. Negamax gives every reachable position the same score as minimax"""
+    table = TranspositionTable()
+    minimax_table = TranspositionTable()
+    seen = set()
+
+    def check(board):
+        key = (board.x_bits, board.o_bits)
+        if key in seen:
+            return
+        seen.add(key)
+
+        sign = 1 if board.turn == "x" else -1
+        expected = minimax(board, -inf, inf, sign == 1, False, minimax_table) * sign
+        assert negamax(board, -inf, inf, SearchContext(table)) == expected
+
+        if board.state == GAME_STATE.GAME_OVER:
+            return
+
+        for position in board.available_positions():
+            board.play(*position)
+            check(board)
+            board.undo()
+
+    check(Board())
+    assert len(seen) == 5478
+
+
+def test_negamax_searches_fewer_nodes():
+    """6. Ordered alpha beta visits a fraction of the nodes of plain minimax"""
+    context = SearchContext()
+    move, value = search_best_move(Board(), context)
+
+    assert value == 0
+    assert move in Board().available_positions()
+    assert context.nodes < 549946 // 50
+
+
+@pytest.mark.parametrize("is_hard", [False, True])
+def test_big_boards_win_and_block(is_hard):
+    """7. On bigger boards the ai completes its own lines and blocks the other side"""
+    board = Board(7, 7, 5)
+    for move in [
+        (1, 1),
+        (1, 5),
+        (2, 1),
+        (2, 5),
+        (3, 1),
+        (3, 5),
+        (0, 5),
+        (0, 1),
+        (4, 1),
+    ]:
+        board.play(*move)
+
+    # o has to block x's four in a row
+    assert get_best_move(board, is_hard) == (5, 1)
+
+    # x wins rather than blocking o's four
+    board.play(4, 5)
+    assert get_best_move(board, is_hard) == (5, 1)
+
+
+def test_count_lines_is_scored_for_the_side_to_move():
+    """8. The horizon score flips with the side to move"""
+    board = Board(5, 5, 4)
+    board.play(2, 2)
+    assert count_lines(board) < 0
+
+    board.play(0, 0)
+    assert count_lines(board) > 0
+
+
+def test_iterative_deepening_stops_at_its_budget():
+    """9. Deepening searches return their deepest finished result in budget"""
+    board = Board(7, 7, 5)
+    board.play(3, 3)
+    table = TranspositionTable()
+
+    result = iterative_deepening(board, max_depth=2, table=table)
+    assert result.depth == 2
+    assert result.move in board.available_positions()
+
+    result = iterative_deepening(board, node_limit=500, table=TranspositionTable())
+    assert 0 < result.depth < board.size
+    assert result.nodes <= 500
+
+    result = iterative_deepening(board, time_limit=0, table=TranspositionTable())
+    assert result.depth == 0
+    assert result.move in board.available_positions()
+
+    assert board.depth == 1
+    assert board.last_move == (3, 3)
+    assert board.x_bits == 1 << 24 and board.o_bits == 0
+
+
+@pytest.mark.parametrize("is_hard", [False, True])
+def test_batched_moves_fit_every_position(monkeypatch, is_hard):
+    """10. Batched moves are legal and, when hard, optimal for every copy"""
+    monkeypatch.setattr(ai, "SOLUTION_TABLE", None)
+    solutions = SolutionTable()
+
+    boards = []
+    for t in range(8):
+        board = Board.from_packed(
+            MASK_TABLES[t][0b000_000_001] | MASK_TABLES[t][0b000_000_010] << 9
+        )
+        boards.extend([board, board.pack()])
+    moves = get_best_moves(boards, is_hard)
+
+    assert len(moves) == 16
+    for board, move in zip(boards[::2], moves[::2]):
+        assert move in board.available_positions()
+        if is_hard:
+            _, best_moves = solutions.lookup(board.x_bits, board.o_bits)
+            assert best_moves & (1 << (move[0] + move[1] * 3))
+    assert moves[::2] == moves[1::2]
+    solutions.close()
+
+    big_board = Board(5, 5, 4)
+    big_board.play(0, 0)
+    assert get_best_moves([big_board], is_hard)[0] in big_board.available_positions()
+
+    snapshots = [big_board.snapshot(), big_board.snapshot(), boards[0].snapshot()]
+    snapshot_moves = get_best_moves(snapshots, is_hard)
+    assert snapshot_moves[0] == snapshot_moves[1]
+    assert snapshot_moves[0] in big_board.available_positions()
+    assert snapshot_moves[2] in boards[0].available_positions()
+
+    with pytest.raises(PlayingAfterGameOverError):
+        get_best_moves([0b000_000_111 | 0b000_011_000 << 9])
+
+
+def test_search_stats(monkeypatch):
+    """11. SearchStats counts what every kind of search did"""
+    monkeypatch.setattr(ai, "SOLUTION_TABLE", None)
+    root_moves = set(unique_moves(0, 0))
+
+    context = SearchContext(TranspositionTable())
+    move, _ = search_best_move(Board(), context)
+    stats = SearchStats()
+    assert get_best_move(Board(), True, TranspositionTable(), stats=stats) == move
+
+    assert stats.method == "negamax"
+    assert stats.nodes == context.nodes
+    assert 0 < stats.leaves < stats.nodes
+    assert stats.cutoffs > 0 and stats.cache_hits > 0 and stats.cache_misses > 0
+    assert 0 < stats.max_depth <= 9
+    assert set(stats.root_moves) == root_moves
+    assert stats.elapsed >= sum(stats.root_moves.values())
+
+    stats = SearchStats()
+    get_best_move(Board(), False, stats=stats)
+    assert stats.method == "minimax"
+    assert 0 < stats.leaves < stats.nodes
+    assert stats.cutoffs > 0 and stats.cache_hits == 0
+    assert stats.max_depth == 9
+    assert set(stats.root_moves) == root_moves
+
+    stats = SearchStats()
+    board = Board(5, 5, 4)
+    board.play(2, 2)
+    get_best_move(board, True, TranspositionTable(), node_limit=500, stats=stats)
+    assert stats.method == "iterative deepening"
+    assert 0 < stats.nodes <= 500
+    assert 0 < stats.max_depth < board.size
+    assert board.depth == 1
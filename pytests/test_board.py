@@ -1,6 +1,6 @@
 from random import randint
 import pytest
-from src.board import Board
+from src.board import Board, GAME_STATE, SQUARES, WIN_MASKS
 from src.utils import InvalidPositionError
 
 
@@ -123,3 +123,126 @@ def test_reset_board_method(my_board, valid_board_positions):
 
     for (file, rank) in valid_board_positions:
         assert my_board.get_position(file, rank) == " "
+
+
+def test_bitboards_follow_moves(my_board):
+    """9. Make sure the bitboards and get_board follow the played moves"""
+    my_board.play(1, 1)
+    my_board.play(2, 0)
+
+    assert my_board.x_bits == 1 << 4
+    assert my_board.o_bits == 1 << 2
+    assert my_board.empty_bits == 0b111_111_111 & ~(1 << 4 | 1 << 2)
+    assert my_board.get_board() == [[" ", " ", "o"], [" ", "x", " "], [" ", " ", " "]]
+    assert (1, 1) not in my_board.available_positions()
+    assert len(my_board.available_positions()) == 7
+
+
+@pytest.mark.parametrize("mask", WIN_MASKS)
+def test_every_win_mask_ends_the_game(my_board, mask):
+    """10. Make sure filling any of the 8 lines wins the game"""
+    line = [(file, rank) for file, rank, bit in SQUARES if mask & bit]
+    others = [(file, rank) for file, rank, bit in SQUARES if not mask & bit]
+
+    for index, position in enumerate(line):
+        my_board.play(*position)
+        if index < 2:
+            my_board.play(*others[index])
+
+    assert my_board.winner == "x"
+    assert my_board.state == Board.GAME_STATE.GAME_OVER
+
+
+def test_undo_restores_previous_state(my_board):
+    """11. Undoing the winning move puts the game back into play"""
+    for move in [(0, 0), (1, 0), (0, 1), (1, 1), (0, 2)]:
+        my_board.play(*move)
+
+    my_board.undo()
+    assert my_board.winner is None
+    assert my_board.state == Board.GAME_STATE.PLAYING
+    assert my_board.turn == "x"
+
+
+def test_incremental_state_matches_full_scan(my_board):
+    """12. The state tracked by play matches a full check_state scan"""
+    for _ in range(200):
+        my_board.reset_board()
+        while my_board.state == Board.GAME_STATE.PLAYING:
+            moves = my_board.available_positions()
+            my_board.play(*moves[randint(0, len(moves) - 1)])
+
+            tracked = (my_board.state, my_board.winner)
+            my_board.check_state()
+            assert tracked == (my_board.state, my_board.winner)
+
+
+@pytest.mark.parametrize(
+    "variant, lines",
+    [((3, 3, 3), 8), ((4, 4, 4), 10), ((5, 5, 4), 28), ((7, 7, 5), 60)],
+)
+def test_variant_geometry(variant, lines):
+    """13. Bigger boards have the right number of lines and squares"""
+    board = Board(*variant)
+
+    assert len(board.geometry.win_masks) == lines
+    assert len(board.available_positions()) == variant[0] * variant[1]
+    assert board.get_board() == [[" "] * variant[0] for _ in range(variant[1])]
+
+    with pytest.raises(InvalidPositionError):
+        board.get_position(variant[0], 0)
+
+
+def test_variant_needs_k_in_a_row():
+    """14. A line is only won once it is k long"""
+    board = Board(5, 5, 4)
+    for move in [(0, 0), (0, 1), (1, 0), (1, 1), (2, 0), (2, 1)]:
+        board.play(*move)
+    assert board.state == Board.GAME_STATE.PLAYING
+
+    board.play(3, 0)
+    assert board.winner == "x"
+    assert board.state == Board.GAME_STATE.GAME_OVER
+
+    with pytest.raises(ValueError):
+        Board(3, 3, 4)
+
+
+def test_pack_round_trip(my_board):
+    """15. A packed board unpacks to the same position"""
+    for move in [(1, 1), (0, 0), (2, 0)]:
+        my_board.play(*move)
+
+    board = Board.from_packed(my_board.pack())
+    assert board.get_board() == my_board.get_board()
+    assert (board.turn, board.depth, board.state) == ("o", 3, my_board.state)
+
+    big_board = Board(5, 5, 4)
+    big_board.play(4, 4)
+    assert Board.from_packed(big_board.pack(), 5, 5, 4).get_position(4, 4) == "x"
+
+    for packed in [1 | 1 << 9, 1 << 9, 0b11]:
+        with pytest.raises(ValueError):
+            Board.from_packed(packed)
+
+
+def test_snapshot_round_trip(my_board):
+    """16. A snapshot restores the position and is hashable"""
+    for move in [(1, 1), (0, 0)]:
+        my_board.play(*move)
+
+    snapshot = my_board.snapshot()
+    assert snapshot == (my_board.pack(), "x", 3, 3, 3)
+    assert {snapshot: 1}[Board.from_snapshot(snapshot).snapshot()] == 1
+
+    my_board.play(2, 2)
+    board = Board.from_snapshot(snapshot)
+    assert board.get_position(2, 2) == " "
+    assert (board.turn, board.depth, board.state) == ("x", 2, GAME_STATE.PLAYING)
+
+    big_board = Board(5, 5, 4)
+    big_board.play(4, 4)
+    assert Board.from_snapshot(big_board.snapshot()).get_position(4, 4) == "x"
+
+    with pytest.raises(ValueError):
+        Board.from_snapshot(snapshot._replace(turn="o"))
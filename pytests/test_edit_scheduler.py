@@ -0,0 +1,107 @@
+import asyncio
+import time
+import pytest
+from src.edit_scheduler import EditScheduler, TokenBucket
+
+
+class Message:
+    """Records the edits made to it"""
+
+    def __init__(self):
+        self.edits = []
+
+    def editor(self, content):
+        async def send():
+            self.edits.append(content)
+
+        return send
+
+
+def test_token_bucket():
+    """1. The bucket allows a burst, then refills at its rate"""
+    now = 0.0
+    bucket = TokenBucket(2, 3, clock=lambda: now)
+
+    assert [bucket.reserve() for _ in range(3)] == [0, 0, 0]
+    assert bucket.reserve() == pytest.approx(0.5)
+
+    now = 0.25
+    assert bucket.reserve() == pytest.approx(0.25)
+    now = 0.5
+    assert bucket.reserve() == 0
+
+
+def test_edits_are_merged():
+    """2. Edits made before the message is edited become one edit of the latest state"""
+    scheduler = EditScheduler()
+    message = Message()
+
+    async def main():
+        futures = [
+            scheduler.edit("message", "route", state, message.editor(state))
+            for state in range(5)
+        ]
+        assert scheduler.queue_depth == 1
+        await asyncio.gather(*futures)
+
+    asyncio.run(main())
+    assert message.edits == [4]
+    assert (scheduler.sent, scheduler.merged, scheduler.queue_depth) == (1, 4, 0)
+
+
+def test_unchanged_edits_are_skipped():
+    """3. An edit showing what the message already shows is only sent when forced"""
+    scheduler = EditScheduler()
+    message = Message()
+
+    async def main():
+        for state, force in [("a", False), ("a", False), ("b", False), ("b", True)]:
+            await scheduler.edit(
+                "message", "route", state, message.editor(state), force
+            )
+
+    asyncio.run(main())
+    assert message.edits == ["a", "b", "b"]
+    assert (scheduler.sent, scheduler.skipped) == (3, 1)
+
+
+def test_routes_are_rate_limited():
+    """4. Messages on one route share its rate limit, other routes don't wait"""
+    scheduler = EditScheduler(rate=10, burst=1)
+    message = Message()
+
+    async def edit(key, route):
+        await scheduler.edit(key, route, key, message.editor(key))
+        return time.perf_counter()
+
+    async def main():
+        start = time.perf_counter()
+        times = await asyncio.gather(
+            edit("first", "channel"),
+            edit("second", "channel"),
+            edit("third", "other channel"),
+        )
+        return [finished - start for finished in times]
+
+    first, second, third = asyncio.run(main())
+    assert first < 0.05 and third < 0.05
+    assert second >= 0.09
+    assert sorted(message.edits) == ["first", "second", "third"]
+
+
+def test_failed_edits():
+    """5. A failed edit reaches the caller and the next edit is still sent"""
+    scheduler = EditScheduler()
+    message = Message()
+
+    async def fail():
+        raise RuntimeError("discord is down")
+
+    async def main():
+        with pytest.raises(RuntimeError):
+            await scheduler.edit("message", "route", "a", fail)
+        await scheduler.edit("message", "route", "a", message.editor("a"))
+
+    asyncio.run(main())
+    assert message.edits == ["a"]
+    assert (scheduler.sent, scheduler.errors) == (1, 1)
@@ -0,0 +1,100 @@
+import asyncio
+import time
+import pytest
+from src.ai import get_best_move
+from src.board import Board
+from src.engine_pool import EnginePool
+
+
+@pytest.fixture
+def pool():
+    engine = EnginePool(workers=2, use_processes=False, max_pending=2)
+
+    yield engine
+    engine.shutdown()
+
+
+def test_matches_get_best_move(pool):
+    """1. The pool answers the same move get_best_move does"""
+    board = Board()
+    board.play(0, 0)
+
+    move = asyncio.run(pool.best_move(board, True))
+    assert move == get_best_move(board, True)
+
+
+def test_board_is_not_changed(pool):
+    """2. Asking for a move leaves the board as it was"""
+    board = Board(5, 5, 4)
+    board.play(2, 2)
+    packed = board.pack()
+
+    asyncio.run(pool.best_move(board, True, time_limit=0.1))
+    assert board.pack() == packed
+    assert board.turn == "o"
+    assert board.last_move == (2, 2)
+
+
+def test_pending_is_bounded(pool):
+    """3. No more than max_pending moves are handed to the pool at once"""
+    most_pending = 0
+
+    async def watch():
+        nonlocal most_pending
+        while True:
+            most_pending = max(most_pending, pool.pending)
+            await asyncio.sleep(0)
+
+    async def main():
+        watcher = asyncio.create_task(watch())
+        boards = [Board(5, 5, 4) for _ in range(6)]
+        moves = await asyncio.gather(
+            *(pool.best_move(board, True, time_limit=0.05) for board in boards)
+        )
+        watcher.cancel()
+        return moves
+
+    moves = asyncio.run(main())
+    assert len(moves) == 6
+    assert most_pending == 2
+    assert pool.pending == 0
+
+
+def test_event_loop_keeps_running(pool):
+    """4. The event loop keeps running while the pool searches"""
+    longest_gap = 0
+
+    async def tick():
+        nonlocal longest_gap
+        last = time.perf_counter()
+        while True:
+            await asyncio.sleep(0.01)
+            now = time.perf_counter()
+            longest_gap = max(longest_gap, now - last)
+            last = now
+
+    async def main():
+        ticker = asyncio.create_task(tick())
+        await pool.best_move(Board(7, 7, 5), True, time_limit=0.5)
+        ticker.cancel()
+
+    asyncio.run(main())
+    assert longest_gap < 0.25
+
+
+def test_process_pool():
+    """5. The position gets to a worker process and the move gets back"""
+    engine = EnginePool(workers=1)
+    board = Board()
+    board.play(1, 1)
+
+    try:
+        move = asyncio.run(engine.best_move(board, True))
+        counted_move, stats = asyncio.run(engine.best_move_with_stats(board, False))
+    finally:
+        engine.shutdown()
+
+    assert move in board.available_positions()
+    assert move == get_best_move(board, True)
+    assert counted_move == get_best_move(board, False)
+    assert stats.method == "minimax" and stats.nodes > 0
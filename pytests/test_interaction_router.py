@@ -0,0 +1,85 @@
+import asyncio
+from src.interaction_router import DISPATCH, InteractionRouter
+
+
+def test_click_answers_prompt():
+    """1. A click answers its prompt with the button's value and closes it"""
+    router = InteractionRouter()
+
+    async def main():
+        custom_ids, answer = router.create(["yes", "no"], 1)
+        assert router.pending == 1
+
+        assert router.dispatch(custom_ids["no"], 1) == DISPATCH.RESOLVED
+        assert await router.wait(answer, 1) == "no"
+        assert router.dispatch(custom_ids["yes"], 1) == DISPATCH.NOT_FOUND
+
+    asyncio.run(main())
+    assert router.pending == 0
+
+
+def test_other_users_are_rejected():
+    """2. Only the user asked can answer, unless anyone may"""
+    router = InteractionRouter()
+
+    async def main():
+        custom_ids, answer = router.create(["x", "o"], 1)
+        assert router.dispatch(custom_ids["x"], 2) == DISPATCH.WRONG_USER
+        assert not answer.done()
+        assert router.dispatch(custom_ids["o"], 1) == DISPATCH.RESOLVED
+        assert await router.wait(answer) == "o"
+
+        custom_ids, answer = router.create(["x", "o"])
+        assert router.dispatch(custom_ids["x"], 2) == DISPATCH.RESOLVED
+        assert await router.wait(answer) == "x"
+
+    asyncio.run(main())
+
+
+def test_unanswered_prompts_time_out():
+    """3. A prompt nobody answers gives None and is cleaned up"""
+    router = InteractionRouter()
+
+    async def main():
+        custom_ids, answer = router.create(["yes", "no"], 1)
+        assert await router.wait(answer, 0.01) is None
+        assert router.dispatch(custom_ids["yes"], 1) == DISPATCH.NOT_FOUND
+
+    asyncio.run(main())
+    assert router.pending == 0
+
+
+def test_many_prompts():
+    """4. Every click reaches its own prompt among thousands"""
+    router = InteractionRouter()
+
+    async def main():
+        prompts = [router.create(["a", "b"], user) for user in range(2000)]
+        for user, (custom_ids, _) in enumerate(prompts):
+            value = "ab"[user % 2]
+            assert router.dispatch(custom_ids[value], user) == DISPATCH.RESOLVED
+
+        answers = await asyncio.gather(*(router.wait(answer) for _, answer in prompts))
+        assert answers == ["a", "b"] * 1000
+
+    asyncio.run(main())
+    assert router.pending == 0
+
+
+def test_late_clicks_and_closed_prompts():
+    """5. A click on a prompt that timed out but isn't closed yet, or on
+    one closed without waiting, finds nothing"""
+    router = InteractionRouter()
+
+    async def main():
+        custom_ids, answer = router.create(["yes", "no"], 1)
+        answer.cancel()
+        assert router.dispatch(custom_ids["yes"], 1) == DISPATCH.NOT_FOUND
+        assert router.pending == 1
+
+        router.close(answer)
+        router.close(answer)
+        assert router.dispatch(custom_ids["yes"], 1) == DISPATCH.NOT_FOUND
+
+    asyncio.run(main())
+    assert router.pending == 0
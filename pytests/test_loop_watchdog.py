@@ -0,0 +1,85 @@
+import asyncio
+import sys
+import time
+from src.loop_watchdog import LoopWatchdog, Stall, sample_stack
+from src.metrics import Metrics
+
+
+class Game:
+    async def update(self):
+        await self.start_computer()
+
+    async def start_computer(self):
+        time.sleep(0.3)
+
+
+async def on_reaction_add():
+    await Game().update()
+
+
+def watch(watchdog: LoopWatchdog, blocking):
+    """Runs the watchdog around a coroutine"""
+
+    async def main():
+        watcher = asyncio.create_task(watchdog.run())
+        await asyncio.sleep(0.05)
+        await blocking()
+        await asyncio.sleep(0.05)
+        watcher.cancel()
+
+    asyncio.run(main())
+
+
+def test_stall_is_attributed():
+    """1. A stall is sampled and attributed to the coroutines blocking the loop"""
+    stalls = []
+    watchdog = LoopWatchdog(0.01, 0.1, on_stall=stalls.append)
+    watch(watchdog, on_reaction_add)
+
+    assert watchdog.stall_count == 1 and stalls == list(watchdog.stalls)
+    stall = stalls[0]
+    assert stall.lag >= 0.2
+    assert stall.coroutines[-3:] == (
+        "on_reaction_add",
+        "Game.update",
+        "Game.start_computer",
+    )
+    assert stall.coroutine == "Game.start_computer"
+    assert "time.sleep(0.3)" in stall.stack[-1]
+    assert watchdog.stalls_by_coroutine == {"Game.start_computer": 1}
+
+
+def test_short_pauses_are_not_stalls():
+    """2. Lags under the threshold only count towards the percentiles"""
+    watchdog = LoopWatchdog(0.01, 0.5)
+    assert watchdog.percentiles() == {0.5: 0.0, 0.9: 0.0, 0.99: 0.0}
+
+    async def pause():
+        time.sleep(0.1)
+
+    watch(watchdog, pause)
+    assert watchdog.stall_count == 0 and not watchdog.stalls
+    assert len(watchdog.lags) >= 5
+    percentiles = watchdog.percentiles((0.5, 1.0))
+    assert percentiles[0.5] < 0.05
+    assert 0.05 <= percentiles[1.0] < 0.5
+
+
+def test_callbacks_have_no_coroutine():
+    """3. A stack without coroutines is blamed on no coroutine"""
+    coroutines, stack = sample_stack(sys._getframe())
+    assert coroutines == ()
+    assert "sample_stack(sys._getframe())" in stack[-1]
+    assert Stall(0, 1, coroutines, stack).coroutine is None
+
+
+def test_lag_is_observed():
+    """4. Every heartbeat's lag goes to on_lag, blocking shows up as lag"""
+    metrics = Metrics()
+    lag = metrics.histogram("lag", "Loop lag", (0.05,))
+    watchdog = LoopWatchdog(0.01, 1.0, on_lag=lag.observe)
+    watch(watchdog, on_reaction_add)
+
+    buckets = dict(line.split() for line in metrics.render().splitlines()[2:4])
+    assert int(buckets['lag_bucket{le="+Inf"}']) == lag.count() == len(watchdog.lags)
+    assert int(buckets['lag_bucket{le="0.05"}']) < lag.count()
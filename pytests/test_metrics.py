@@ -0,0 +1,62 @@
+import asyncio
+from src.metrics import Metrics
+
+
+def test_histogram_buckets():
+    """1. A histogram renders cumulative buckets, sum and count for every label set"""
+    metrics = Metrics()
+    latency = metrics.histogram("latency", "How long", (0.1, 1.0), ("difficulty",))
+    for value in (0.05, 0.5, 5.0):
+        latency.observe(value, "hard")
+    latency.observe(0.1, "easy")
+
+    lines = metrics.render().splitlines()
+    assert lines[:2] == ["# HELP latency How long", "# TYPE latency histogram"]
+    assert 'latency_bucket{difficulty="easy",le="0.1"} 1' in lines
+    assert 'latency_bucket{difficulty="hard",le="0.1"} 1' in lines
+    assert 'latency_bucket{difficulty="hard",le="1"} 2' in lines
+    assert 'latency_bucket{difficulty="hard",le="+Inf"} 3' in lines
+    assert 'latency_sum{difficulty="hard"} 5.55' in lines
+    assert 'latency_count{difficulty="hard"} 3' in lines
+    assert latency.count("hard") == 3
+
+
+def test_sampled_metrics_are_read_when_rendered():
+    """2. Gauges and counters show the value their function has when rendered"""
+    metrics = Metrics()
+    games = {}
+    metrics.gauge("games", "Games being played", lambda: len(games))
+    metrics.counter("edits_total", "Edits sent", lambda: 2.0)
+
+    games[1] = "game"
+    text = metrics.render()
+    assert "# TYPE games gauge\ngames 1\n" in text
+    assert "# TYPE edits_total counter\nedits_total 2\n" in text
+
+
+def test_http_endpoint():
+    """3. The metrics are served over HTTP on the running loop"""
+    metrics = Metrics()
+    metrics.gauge("answer", "The answer", lambda: 42)
+
+    async def get(port, target):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"GET {target} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+        response = await reader.read()
+        writer.close()
+        return response.decode()
+
+    async def main():
+        port = await metrics.serve("127.0.0.1", 0)
+        try:
+            return await get(port, "/metrics"), await get(port, "/")
+        finally:
+            metrics.close()
+
+    found, not_found = asyncio.run(main())
+    assert found.startswith("HTTP/1.1 200 OK\r\n")
+    assert "Content-Type: text/plain; version=0.0.4" in found
+    assert found.endswith(
+        "\r\n\r\n# HELP answer The answer\n# TYPE answer gauge\nanswer 42\n"
+    )
+    assert not_found.startswith("HTTP/1.1 404 Not Found\r\n")
@@ -0,0 +1,98 @@
+import asyncio
+import threading
+import time
+import tracemalloc
+from src.profiler import SamplingProfiler, format_size
+
+held = []
+
+
+def spin(seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def allocate():
+    held.append(bytearray(1_000_000))
+
+
+def test_busy_functions_come_first():
+    """1. The function every thread spends its time in tops the report"""
+    profiler = SamplingProfiler(0.005, trace_allocations=False)
+    worker = threading.Thread(target=spin, args=(0.3,))
+
+    profiler.start()
+    worker.start()
+    spin(0.3)
+    worker.join()
+    profiler.stop()
+
+    assert profiler.samples > 0 and len(profiler.threads) >= 2
+    ((code, samples),) = profiler.own.most_common(1)
+    assert code is spin.__code__
+    assert profiler.cumulative[spin.__code__] == samples
+
+    report = profiler.report()
+    assert report.startswith(f"profiled {profiler.elapsed:.1f}s")
+    own = report.split("top functions by own time")[1]
+    assert f"{spin.__code__.co_firstlineno} spin" in own.splitlines()[2]
+    assert "memory" not in report
+
+
+def test_allocations_are_reported():
+    """2. The lines that allocated memory still held are in the report"""
+    profiler = SamplingProfiler(0.005)
+
+    async def main():
+        profiling = asyncio.create_task(profiler.run(0.1))
+        await asyncio.sleep(0)
+        allocate()
+        return await profiling
+
+    report = asyncio.run(main())
+    statistic = profiler.allocations(1)[0]
+    assert statistic.traceback[0].filename == __file__
+    assert statistic.size_diff >= 1_000_000
+    assert f"{__file__}:{allocate.__code__.co_firstlineno + 1}" in report
+    assert not tracemalloc.is_tracing()
+    held.clear()
+
+
+def test_tracing_is_left_as_it_was():
+    """3. Memory tracing already on stays on, and stopping twice does nothing"""
+    tracemalloc.start()
+    try:
+        profiler = SamplingProfiler(0.005)
+        profiler.start()
+        profiler.stop()
+        profiler.stop()
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+    assert format_size(512) == "512 B"
+    assert format_size(3 * 1024 * 1024) == "3.0 MiB"
+
+
+def test_the_loop_runs_while_the_report_is_made():
+    """4. Stopping and the report, which are slow on a big heap, don't
+    block the event loop"""
+
+    class SlowProfiler(SamplingProfiler):
+        def report(self, top: int = 20) -> str:
+            time.sleep(0.3)
+            return super().report(top)
+
+    async def main():
+        profiling = asyncio.create_task(SlowProfiler(0.005).run(0.05))
+        beats = []
+        while not profiling.done():
+            beats.append(time.perf_counter())
+            await asyncio.sleep(0.01)
+        return await profiling, beats
+
+    report, beats = asyncio.run(main())
+    assert report.startswith("profiled")
+    assert beats[-1] - beats[0] >= 0.3
+    assert max(after - before for before, after in zip(beats, beats[1:])) < 0.2
@@ -0,0 +1,40 @@
+from src.board import Board
+from src.render import COMPUTER, EMPTY, PLAYER, render_board
+
+
+def test_render_matches_board():
+    """1. The grid shows every piece and the owners follow the person's side"""
+    board = Board()
+    for move in [(1, 1), (0, 0), (2, 0)]:
+        board.play(*move)
+
+    rendered = render_board(board.pack(), "o")
+    assert rendered.grid == (
+        ":regional_indicator_o: | :blue_square: | :regional_indicator_x:\n"
+        ":blue_square: | :regional_indicator_x: | :blue_square:\n"
+        ":blue_square: | :blue_square: | :blue_square:"
+    )
+    assert rendered.owners == (PLAYER, EMPTY, COMPUTER, EMPTY, COMPUTER) + (EMPTY,) * 4
+    assert render_board(board.pack(), "x").owners[:3] == (COMPUTER, EMPTY, PLAYER)
+
+
+def test_render_bigger_board():
+    """2. Bigger boards render a row for every rank"""
+    board = Board(5, 5, 4)
+    board.play(4, 4)
+
+    rendered = render_board(board.pack(), "x", 5, 5)
+    assert rendered.grid.count("\n") == 4
+    assert rendered.grid.endswith(":regional_indicator_x:")
+    assert rendered.owners == (EMPTY,) * 24 + (PLAYER,)
+
+
+def test_renders_are_cached():
+    """3. Rendering the same position again is a cache hit"""
+    render_board.cache_clear()
+    first = render_board(0b1, "x")
+    second = render_board(0b1, "x")
+
+    assert first is second
+    assert render_board.cache_info().hits == 1
+    assert render_board(0b1, "o") is not first
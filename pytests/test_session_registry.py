@@ -0,0 +1,118 @@
+import asyncio
+import sys
+from src.board import Board, Geometry
+from src.session_registry import SessionRegistry, deep_sizeof
+
+
+class Clock:
+    """A clock that only moves when told to"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_works_like_a_dict():
+    """1. Sessions are added, read, checked and removed like in a dict"""
+    sessions = SessionRegistry()
+    sessions[1] = "a"
+    sessions[2] = "b"
+
+    assert (1 in sessions, 3 in sessions, len(sessions)) == (True, False, 2)
+    assert (sessions[1], sessions.get(3)) == ("a", None)
+    assert list(sessions) == [2, 1]
+
+    del sessions[1]
+    assert list(sessions) == [2]
+    sessions.clear()
+    assert len(sessions) == 0 and sessions.evictions == 0
+
+
+def test_idle_sessions_are_ended():
+    """2. Sweeping ends the sessions idle past the ttl, and reading one keeps it"""
+    clock = Clock()
+    ended = []
+
+    async def on_evict(key, session):
+        ended.append((key, session))
+
+    async def main():
+        sessions = SessionRegistry(ttl=10, on_evict=on_evict, clock=clock)
+        sessions[1] = "a"
+        clock.now = 5
+        sessions[2] = "b"
+        clock.now = 9
+        sessions[1]
+
+        clock.now = 16
+        assert sessions.sweep() == 1
+        await asyncio.sleep(0)
+        assert list(sessions) == [1]
+        return sessions
+
+    sessions = asyncio.run(main())
+    assert ended == [(2, "b")]
+    assert sessions.evictions == 1
+
+
+def test_least_recently_used_is_ended():
+    """3. Adding a session past max_size ends the least recently used one"""
+    ended = []
+
+    async def on_evict(key, session):
+        ended.append(key)
+
+    async def main():
+        sessions = SessionRegistry(max_size=2, on_evict=on_evict)
+        sessions[1] = "a"
+        sessions[2] = "b"
+        sessions[1]
+        sessions[3] = "c"
+        await asyncio.sleep(0)
+        return sessions
+
+    sessions = asyncio.run(main())
+    assert ended == [2]
+    assert list(sessions) == [1, 3]
+    assert sessions.evictions == 1
+
+
+def test_session_size():
+    """4. A session's size counts what it holds but not what it shares"""
+    board = Board()
+    with_geometry = deep_sizeof(board)
+    without_geometry = deep_sizeof(board, (Geometry,))
+    assert with_geometry > without_geometry > sys.getsizeof(board)
+
+    loop = []
+    loop.append(loop)
+    assert deep_sizeof(loop) == sys.getsizeof(loop)
+
+    sessions = SessionRegistry(sizeof=lambda board: deep_sizeof(board, (Geometry,)))
+    assert sessions.approximate_bytes() == 0
+    sessions[1] = board
+    sessions[2] = Board()
+    assert sessions.approximate_bytes() == without_geometry
+
+
+def test_failed_endings_are_logged(caplog):
+    """5. An on_evict that raises is logged instead of lost"""
+
+    async def on_evict(key, session):
+        raise RuntimeError("quit failed")
+
+    async def main():
+        sessions = SessionRegistry(max_size=1, on_evict=on_evict)
+        sessions[1] = "a"
+        sessions[2] = "b"
+        await asyncio.sleep(0)
+
+    with caplog.at_level("ERROR", "src.session_registry"):
+        asyncio.run(main())
+
+    assert [record.getMessage() for record in caplog.records] == [
+        "ending session 1 failed"
+    ]
+    assert caplog.records[0].exc_info[0] is RuntimeError
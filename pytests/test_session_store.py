@@ -0,0 +1,177 @@
+import asyncio
+import sqlite3
+import pytest
+from src.session_store import GameRecord, SessionStore
+
+# the games table before games had a guild
+OLD_SCHEMA = """
+CREATE TABLE games (
+    user_id INTEGER PRIMARY KEY,
+    player_name TEXT NOT NULL,
+    channel_id INTEGER NOT NULL,
+    message_id INTEGER NOT NULL,
+    packed INTEGER NOT NULL,
+    width INTEGER NOT NULL,
+    height INTEGER NOT NULL,
+    k INTEGER NOT NULL,
+    player TEXT NOT NULL,
+    is_hard INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    loses INTEGER NOT NULL,
+    draws INTEGER NOT NULL
+)
+"""
+
+# makes every write of a game fail, like a locked database or a full disk
+FAILING_INSERTS = """
+CREATE TRIGGER fail_inserts BEFORE INSERT ON games
+BEGIN SELECT RAISE(ABORT, 'disk I/O error'); END
+"""
+
+
+def record(user_id: int, packed: int = 0, wins: int = 0) -> GameRecord:
+    return GameRecord(user_id, "player", 10, 20, packed, 3, 3, 3, "x", True, wins, 0, 0)
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "sessions.db")
+
+
+def saved_rows(path: str) -> list:
+    """Reads the games table the way another process would"""
+    connection = sqlite3.connect(path)
+    rows = connection.execute("SELECT user_id, wins FROM games").fetchall()
+    connection.close()
+    return rows
+
+
+def test_round_trip(path):
+    """1. A saved game loads back exactly"""
+    store = SessionStore(path)
+    store.save(record(1, packed=0b1 | 0b10 << 9))
+
+    assert store.load_all() == [record(1, packed=0b1 | 0b10 << 9)]
+    assert store.load_all()[0].is_hard is True
+    store.close()
+
+
+def test_saves_are_written_behind(path):
+    """2. Saves wait to be written together, and only the latest save counts"""
+    store = SessionStore(path)
+    for wins in range(5):
+        store.save(record(1, wins=wins))
+    store.save(record(2))
+
+    assert saved_rows(path) == []
+    assert store.pending == 2
+
+    store.flush()
+    assert sorted(saved_rows(path)) == [(1, 4), (2, 0)]
+    assert (store.pending, store.writes) == (0, 1)
+    store.close()
+
+
+def test_batches_and_deletes(path):
+    """3. A full batch is written at once and deleted games are removed"""
+    store = SessionStore(path, batch_size=2)
+    store.save(record(1))
+    assert saved_rows(path) == []
+    store.save(record(2))
+    assert sorted(saved_rows(path)) == [(1, 0), (2, 0)]
+
+    store.delete(1)
+    store.flush()
+    assert saved_rows(path) == [(2, 0)]
+    store.close()
+
+
+def test_games_survive_restart(path):
+    """4. The games waiting to be written when the store closes are there when it opens"""
+    store = SessionStore(path)
+    store.save(record(7, wins=3))
+    store.close()
+
+    store = SessionStore(path)
+    assert store.load_all() == [record(7, wins=3)]
+    store.close()
+
+
+def test_old_databases_are_migrated(path):
+    """5. A database saved before games were keyed by guild keeps its games"""
+    connection = sqlite3.connect(path)
+    connection.execute(OLD_SCHEMA)
+    connection.execute(
+        "INSERT INTO games VALUES (1, 'p', 1, 2, 0, 3, 3, 3, 'x', 0, 0, 0, 0)"
+    )
+    connection.commit()
+    connection.close()
+
+    store = SessionStore(path)
+    assert store.load_all() == [
+        GameRecord(1, "p", 1, 2, 0, 3, 3, 3, "x", False, 0, 0, 0)
+    ]
+    store.save(record(1)._replace(guild_id=5 << 22))
+    assert [game.guild_id for game in store.load_all()] == [None, 5 << 22]
+
+    store.delete(1)
+    assert store.load_all() == [record(1)._replace(guild_id=5 << 22)]
+    store.close()
+
+
+def test_run_writes_off_the_loop(path):
+    """6. run writes a full batch right away, from a worker thread"""
+    store = SessionStore(path, flush_interval=60, batch_size=2)
+
+    async def main():
+        runner = asyncio.create_task(store.run())
+        await asyncio.sleep(0)
+        store.save(record(1))
+        store.save(record(2))
+        assert saved_rows(path) == []
+
+        for _ in range(100):
+            if store.writes:
+                break
+            await asyncio.sleep(0.01)
+        runner.cancel()
+
+    asyncio.run(main())
+    assert sorted(saved_rows(path)) == [(1, 0), (2, 0)]
+    store.close()
+
+
+def test_failed_writes_are_kept(path, caplog):
+    """7. A batch that fails to write is written by the next flush, behind
+    newer saves, and run logs the failure and keeps going"""
+    store = SessionStore(path, flush_interval=0.01)
+    other = sqlite3.connect(path)
+    other.execute(FAILING_INSERTS)
+    other.commit()
+
+    store.save(record(1))
+    store.save(record(2))
+    with pytest.raises(sqlite3.DatabaseError):
+        store.flush()
+    assert store.pending == 2
+
+    store.save(record(1, wins=3))
+
+    async def main():
+        runner = asyncio.create_task(store.run())
+        while not caplog.records:
+            await asyncio.sleep(0.01)
+
+        other.execute("DROP TRIGGER fail_inserts")
+        other.commit()
+        while store.pending:
+            await asyncio.sleep(0.01)
+        runner.cancel()
+
+    with caplog.at_level("ERROR", "src.session_store"):
+        asyncio.run(main())
+
+    assert caplog.records[0].getMessage() == "writing the saved games failed"
+    assert sorted(saved_rows(path)) == [(1, 3), (2, 0)]
+    other.close()
+    store.close()
@@ -0,0 +1,206 @@
+import random
+import sys
+import pytest
+from src import sharding
+from src.session_store import GameRecord, SessionStore
+from src.sharding import ShardPlan, launch, shard_for
+
+
+class FakeGateway:
+    """Stands in for discord's gateway: every process connects the shards
+    it made its bot with, and every event goes to shard
+    (guild_id >> 22) % shard_count, or shard 0 for direct messages"""
+
+    def __init__(self, shard_count: int):
+        self.shard_count = shard_count
+        self.connections = {}
+
+    def connect(self, bot_options: dict, process: dict):
+        assert bot_options.get("shard_count", 1) == self.shard_count
+        for shard_id in bot_options.get("shard_ids", [0]):
+            assert shard_id not in self.connections, "shard connected twice"
+            self.connections[shard_id] = process
+
+    def dispatch(self, guild_id, user_id: int):
+        shard_id = 0 if guild_id is None else (guild_id >> 22) % self.shard_count
+        self.connections[shard_id][user_id] = guild_id
+
+
+class FakePopen:
+    """Records the processes launch starts instead of starting them"""
+
+    started = []
+    exit_codes = []
+
+    def __init__(self, args: list, env: dict):
+        self.args = args
+        self.env = env
+        self.exit_code = self.exit_codes[len(self.started)]
+        self.started.append(self)
+
+    def wait(self) -> int:
+        return self.exit_code
+
+
+@pytest.fixture
+def popen(monkeypatch):
+    monkeypatch.setattr(sharding.subprocess, "Popen", FakePopen)
+    monkeypatch.setattr(FakePopen, "started", [])
+    monkeypatch.setattr(FakePopen, "exit_codes", [])
+    return FakePopen
+
+
+def guild_id(rng: random.Random) -> int:
+    """Makes up a snowflake like discord's guild ids, which fit in 63 bits"""
+    return rng.getrandbits(41) << 22 | rng.getrandbits(22)
+
+
+def test_shard_for():
+    """1. Guilds go to discord's shard for them and direct messages to shard 0"""
+    assert shard_for(81384788765712384, 16) == (81384788765712384 >> 22) % 16
+    assert shard_for(5 << 22, 4) == 1
+    assert shard_for(None, 4) == 0
+
+
+@pytest.mark.parametrize("process_count, shard_count", [(1, 1), (2, 4), (3, 7)])
+def test_every_shard_runs_once(process_count, shard_count):
+    """2. The processes split the shards between them with none left over"""
+    plans = [
+        ShardPlan(index, process_count, shard_count) for index in range(process_count)
+    ]
+    shard_ids = [shard_id for plan in plans for shard_id in plan.shard_ids]
+
+    assert shard_ids == list(range(shard_count))
+    assert (
+        max(map(len, (plan.shard_ids for plan in plans)))
+        - min(map(len, (plan.shard_ids for plan in plans)))
+        <= 1
+    )
+
+
+def test_launched_processes_partition_games(popen, tmp_path):
+    """3. The processes launch starts make bots whose shards get every
+    game, and each restores only the games the gateway sent it"""
+    popen.exit_codes = [0, 0, 0]
+    assert launch(["bot.py"], 3, 6) == 0
+    assert [process.args for process in popen.started] == [
+        [sys.executable, "bot.py"]
+    ] * 3
+    plans = [ShardPlan.from_env(process.env) for process in popen.started]
+    assert [plan.port(9090) for plan in plans] == [9090, 9091, 9092]
+    assert plans[0].port(0) == 0
+
+    rng = random.Random(0)
+    gateway = FakeGateway(6)
+    processes = [{} for _ in plans]
+    for plan, process in zip(plans, processes):
+        gateway.connect(plan.bot_options(), process)
+
+    guilds = [guild_id(rng) for _ in range(50)] + [None]
+    for user_id in range(3000):
+        gateway.dispatch(rng.choice(guilds), user_id)
+    assert sum(map(len, processes)) == 3000
+    assert all(processes)
+
+    # every process saves the games it was sent, then they all restart
+    path = str(tmp_path / "sessions.db")
+    store = SessionStore(path, batch_size=5000)
+    for process in processes:
+        for user_id, guild in process.items():
+            store.save(
+                GameRecord(user_id, "p", 1, 2, 0, 3, 3, 3, "x", False, 0, 0, 0, guild)
+            )
+    for plan, process in zip(plans, processes):
+        restored = {
+            record.user_id: record.guild_id for record in store.load_all(plan.owns)
+        }
+        assert restored == process
+    store.close()
+
+
+def test_launch_exit_code(popen):
+    """4. launch gives the first process's error, and one process isn't sharded"""
+    popen.exit_codes = [0, 3, 4]
+    assert launch(["bot.py"], 3, 3) == 3
+    assert [process.env["PROCESS_INDEX"] for process in popen.started] == [
+        "0",
+        "1",
+        "2",
+    ]
+    assert ShardPlan.from_env({}).bot_options() == {}
+
+
+def test_restore_only_own_games(tmp_path):
+    """5. Processes sharing a database each restore only their guilds' games"""
+    path = str(tmp_path / "sessions.db")
+    plans = [ShardPlan(index, 2, 4) for index in range(2)]
+    guilds = [shard << 22 for shard in range(4)] + [None]
+
+    store = SessionStore(path)
+    for user_id, guild in enumerate(guilds):
+        store.save(
+            GameRecord(user_id, "p", 1, 2, 0, 3, 3, 3, "x", False, 0, 0, 0, guild)
+        )
+    store.close()
+
+    stores = [SessionStore(path) for _ in plans]
+    restored = [
+        [record.guild_id for record in store.load_all(plan.owns)]
+        for plan, store in zip(plans, stores)
+    ]
+    for store in stores:
+        store.close()
+
+    assert restored == [[0 << 22, 1 << 22, None], [2 << 22, 3 << 22]]
+
+
+def test_plan_from_env():
+    """6. The plan is read from the environment and must give every process a shard"""
+    assert ShardPlan.from_env({}) == ShardPlan(0, 1, 1)
+    plan = ShardPlan.from_env(
+        {"PROCESS_INDEX": "1", "PROCESS_COUNT": "2", "SHARD_COUNT": "8"}
+    )
+    assert plan.shard_ids == (4, 5, 6, 7)
+
+    for env in [
+        {"PROCESS_COUNT": "3", "SHARD_COUNT": "2"},
+        {"PROCESS_INDEX": "2", "PROCESS_COUNT": "2"},
+    ]:
+        with pytest.raises(ValueError):
+            ShardPlan.from_env(env)
+
+
+def test_processes_keep_their_own_games(tmp_path):
+    """7. A user playing in guilds on two processes has a game saved in each"""
+    path = str(tmp_path / "sessions.db")
+    plans = [ShardPlan(index, 2, 4) for index in range(2)]
+    stores = [SessionStore(path) for _ in plans]
+    gateway = FakeGateway(4)
+    processes = [{} for _ in plans]
+    for plan, process in zip(plans, processes):
+        gateway.connect(plan.bot_options(), process)
+
+    # the same user plays in guilds on shard 0 and shard 3
+    for guild in (0 << 22, 3 << 22):
+        gateway.dispatch(guild, 7)
+    for store, process in zip(stores, processes):
+        for user_id, guild in process.items():
+            store.save(
+                GameRecord(user_id, "p", 1, 2, 0, 3, 3, 3, "x", False, 0, 0, 0, guild)
+            )
+        store.flush()
+
+    # a later save and a delete in one process leave the other's game alone
+    first, second = stores
+    saved = first.load_all(plans[0].owns)[0]
+    first.save(saved._replace(wins=1))
+    first.flush()
+    assert second.load_all(plans[1].owns)[0].wins == 0
+
+    first.delete(7, 0 << 22)
+    first.flush()
+    assert first.load_all(plans[0].owns) == []
+    assert [game.guild_id for game in second.load_all(plans[1].owns)] == [3 << 22]
+
+    for store in stores:
+        store.close()
@@ -0,0 +1,68 @@
+from math import inf
+import pytest
+from src.ai import minimax
+from src.board import Board, GAME_STATE
+from src.solution import DEFAULT_PATH, SolutionTable, generate, load_solutions
+from src.transposition import TranspositionTable
+
+
+@pytest.fixture(scope="module")
+def solutions():
+    table = SolutionTable()
+
+    yield table
+    table.close()
+
+
+def reachable_positions(board: Board, seen: set):
+    """Plays every game and yields each position still being played once"""
+    key = (board.x_bits, board.o_bits)
+    if key in seen or board.state == GAME_STATE.GAME_OVER:
+        return
+    seen.add(key)
+    yield board
+
+    for move in board.available_positions():
+        board.play(*move)
+        yield from reachable_positions(board, seen)
+        board.undo()
+
+
+def test_shipped_file_is_up_to_date(tmp_path):
+    """1. The shipped solution file is exactly what the generator writes"""
+    path = tmp_path / "solutions.bin"
+    assert generate(str(path)) == 4520
+
+    with open(DEFAULT_PATH, "rb") as shipped:
+        assert path.read_bytes() == shipped.read()
+
+
+def test_best_moves_are_optimal(solutions):
+    """2. Every stored value and best move matches a full search"""
+    table = TranspositionTable()
+
+    for board in reachable_positions(Board(), set()):
+        value, _ = solutions.lookup(board.x_bits, board.o_bits)
+        assert value == minimax(board, -inf, inf, board.turn == "x", False, table)
+
+        board.play(*solutions.best_move(board))
+        assert value == minimax(board, -inf, inf, board.turn == "x", False, table)
+        board.undo()
+
+
+def test_finished_games_have_no_move(solutions):
+    """3. There is nothing to look up once the game is over"""
+    board = Board()
+    for move in [(0, 0), (1, 0), (0, 1), (1, 1), (0, 2)]:
+        board.play(*move)
+
+    assert solutions.best_move(board) is None
+
+
+def test_invalid_files_are_not_loaded(tmp_path):
+    """4. Missing or corrupt files are ignored"""
+    path = tmp_path / "solutions.bin"
+    assert load_solutions(str(path)) is None
+
+    path.write_bytes(b"not a solution file")
+    assert load_solutions(str(path)) is None
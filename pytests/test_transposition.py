@@ -0,0 +1,105 @@
+from math import inf
+import random
+import sys
+import threading
+import pytest
+from src.ai import get_best_move, minimax
+from src.board import Board
+from src.symmetry import MASK_TABLES, canonical_key
+from src.transposition import TranspositionTable
+
+
+@pytest.fixture()
+def my_table():
+    table = TranspositionTable()
+
+    yield table
+    del table
+
+
+def test_symmetric_positions_share_a_key():
+    """1. All 8 rotations and reflections of a position have the same key"""
+    x_bits, o_bits = 0b000_010_001, 0b100_000_000
+    keys = {canonical_key(table[x_bits], table[o_bits]) for table in MASK_TABLES}
+
+    assert keys == {canonical_key(x_bits, o_bits)}
+    assert canonical_key(x_bits, o_bits) != canonical_key(o_bits, x_bits)
+
+
+def test_exact_and_bound_entries(my_table):
+    """2. Bounds are only used when they settle the search window"""
+    my_table.store(1, 5, -inf, inf)
+    assert my_table.probe(1, 0, 1) == 5
+
+    my_table.store(2, 7, -inf, 6)
+    assert my_table.probe(2, -inf, 6) == 7
+    assert my_table.probe(2, -inf, 10) is None
+
+    my_table.store(3, -4, -2, inf)
+    assert my_table.probe(3, -2, inf) == -4
+    assert my_table.probe(3, -10, inf) is None
+
+    assert my_table.probe(4, -inf, inf) is None
+
+
+def test_size_cap_evicts_least_recently_used():
+    """3. A capped table drops the entry that was used the longest ago"""
+    table = TranspositionTable(max_size=2)
+    table.store(1, 0, -inf, inf)
+    table.store(2, 0, -inf, inf)
+    table.probe(1, -inf, inf)
+    table.store(3, 0, -inf, inf)
+
+    assert len(table) == 2
+    assert 1 in table and 3 in table and 2 not in table
+
+
+@pytest.mark.parametrize(
+    "moves", [[], [(1, 1)], [(0, 0), (1, 1)], [(0, 0), (1, 0), (0, 1), (1, 1)]]
+)
+def test_table_does_not_change_scores(my_table, moves):
+    """4. Searching with a table gives the same scores as without one"""
+    board = Board()
+    for move in moves:
+        board.play(*move)
+
+    for move in board.available_positions():
+        board.play(*move)
+        expected = minimax(board, -inf, inf, board.turn == "x", False)
+        assert minimax(board, -inf, inf, board.turn == "x", False, my_table) == expected
+        board.undo()
+
+    assert get_best_move(board, True, my_table) in board.available_positions()
+    assert len(my_table) > 0
+
+
+def test_threads_can_share_a_capped_table():
+    """5. Threads probing and storing in one capped table never see a
+    key another thread evicted"""
+    table = TranspositionTable(max_size=100)
+    errors = []
+
+    def search(seed):
+        rng = random.Random(seed)
+        try:
+            for _ in range(50000):
+                key = rng.randrange(300)
+                if table.probe(key, -inf, inf) is None:
+                    table.store(key, 0, -inf, inf)
+        except Exception as error:
+            errors.append(error)
+
+    interval = sys.getswitchinterval()
+    # switch threads as often as possible, to land between two steps
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=search, args=(seed,)) for seed in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert errors == []
+    assert len(table) == 100
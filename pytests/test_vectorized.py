@@ -0,0 +1,67 @@
+import pytest
+from src.board import Board, GAME_STATE
+
+np = pytest.importorskip("numpy")
+from src.vectorized import LINE_MATRIX, O, X, classify, from_boards, from_packed
+from src.vectorized import legal_moves
+
+
+@pytest.fixture(scope="module")
+def reachable_boards():
+    boards = {}
+
+    def visit(board):
+        key = board.pack()
+        if key in boards:
+            return
+        boards[key] = Board.from_packed(key)
+
+        if board.state == GAME_STATE.PLAYING:
+            for move in board.available_positions():
+                board.play(*move)
+                visit(board)
+                board.undo()
+
+    visit(Board())
+    return list(boards.values())
+
+
+def test_line_matrix_covers_every_line():
+    """1. The line matrix has a row of three ones for each of the 8 lines"""
+    assert LINE_MATRIX.shape == (8, 9)
+    assert (LINE_MATRIX.sum(axis=1) == 3).all()
+    assert (LINE_MATRIX.sum(axis=0) == [3, 2, 3, 2, 4, 2, 3, 2, 3]).all()
+
+
+def test_classify_matches_check_state(reachable_boards):
+    """2. Every reachable position gets the winner and state check_state gives"""
+    positions = from_boards(reachable_boards)
+    winners, states = classify(positions)
+    moves = legal_moves(positions)
+
+    assert len(reachable_boards) == 5478
+    for board, winner, state, legal in zip(reachable_boards, winners, states, moves):
+        board.check_state()
+        assert {"x": X, "o": O, None: 0}[board.winner] == winner
+        assert board.state.value == state
+
+        expected = [False] * 9
+        if board.state == GAME_STATE.PLAYING:
+            for file, rank in board.available_positions():
+                expected[file + rank * 3] = True
+        assert legal.tolist() == expected
+
+
+def test_packed_positions_and_bigger_boards(reachable_boards):
+    """3. Packed positions and other board sizes classify the same way"""
+    packed = [board.pack() for board in reachable_boards]
+    assert (from_packed(packed) == from_boards(reachable_boards)).all()
+
+    board = Board(5, 5, 4)
+    for move in [(0, 0), (0, 1), (1, 0), (1, 1), (2, 0), (2, 1), (3, 0)]:
+        board.play(*move)
+    winners, states = classify(from_packed([board.pack()], 25), 5, 5, 4)
+    assert (winners[0], states[0]) == (X, GAME_STATE.GAME_OVER.value)
+
+    with pytest.raises(ValueError):
+        from_packed([0], 49)
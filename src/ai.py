@@ -1,58 +1,245 @@
-"""This module contains functions that help run the ai of tik tak toe"""
+"""This module contains functions that help run the ai of tik tak toe
 
+3x3 games are solved outright. Bigger boards can't be, so they are
+searched a few moves ahead and the positions at the horizon are scored by
+counting the lines each side still has a chance to complete.
+"""
+
+import time
 from math import inf
-from .board import Board, GAME_STATE
+from typing import NamedTuple, Optional
+from .board import Board, BoardSnapshot, GAME_STATE
+from .solution import load_solutions
+from .symmetry import canonical_key, unique_moves
+from .transposition import TranspositionTable
+from .utils import PlayingAfterGameOverError, SearchBudgetExceededError
+
+# shared by every hard 3x3 search so positions solved once are never searched again
+TRANSPOSITION_TABLE = TranspositionTable()
+
+# the shared tables of every board size, keyed by (width, height, k)
+TRANSPOSITION_TABLES = {(3, 3, 3): TRANSPOSITION_TABLE}
+
+# the most entries kept for a board size other than 3x3
+LARGE_TABLE_SIZE = 500_000
+
+# the precomputed perfect play, None if src/solutions.bin hasn't been generated
+SOLUTION_TABLE = load_solutions()
+
+# how many moves ahead easy and hard mode look on boards bigger than 3x3
+SEARCH_DEPTHS = {False: 1, True: 6}
+
+# how many nodes a search with a budget visits between checking the clock
+BUDGET_CHECK_INTERVAL = 256
+
+
+class SearchStats:
+    """What a search did, filled in by get_best_move when it is given one.
+    Searches without one don't count anything but nodes, so pass a new
+    SearchStats for every move you want to know about
+
+    Attributes:
+        method (str): how the move was found, "solution table", "minimax",
+            "negamax" or "iterative deepening"
+        nodes (int): the positions visited, the root included
+        leaves (int): the positions scored without searching further
+        cutoffs (int): the alpha beta cutoffs
+        cache_hits (int): the positions answered by the transposition table
+        cache_misses (int): the positions the transposition table couldn't answer
+        max_depth (int): the most moves played past the root
+        elapsed (float): the seconds the whole search took
+        root_moves (dict): the seconds spent on each root move, added up
+            over every iteration of an iterative deepening search
+    """
+
+    def __init__(self):
+        self.method = None
+        self.nodes = 0
+        self.leaves = 0
+        self.cutoffs = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.max_depth = 0
+        self.elapsed = 0.0
+        self.root_moves = {}
+
+    def __repr__(self):
+        return (
+            f"SearchStats(method={self.method!r}, nodes={self.nodes},"
+            f" leaves={self.leaves}, cutoffs={self.cutoffs},"
+            f" cache_hits={self.cache_hits}, cache_misses={self.cache_misses},"
+            f" max_depth={self.max_depth}, elapsed={self.elapsed:.4f})"
+        )
+
+
+class SearchResult(NamedTuple):
+    """The outcome of an iterative deepening search"""
 
+    move: tuple
+    score: float
+    depth: int
+    nodes: int
 
-def evaluate_board(board: Board) -> int:
+
+def evaluate_board(board: Board, depth: Optional[int] = None) -> int:
     """Evaluate the state of the board. THe larger the evaluation
     the better the position
 
     Args:
         board (Board): the board to evaluate
-        depth (int): the depth of the game
-        is_x (bool): if the current player is x
+        depth (int, optional): the depth of the game. Defaults to board.depth
 
     Returns:
         int: the evaluation for the board
     """
 
-    board.check_state()
+    if depth is None:
+        depth = board.depth
 
+    win_score = board.geometry.win_score
     score = 0
 
     if board.winner == "x":
-        score = 20 - board.depth
+        score = win_score - depth
     elif board.winner == "o":
-        score = -20 + board.depth
+        score = -win_score + depth
 
     return score
 
 
+def count_lines(board: Board) -> int:
+    """Scores a position that is still being played, from the side to move,
+    by counting the lines only one side has played on. Every such line is
+    worth 4 ** pieces - 1 to its side, so nearly complete lines count the
+    most and the score stays well below a win.
+
+    A line one move from complete is scored as the win it is when it
+    belongs to the side to move, and so are two of them for the opponent
+    since only one can be blocked
+
+    Args:
+        board (Board): the board to evaluate
+
+    Returns:
+        int: the evaluation for the board, positive when the side to move is better
+    """
+    if board.turn == "x":
+        own_bits, other_bits = board.x_bits, board.o_bits
+    else:
+        own_bits, other_bits = board.o_bits, board.x_bits
+
+    geometry = board.geometry
+    almost = geometry.k - 1
+    threats = 0
+    score = 0
+
+    for mask in geometry.win_masks:
+        own_count = (own_bits & mask).bit_count()
+        other_count = (other_bits & mask).bit_count()
+        if not other_count:
+            if own_count == almost:
+                return geometry.win_score - board.depth - 1
+            score += (1 << (2 * own_count)) - 1
+        elif not own_count:
+            if other_count == almost:
+                threats |= mask & ~other_bits
+            score -= (1 << (2 * other_count)) - 1
+
+    if threats & (threats - 1):
+        return -geometry.win_score + board.depth + 2
+    return score
+
+
+def candidate_squares(board: Board) -> int:
+    """Gets the squares worth searching. On 3x3 that is every square, on
+    bigger boards only the empty squares next to a piece, or every square
+    before the first move
+
+    Args:
+        board (Board): the board to get the squares for
+
+    Returns:
+        int: the bitboard of the candidate squares
+    """
+    occupied = board.x_bits | board.o_bits
+    if board.size <= 9 or not occupied:
+        return board.empty_bits
+
+    neighbours = board.geometry.neighbours
+    candidates = 0
+    while occupied:
+        square = (occupied & -occupied).bit_length() - 1
+        candidates |= neighbours[square]
+        occupied &= occupied - 1
+
+    return candidates & board.empty_bits
+
+
+def transposition_table(board: Board) -> TranspositionTable:
+    """Gets the shared transposition table for the size of the board"""
+    variant = (board.width, board.height, board.k)
+    if variant not in TRANSPOSITION_TABLES:
+        TRANSPOSITION_TABLES[variant] = TranspositionTable(LARGE_TABLE_SIZE)
+    return TRANSPOSITION_TABLES[variant]
+
+
 def minimax(
-    board: Board, alpha, beta, is_maximizing_player: bool, should_prune: bool
+    board: Board,
+    alpha,
+    beta,
+    is_maximizing_player: bool,
+    should_prune: bool,
+    table: Optional[TranspositionTable] = None,
+    stats: Optional[SearchStats] = None,
 ) -> float:
     """This is the minimax function that recursively plays
     and evaluates board posiitons to find the best position.
     it then return te score for the best position.
 
+    It is the search behind easy mode on 3x3. When should_prune is set a
+    cut off node returns its static score instead of a bound, which is what
+    lets easy mode make mistakes. Hard mode uses negamax instead.
+
     Args:
         board (Board): the board to be minimized
         is_maximizing_player (bool): checks whether to minimize or maximize the player
+        table (TranspositionTable, optional): remembers the scores of searched
+            positions. Cut off nodes return the static score rather than a
+            bound, so only pass a table when should_prune is False.
+        stats (SearchStats, optional): counts what the search does, with
+            max_depth counted from the start of the game. Defaults to None.
 
     Returns:
         int: the final score for the position
     """
     score = evaluate_board(board)
 
+    if stats is not None:
+        stats.nodes += 1
+        stats.max_depth = max(stats.max_depth, board.depth)
+
     if board.winner is not None or board.state == GAME_STATE.GAME_OVER:
+        if stats is not None:
+            stats.leaves += 1
         return score
 
+    if table is not None:
+        key = canonical_key(board.x_bits, board.o_bits)
+        cached = table.probe(key, alpha, beta)
+        if stats is not None:
+            if cached is None:
+                stats.cache_misses += 1
+            else:
+                stats.cache_hits += 1
+        if cached is not None:
+            return cached
+        window = (alpha, beta)
+
     if is_maximizing_player:
         best_val = -inf
         for move in board.available_positions():
             board.play(*move)
-            evaluation = minimax(board, alpha, beta, False, should_prune)
+            evaluation = minimax(board, alpha, beta, False, should_prune, table, stats)
             board.undo()
 
             best_val = max(best_val, evaluation)
@@ -60,14 +247,15 @@ def minimax(
             if should_prune:
                 alpha = max(alpha, evaluation)
                 if beta <= alpha:
+                    if stats is not None:
+                        stats.cutoffs += 1
                     return score
-        return best_val
 
     else:
         best_val = inf
         for move in board.available_positions():
             board.play(*move)
-            evaluation = minimax(board, alpha, beta, True, should_prune)
+            evaluation = minimax(board, alpha, beta, True, should_prune, table, stats)
             board.undo()
 
             best_val = min(best_val, evaluation)
@@ -75,26 +263,421 @@ def minimax(
             if should_prune:
                 beta = min(beta, evaluation)
                 if beta <= alpha:
+                    if stats is not None:
+                        stats.cutoffs += 1
                     return score
-        return best_val
 
+    if table is not None:
+        table.store(key, best_val, *window)
+    return best_val
+
+
+class SearchContext:
+    """Everything a single negamax search keeps between nodes: the
+    transposition table, the move ordering heuristics and the node count
+    """
+
+    # the SearchStats a CountingSearchContext fills in
+    stats = None
+
+    def __init__(
+        self,
+        table: Optional[TranspositionTable] = None,
+        deadline: Optional[float] = None,
+        node_limit: Optional[int] = None,
+    ):
+        self.table = table
+        self.nodes = 0
+        self.history = {}
+        self.killers = {}
+
+        # the best root square of the last finished iteration, searched first
+        self.best_square = None
+
+        # time.perf_counter() value and node count the search has to stop at
+        self.deadline = deadline
+        self.node_limit = node_limit
+        self.check_at = inf if deadline is None and node_limit is None else 0
+
+    def check_budget(self):
+        """Stops the search once it is out of time or nodes. negamax calls
+        this whenever nodes reaches check_at
+
+        Raises:
+            SearchBudgetExceededError: It is raised when the budget is spent
+        """
+        if self.node_limit is not None and self.nodes >= self.node_limit:
+            raise SearchBudgetExceededError()
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            raise SearchBudgetExceededError()
+
+        self.check_at = self.nodes + BUDGET_CHECK_INTERVAL
+        if self.node_limit is not None:
+            self.check_at = min(self.check_at, self.node_limit)
+
+    def ordered_moves(self, board: Board, squares: Optional[list] = None) -> list:
+        """Orders the candidate squares so the likely best moves come first:
+        the killer move for this depth, then by history score, then the
+        squares on the most lines (on 3x3 the center, corners, edges)
+
+        Args:
+            board (Board): the board to order the moves for
+            squares (list, optional): the squares to consider. Defaults to
+                the candidate_squares of the board.
+
+        Returns:
+            list: the squares to play on in order
+        """
+        if squares is None:
+            candidates = candidate_squares(board)
+            squares = board.geometry.move_order
+        else:
+            candidates = board.empty_bits
 
-def get_best_move(board: Board, is_hard: bool = False) -> tuple:
-    """Gets the best move for a given board
+        moves = [square for square in squares if candidates & (1 << square)]
+        if self.history:
+            moves.sort(key=lambda square: self.history.get(square, 0), reverse=True)
+
+        killer = self.killers.get(board.depth)
+        if killer in moves:
+            moves.remove(killer)
+            moves.insert(0, killer)
+
+        return moves
+
+    def record_cutoff(self, board: Board, square: int):
+        """Remembers a move that caused a beta cutoff"""
+        bonus = 1 << (board.size - board.depth)
+        self.history[square] = self.history.get(square, 0) + bonus
+        self.killers[board.depth] = square
+
+
+class CountingTable:
+    """Wraps a transposition table to count how often it answers a search"""
+
+    def __init__(self, table: TranspositionTable, stats: SearchStats):
+        self.table = table
+        self.stats = stats
+
+    def probe(
+        self, key: int, alpha: float, beta: float, depth: float = 0
+    ) -> Optional[float]:
+        """Looks up a position like TranspositionTable.probe, counting a hit or miss"""
+        value = self.table.probe(key, alpha, beta, depth)
+        if value is None:
+            self.stats.cache_misses += 1
+        else:
+            self.stats.cache_hits += 1
+        return value
+
+    def store(self, *args):
+        """Stores a result like TranspositionTable.store"""
+        self.table.store(*args)
+
+
+class CountingSearchContext(SearchContext):
+    """A SearchContext that fills in a SearchStats as it is searched.
+
+    negamax itself only counts nodes. Every other count comes from the
+    hooks it already calls, ordered_moves for every position it searches
+    further and record_cutoff for every cutoff, and from a CountingTable,
+    so searches with a plain SearchContext don't pay for any of it.
+    Call finish once the search is over to fill in nodes and leaves.
+    """
+
+    def __init__(
+        self,
+        stats: SearchStats,
+        table: Optional[TranspositionTable] = None,
+        deadline: Optional[float] = None,
+        node_limit: Optional[int] = None,
+    ):
+        if table is not None:
+            table = CountingTable(table, stats)
+        super().__init__(table, deadline, node_limit)
+
+        self.stats = stats
+        self.searched = 0
+        self.root_depth = None
+
+    def ordered_moves(self, board: Board, squares: Optional[list] = None) -> list:
+        if self.root_depth is None:
+            self.root_depth = board.depth
+        self.searched += 1
+        self.stats.max_depth = max(
+            self.stats.max_depth, board.depth - self.root_depth + 1
+        )
+        return super().ordered_moves(board, squares)
+
+    def record_cutoff(self, board: Board, square: int):
+        self.stats.cutoffs += 1
+        super().record_cutoff(board, square)
+
+    def finish(self):
+        """Fills in the nodes and leaves, the nodes that were neither
+        searched further nor answered by the table"""
+        self.stats.nodes = self.nodes
+        self.stats.leaves = self.nodes - self.searched - self.stats.cache_hits
+
+
+def negamax(
+    board: Board,
+    alpha: float,
+    beta: float,
+    context: SearchContext,
+    depth: float = inf,
+) -> float:
+    """Alpha beta search scored from the side to move. The returned value is
+    exact inside the (alpha, beta) window, an upper bound when it is at most
+    alpha and a lower bound when it is at least beta
+
+    Args:
+        board (Board): the board to search
+        alpha (float): the score the side to move is already guaranteed
+        beta (float): the score the opponent is already guaranteed
+        context (SearchContext): the state shared by the whole search
+        depth (float, optional): how many more moves to look ahead before
+            scoring the position with count_lines. Defaults to inf.
+
+    Returns:
+        float: the score of the position for the side to move
+    """
+    context.nodes += 1
+    if context.nodes >= context.check_at:
+        context.check_budget()
+
+    if board.state == GAME_STATE.GAME_OVER:
+        return evaluate_board(board) * (1 if board.turn == "x" else -1)
+    if depth <= 0:
+        return count_lines(board)
+
+    table = context.table
+    if table is not None:
+        key = board.geometry.symmetries.canonical_key(board.x_bits, board.o_bits)
+        cached = table.probe(key, alpha, beta, depth)
+        if cached is not None:
+            return cached
+
+    original_alpha = alpha
+    best_val = -inf
+    width = board.width
+
+    for square in context.ordered_moves(board):
+        board.play(square % width, square // width)
+        value = -negamax(board, -beta, -alpha, context, depth - 1)
+        board.undo()
+
+        if value > best_val:
+            best_val = value
+            if value > alpha:
+                alpha = value
+                if alpha >= beta:
+                    context.record_cutoff(board, square)
+                    break
+
+    if table is not None:
+        table.store(key, best_val, original_alpha, beta, depth)
+    return best_val
+
+
+def search_best_move(
+    board: Board, context: Optional[SearchContext] = None, depth: float = inf
+) -> tuple:
+    """Finds the best move with negamax, only searching moves that are
+    distinct up to the symmetries of the position
+
+    Args:
+        board (Board): the board to check
+        context (SearchContext, optional): the search state, which also holds
+            the node count afterwards. Pass a CountingSearchContext to also
+            time every root move. Defaults to a context using the shared
+            transposition table for the board size.
+        depth (float, optional): how many moves ahead to look. Defaults to inf.
+
+    Returns:
+        tuple: the best move and its score for the side to move
+    """
+    if context is None:
+        context = SearchContext(transposition_table(board))
+
+    context.nodes += 1
+    width = board.width
+    moves = board.geometry.symmetries.unique_moves(
+        board.x_bits, board.o_bits, candidate_squares(board)
+    )
+    squares = context.ordered_moves(
+        board, [file + rank * width for file, rank in moves]
+    )
+    if context.best_square in squares:
+        squares.remove(context.best_square)
+        squares.insert(0, context.best_square)
+
+    alpha = -inf
+    best_move = (-1, -1)
+    stats = context.stats
+
+    for square in squares:
+        if stats is not None:
+            started = time.perf_counter()
+
+        board.play(square % width, square // width)
+        value = -negamax(board, -inf, -alpha, context, depth - 1)
+        board.undo()
+
+        if stats is not None:
+            move = (square % width, square // width)
+            stats.root_moves[move] = (
+                stats.root_moves.get(move, 0.0) + time.perf_counter() - started
+            )
+
+        if value > alpha:
+            alpha = value
+            best_move = (square % width, square // width)
+
+    return best_move, alpha
+
+
+def iterative_deepening(
+    board: Board,
+    time_limit: Optional[float] = None,
+    node_limit: Optional[int] = None,
+    max_depth: Optional[int] = None,
+    table: Optional[TranspositionTable] = None,
+    stats: Optional[SearchStats] = None,
+) -> SearchResult:
+    """Searches one move deeper at a time until the time or node budget
+    runs out, and returns the result of the deepest search that finished.
+    Every iteration starts with the best move of the one before, and the
+    transposition table keeps what the earlier iterations found.
+
+    Args:
+        board (Board): the board to check
+        time_limit (float, optional): the seconds the search may take. Defaults to None.
+        node_limit (int, optional): the nodes the search may visit. Defaults to None.
+        max_depth (int, optional): the deepest search to run. Defaults to
+            searching until the board is full.
+        table (TranspositionTable, optional): the table to use. Defaults to
+            the shared table for the board size.
+        stats (SearchStats, optional): counts what the search does. Defaults to None.
+
+    Returns:
+        SearchResult: the best move found, with depth 0 if not even a one
+        move search finished in time
+    """
+    if table is None:
+        table = transposition_table(board)
+    if max_depth is None:
+        max_depth = board.size - board.depth
+
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+    if stats is None:
+        context = SearchContext(table, deadline, node_limit)
+    else:
+        stats.method = "iterative deepening"
+        context = CountingSearchContext(stats, table, deadline, node_limit)
+    start_depth = board.depth
+
+    # a fresh context orders the moves the same, without counting it as a node
+    fallback = SearchContext().ordered_moves(board)[0]
+    result = SearchResult((fallback % board.width, fallback // board.width), 0, 0, 0)
+
+    for depth in range(1, max_depth + 1):
+        try:
+            move, score = search_best_move(board, context, depth)
+        except SearchBudgetExceededError:
+            # put back the moves the interrupted search had played
+            while board.depth > start_depth:
+                board.undo()
+            break
+
+        result = SearchResult(move, score, depth, context.nodes)
+        context.best_square = move[0] + move[1] * board.width
+
+    if stats is not None:
+        context.finish()
+    return result
+
+
+def get_best_move(
+    board: Board,
+    is_hard: bool = False,
+    table: Optional[TranspositionTable] = None,
+    time_limit: Optional[float] = None,
+    node_limit: Optional[int] = None,
+    stats: Optional[SearchStats] = None,
+) -> tuple:
+    """Gets the best move for a given board. Hard 3x3 moves are looked up
+    in the SOLUTION_TABLE when it is loaded and searched otherwise. Bigger
+    boards are searched up to SEARCH_DEPTHS moves ahead, deepening one
+    move at a time while the budget lasts
 
     Args:
         board (Board): the board to check
+        is_hard (bool, optional): plays perfectly on 3x3 when true. Defaults to False.
+        table (TranspositionTable, optional): the table hard searches use.
+            Defaults to the shared table for the board size.
+        time_limit (float, optional): the seconds a search on a bigger board
+            may take. Defaults to None.
+        node_limit (int, optional): the nodes a search on a bigger board may
+            visit. Defaults to None.
+        stats (SearchStats, optional): filled in with what the search did.
+            Defaults to None, which counts nothing.
 
     Returns:
         tuple: the positions of the best move
     """
+    if stats is None:
+        return _get_best_move(board, is_hard, table, time_limit, node_limit, None)
+
+    started = time.perf_counter()
+    best_move = _get_best_move(board, is_hard, table, time_limit, node_limit, stats)
+    stats.elapsed = time.perf_counter() - started
+    return best_move
+
+
+def _get_best_move(board, is_hard, table, time_limit, node_limit, stats) -> tuple:
+    """Finds the move for get_best_move"""
+    if not board.geometry.is_classic:
+        return iterative_deepening(
+            board, time_limit, node_limit, SEARCH_DEPTHS[is_hard], table, stats
+        ).move
+
+    if is_hard:
+        if SOLUTION_TABLE is not None:
+            best_move = SOLUTION_TABLE.best_move(board)
+            if best_move is not None:
+                if stats is not None:
+                    stats.method = "solution table"
+                return best_move
+
+        if table is None:
+            table = TRANSPOSITION_TABLE
+        if stats is None:
+            return search_best_move(board, SearchContext(table))[0]
+
+        stats.method = "negamax"
+        context = CountingSearchContext(stats, table)
+        best_move = search_best_move(board, context)[0]
+        context.finish()
+        return best_move
+
     best_val = -1000
     best_move = (-1, -1)
     sign = 1 if board.turn == "x" else -1
 
-    for move in board.available_positions():
+    if stats is not None:
+        stats.method = "minimax"
+        stats.nodes += 1
+        max_depth = stats.max_depth
+        stats.max_depth = board.depth
+
+    # moves that are the same up to a symmetry of the position have the same value
+    for move in unique_moves(board.x_bits, board.o_bits):
+        if stats is not None:
+            started = time.perf_counter()
+
         board.play(*move)
-        value = minimax(board, -inf, inf, board.turn == "x", not is_hard) * sign
+        value = minimax(board, -inf, inf, board.turn == "x", True, stats=stats) * sign
         is_best_val = value >= best_val
 
         if is_best_val:
@@ -103,4 +686,95 @@ def get_best_move(board: Board, is_hard: bool = False) -> tuple:
 
         board.undo()
 
+        if stats is not None:
+            stats.root_moves[move] = time.perf_counter() - started
+
+    if stats is not None:
+        # minimax counts the depth from the start of the game
+        stats.max_depth = max(max_depth, stats.max_depth - board.depth)
     return best_move
+
+
+def get_best_moves(
+    positions,
+    is_hard: bool = False,
+    time_limit: Optional[float] = None,
+    node_limit: Optional[int] = None,
+) -> list:
+    """Gets the best move for many positions at once. Positions that are
+    the same, or the same up to a rotation or reflection, are only solved
+    once and the move is turned back to fit each of them
+
+    Args:
+        positions (iterable): Boards, BoardSnapshots, or 3x3 positions
+            packed with Board.pack
+        is_hard (bool, optional): plays perfectly on 3x3 when true. Defaults to False.
+        time_limit (float, optional): the seconds each distinct position on a
+            bigger board may take. Defaults to None.
+        node_limit (int, optional): the nodes each distinct position on a
+            bigger board may visit. Defaults to None.
+
+    Raises:
+        PlayingAfterGameOverError: It is raised when a position is already over
+
+    Returns:
+        list: the best move for every position, in the same order
+    """
+    # keyed by the exact position and by the canonical position
+    exact_moves = {}
+    canonical_moves = {}
+    best_moves = []
+
+    for position in positions:
+        if isinstance(position, Board):
+            board = position
+            exact_key = (board.width, board.height, board.k, board.pack())
+        elif isinstance(position, BoardSnapshot):
+            board = None
+            exact_key = (position.width, position.height, position.k, position.packed)
+        else:
+            board = None
+            exact_key = (3, 3, 3, position)
+
+        move = exact_moves.get(exact_key)
+        if move is not None:
+            best_moves.append(move)
+            continue
+
+        if board is None:
+            width, height, k, packed = exact_key
+            board = Board.from_packed(packed, width, height, k)
+        if board.state == GAME_STATE.GAME_OVER:
+            raise PlayingAfterGameOverError()
+
+        if is_hard and SOLUTION_TABLE is not None and board.geometry.is_classic:
+            # a lookup is cheaper than finding the canonical position
+            move = get_best_move(board, True)
+        else:
+            move = _best_canonical_move(
+                board, is_hard, time_limit, node_limit, canonical_moves
+            )
+
+        exact_moves[exact_key] = move
+        best_moves.append(move)
+
+    return best_moves
+
+
+def _best_canonical_move(board, is_hard, time_limit, node_limit, solved) -> tuple:
+    """Gets the best move for the canonical copy of the board, solving it
+    if it isn't in solved yet, and turns the move back to fit the board"""
+    symmetries = board.geometry.symmetries
+    key, transform = symmetries.canonical_transform(board.x_bits, board.o_bits)
+    variant = (board.width, board.height, board.k)
+
+    move = solved.get((variant, key))
+    if move is None:
+        canonical = Board.from_packed(key, *variant)
+        move = get_best_move(
+            canonical, is_hard, time_limit=time_limit, node_limit=node_limit
+        )
+        solved[(variant, key)] = move
+
+    square = symmetries.inverse_transforms[transform][move[0] + move[1] * board.width]
+    return square % board.width, square // board.width
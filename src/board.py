@@ -1,8 +1,16 @@
 """This module contains the board class containing the logic and commands
 to use the board
+
+The position is stored as two bitboards, one integer per side.
+Square ``file + rank * width`` maps to bit ``1 << (file + rank * width)``,
+which is the same index the bot uses for its buttons. Boards default to
+3x3 with 3 in a row but any width, height and k are supported.
 """
 
 from enum import Enum
+from functools import lru_cache
+from typing import NamedTuple
+from src.symmetry import get_symmetries
 from src.utils import *
 
 
@@ -13,18 +21,174 @@ class GAME_STATE(Enum):
     GAME_OVER = 0
 
 
+# the variants the bot offers, as (width, height, k)
+VARIANTS = {
+    "3x3": (3, 3, 3),
+    "4x4": (4, 4, 4),
+    "5x5": (5, 5, 4),
+    "7x7": (7, 7, 5),
+}
+
+# the (file, rank) steps a line can be made along
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (-1, 1))
+
+
+class Geometry:
+    """Everything about a board size that never changes: the win masks,
+    the lines through every square and the square orders. Get them with
+    get_geometry so every board of the same size shares one instance
+    """
+
+    def __init__(self, width: int, height: int, k: int):
+        if width < 1 or height < 1 or not 1 <= k <= max(width, height):
+            raise ValueError(f"can't get {k} in a row on a {width}x{height} board")
+
+        self.width = width
+        self.height = height
+        self.k = k
+        self.size = width * height
+        self.full_board = (1 << self.size) - 1
+        self.is_classic = (width, height, k) == (3, 3, 3)
+
+        # 3x3 keeps the scores it always had, bigger boards need room for
+        # the heuristic evaluation below a win
+        self.win_score = 20 if self.size <= 9 else 1_000_000
+
+        self.win_masks = tuple(
+            sum(
+                1 << (file + step * d_file + (rank + step * d_rank) * width)
+                for step in range(k)
+            )
+            for d_file, d_rank in DIRECTIONS
+            for file in range(width)
+            for rank in range(height)
+            if 0 <= file + (k - 1) * d_file < width and rank + (k - 1) * d_rank < height
+        )
+
+        # (file, rank, bit) in the order available_positions has always used
+        self.squares = tuple(
+            (file, rank, 1 << (file + rank * width))
+            for file in range(width)
+            for rank in range(height)
+        )
+
+        # the win masks going through each square, indexed by file + rank * width
+        self.lines_through = tuple(
+            tuple(mask for mask in self.win_masks if mask & (1 << square))
+            for square in range(self.size)
+        )
+
+        # the squares on the most lines first, which for 3x3 is the center,
+        # then the corners, then the edges
+        self.move_order = tuple(
+            sorted(
+                range(self.size), key=lambda square: -len(self.lines_through[square])
+            )
+        )
+
+        self.symmetries = get_symmetries(width, height)
+
+        # the squares touching each square, including diagonally
+        self.neighbours = tuple(
+            sum(
+                1 << (file + d_file + (rank + d_rank) * width)
+                for d_file in (-1, 0, 1)
+                for d_rank in (-1, 0, 1)
+                if (d_file or d_rank)
+                and 0 <= file + d_file < width
+                and 0 <= rank + d_rank < height
+            )
+            for rank in range(height)
+            for file in range(width)
+        )
+
+
+@lru_cache(maxsize=None)
+def get_geometry(width: int = 3, height: int = 3, k: int = 3) -> Geometry:
+    """Gets the shared Geometry for a board size"""
+    return Geometry(width, height, k)
+
+
+CLASSIC = get_geometry()
+FULL_BOARD = CLASSIC.full_board
+WIN_MASKS = CLASSIC.win_masks
+SQUARES = CLASSIC.squares
+LINES_THROUGH = CLASSIC.lines_through
+
+
+def winner_of(x_bits: int, o_bits: int, win_masks: tuple = WIN_MASKS):
+    """Finds the side that has completed a line
+
+    Args:
+        x_bits (int): the squares taken by x
+        o_bits (int): the squares taken by o
+        win_masks (tuple, optional): the lines to check. Defaults to the 3x3 lines.
+
+    Returns:
+        str | None: "x", "o" or None if no line is complete
+    """
+    for mask in win_masks:
+        if x_bits & mask == mask:
+            return "x"
+        if o_bits & mask == mask:
+            return "o"
+    return None
+
+
+class BoardSnapshot(NamedTuple):
+    """An immutable copy of a position made by Board.snapshot. It is a
+    handful of ints and a string, so it is cheap to send to a worker and
+    can be used as a dict key"""
+
+    packed: int
+    turn: str
+    width: int = 3
+    height: int = 3
+    k: int = 3
+
+
 class Board:
     """This is the game board for tic tak toe"""
 
-    def __init__(self):
-        self.__board = [[" " for _ in range(3)] for _ in range(3)]
+    GAME_STATE = GAME_STATE
+
+    def __init__(self, width: int = 3, height: int = 3, k: int = 3):
+        self.geometry = get_geometry(width, height, k)
+        self.width = width
+        self.height = height
+        self.k = k
+        self.size = self.geometry.size
+
+        self.__x_bits = 0
+        self.__o_bits = 0
         self.__played_move = []
+        self.__previous_states = []
         self.turn = "x"
         self.depth = 0
 
         self.state = GAME_STATE.PLAYING
         self.winner = None
 
+    def __bit(self, file: int, rank: int) -> int:
+        if not (0 <= file < self.width and 0 <= rank < self.height):
+            raise InvalidPositionError((file, rank))
+        return 1 << (file + rank * self.width)
+
+    @property
+    def x_bits(self) -> int:
+        """the bitboard of the squares x has played on"""
+        return self.__x_bits
+
+    @property
+    def o_bits(self) -> int:
+        """the bitboard of the squares o has played on"""
+        return self.__o_bits
+
+    @property
+    def empty_bits(self) -> int:
+        """the bitboard of the squares nobody has played on"""
+        return self.geometry.full_board & ~(self.__x_bits | self.__o_bits)
+
     def get_position(self, file: int, rank: int):
         """Get a specified position on the board
 
@@ -38,10 +202,13 @@ class Board:
         Returns:
             _type_: object which contains the position info
         """
-        try:
-            return self.__board[rank][file]
-        except IndexError as error:
-            raise InvalidPositionError((file, rank)) from error
+        bit = self.__bit(file, rank)
+
+        if self.__x_bits & bit:
+            return "x"
+        if self.__o_bits & bit:
+            return "o"
+        return " "
 
     def play(self, file: int, rank: int):
         """Plays a move on the board
@@ -57,16 +224,32 @@ class Board:
         if self.state == GAME_STATE.GAME_OVER:
             raise PlayingAfterGameOverError()
 
-        if self.__board[rank][file] != " ":
+        bit = self.__bit(file, rank)
+        if (self.__x_bits | self.__o_bits) & bit:
             raise PositionAlreadyPlayedOnError((file, rank))
-        try:
-            self.__board[rank][file] = self.turn
-            self.__played_move.append((file, rank))
-            self.check_state()
-            self.turn = "o" if self.turn == "x" else "x"
-            self.depth += 1
-        except IndexError as error:
-            raise InvalidPositionError((file, rank)) from error
+
+        self.__previous_states.append((self.state, self.winner))
+        self.__played_move.append((file, rank))
+
+        # only the lines through the new move can have been completed by it
+        if self.turn == "x":
+            self.__x_bits |= bit
+            pieces = self.__x_bits
+        else:
+            self.__o_bits |= bit
+            pieces = self.__o_bits
+
+        for mask in self.geometry.lines_through[file + rank * self.width]:
+            if pieces & mask == mask:
+                self.winner = self.turn
+                self.state = GAME_STATE.GAME_OVER
+                break
+        else:
+            if self.__x_bits | self.__o_bits == self.geometry.full_board:
+                self.state = GAME_STATE.GAME_OVER
+
+        self.turn = "o" if self.turn == "x" else "x"
+        self.depth += 1
 
     def undo(self):
         """Undos the last played move and resets the current_player"""
@@ -74,13 +257,12 @@ class Board:
             raise Exception("you cant undo at the beginning of the game")
 
         last_move = self.__played_move.pop(-1)
-        self.__board[last_move[1]][last_move[0]] = " "
+        bit = ~(1 << (last_move[0] + last_move[1] * self.width))
+        self.__x_bits &= bit
+        self.__o_bits &= bit
         self.depth -= 1
 
-        self.state = GAME_STATE.PLAYING
-        self.winner = None
-        self.check_state()
-
+        self.state, self.winner = self.__previous_states.pop(-1)
         self.turn = "o" if self.turn == "x" else "x"
 
     @property
@@ -92,74 +274,106 @@ class Board:
 
     def available_positions(self) -> list:
         """Returns a list of all available_positions on the board"""
-        _available_positions = []
-
-        for file in range(3):
-            for rank in range(3):
-                if self.get_position(file, rank) == " ":
-                    _available_positions.append((file, rank))
-
-        return _available_positions
+        empty = self.empty_bits
+        return [
+            (file, rank) for file, rank, bit in self.geometry.squares if empty & bit
+        ]
 
     def check_state(self):
-        """Checks wheter any side has won or its a draw"""
-
-        # check the rows
-        for columns in range(3):
-            winner_present = (
-                self.__board[0][columns]
-                == self.__board[1][columns]
-                == self.__board[2][columns]
-                != " "
-            )
-            if winner_present:
-                self.winner = self.__board[0][columns]
-                self.state = GAME_STATE.GAME_OVER
-                return
-
-        # check the columns
-        for columns in range(3):
-            winner_present = (
-                self.__board[columns][0]
-                == self.__board[columns][1]
-                == self.__board[columns][2]
-                != " "
-            )
-            if winner_present:
-                self.winner = self.__board[columns][0]
-                self.state = GAME_STATE.GAME_OVER
-                return
-
-        # check diagonals
-        winner_present = (
-            self.__board[0][0] == self.__board[1][1] == self.__board[2][2] != " "
-        )
-        if winner_present:
-            self.winner = self.__board[1][1]
-            self.state = GAME_STATE.GAME_OVER
-            return
-
-        winner_present = (
-            self.__board[2][0] == self.__board[1][1] == self.__board[0][2] != " "
-        )
-        if winner_present:
-            self.winner = self.__board[1][1]
-            self.state = GAME_STATE.GAME_OVER
-            return
-
-        if len(self.available_positions()) == 0:
+        """Checks wheter any side has won or its a draw by scanning
+        every line. play and undo keep the state up to date on their own,
+        so this is only needed to recompute it from scratch"""
+        geometry = self.geometry
+        self.winner = winner_of(self.__x_bits, self.__o_bits, geometry.win_masks)
+
+        if (
+            self.winner is not None
+            or self.__x_bits | self.__o_bits == geometry.full_board
+        ):
             self.state = GAME_STATE.GAME_OVER
+        else:
+            self.state = GAME_STATE.PLAYING
 
     def reset_board(self):
         """Resets the board to its initial state"""
-        self.__board = [[" " for _ in range(3)] for _ in range(3)]
+        self.__x_bits = 0
+        self.__o_bits = 0
         self.__played_move = []
+        self.__previous_states = []
         self.turn = "x"
+        self.depth = 0
 
         self.state = GAME_STATE.PLAYING
         self.winner = None
 
+    def pack(self) -> int:
+        """Packs the position into a single integer, the x bitboard in the
+        low bits and the o bitboard above it"""
+        return self.__x_bits | self.__o_bits << self.size
+
+    @classmethod
+    def from_packed(cls, packed: int, width: int = 3, height: int = 3, k: int = 3):
+        """Creates a board from a position made by pack. Whose turn it is
+        and whether the game is over follow from the pieces, but there is
+        nothing to undo
+
+        Args:
+            packed (int): the packed position
+            width (int, optional): the width of the board. Defaults to 3.
+            height (int, optional): the height of the board. Defaults to 3.
+            k (int, optional): how many in a row win. Defaults to 3.
+
+        Raises:
+            ValueError: It is raised when the position can't happen in a game
+
+        Returns:
+            Board: the board with the position on it
+        """
+        board = cls(width, height, k)
+        full_board = board.geometry.full_board
+        x_bits, o_bits = packed & full_board, packed >> board.size
+
+        x_count, o_count = x_bits.bit_count(), o_bits.bit_count()
+        if x_bits & o_bits or o_bits & ~full_board or not 0 <= x_count - o_count <= 1:
+            raise ValueError(f"{packed} is not a packed {width}x{height} position")
+
+        board.__x_bits = x_bits
+        board.__o_bits = o_bits
+        board.turn = "x" if x_count == o_count else "o"
+        board.depth = x_count + o_count
+        board.check_state()
+
+        return board
+
+    def snapshot(self) -> BoardSnapshot:
+        """Takes an immutable copy of the position, without the moves
+        that led to it"""
+        return BoardSnapshot(self.pack(), self.turn, self.width, self.height, self.k)
+
+    @classmethod
+    def from_snapshot(cls, snapshot: BoardSnapshot):
+        """Creates a board from a position made by snapshot
+
+        Args:
+            snapshot (BoardSnapshot): the snapshot to restore
+
+        Raises:
+            ValueError: It is raised when the position can't happen in a game
+
+        Returns:
+            Board: the board with the position on it
+        """
+        packed, turn, width, height, k = snapshot
+        board = cls.from_packed(packed, width, height, k)
+        if board.turn != turn:
+            raise ValueError(f"it can't be {turn}'s turn in {snapshot}")
+
+        return board
+
     def get_board(self):
         """Return the board"""
 
-        return self.__board
+        return [
+            [self.get_position(file, rank) for file in range(self.width)]
+            for rank in range(self.height)
+        ]
@@ -0,0 +1,170 @@
+"""This module queues the edits the bot makes to its game messages.
+
+Every message keeps only its latest pending edit, so a burst of moves
+becomes a single edit. Edits wait for a token from the rate limit bucket
+of their route before they are sent, and an edit that would show exactly
+what the message already shows is skipped.
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Hashable
+
+
+class TokenBucket:
+    """A rate limit that allows bursts of up to capacity calls and then
+    rate calls a second"""
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+
+        self.tokens = capacity
+        self.updated = clock()
+
+    def reserve(self) -> float:
+        """Takes a token if there is one
+
+        Returns:
+            float: 0 if a token was taken, otherwise the seconds until there is one
+        """
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+
+class _PendingEdit:
+    __slots__ = ("route", "content", "send", "force", "future")
+
+    def __init__(self, route, content, send, force, future):
+        self.route = route
+        self.content = content
+        self.send = send
+        self.force = force
+        self.future = future
+
+
+class EditScheduler:
+    """Sends the edits of many messages, one message at a time each.
+
+    Args:
+        rate (float, optional): the edits a second every route allows. Defaults to 1.
+        burst (int, optional): the edits a route allows at once. Defaults to 5.
+        clock (callable, optional): the time in seconds. Defaults to time.monotonic.
+    """
+
+    def __init__(
+        self,
+        rate: float = 1.0,
+        burst: int = 5,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+
+        self.buckets: dict[Hashable, TokenBucket] = {}
+        self.__pending: dict[Hashable, _PendingEdit] = {}
+        self.__last_sent: dict[Hashable, Hashable] = {}
+        self.__workers: dict[Hashable, asyncio.Task] = {}
+
+        self.sent = 0
+        self.merged = 0
+        self.skipped = 0
+        self.errors = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """the number of messages with an edit waiting to be sent"""
+        return len(self.__pending)
+
+    def edit(
+        self,
+        key: Hashable,
+        route: Hashable,
+        content: Hashable,
+        send: Callable[[], Awaitable],
+        force: bool = False,
+    ) -> asyncio.Future:
+        """Schedules an edit of a message, replacing its pending edit
+
+        Args:
+            key (Hashable): the message to edit
+            route (Hashable): the rate limit bucket the edit counts against
+            content (Hashable): what the message shows after the edit, to
+                tell whether it changes anything
+            send (callable): makes the edit when called and awaited
+            force (bool, optional): sends the edit even if nothing changed.
+                Defaults to False.
+
+        Returns:
+            asyncio.Future: done once this edit, or one that replaced it, is made
+        """
+        pending = self.__pending.get(key)
+        if pending is not None:
+            # only the latest state is worth showing
+            self.merged += 1
+            pending.route = route
+            pending.content = content
+            pending.send = send
+            pending.force = pending.force or force
+            return pending.future
+
+        future = asyncio.get_running_loop().create_future()
+        self.__pending[key] = _PendingEdit(route, content, send, force, future)
+        if key not in self.__workers:
+            self.__workers[key] = asyncio.create_task(self.__run(key))
+        return future
+
+    def forget(self, key: Hashable):
+        """Forgets what a message was last edited to, once it won't be edited again"""
+        self.__last_sent.pop(key, None)
+
+    def __bucket(self, route: Hashable) -> TokenBucket:
+        bucket = self.buckets.get(route)
+        if bucket is None:
+            bucket = self.buckets[route] = TokenBucket(
+                self.rate, self.burst, self.clock
+            )
+        return bucket
+
+    async def __run(self, key: Hashable):
+        try:
+            while key in self.__pending:
+                pending = self.__pending[key]
+                if not pending.force and self.__last_sent.get(key) == pending.content:
+                    del self.__pending[key]
+                    self.skipped += 1
+                    pending.future.set_result(None)
+                    continue
+
+                delay = self.__bucket(pending.route).reserve()
+                if delay:
+                    # more edits may be merged into this one while it waits
+                    await asyncio.sleep(delay)
+                    continue
+
+                pending = self.__pending.pop(key)
+                try:
+                    await pending.send()
+                except Exception as error:
+                    self.errors += 1
+                    self.__last_sent.pop(key, None)
+                    pending.future.set_exception(error)
+                else:
+                    self.sent += 1
+                    self.__last_sent[key] = pending.content
+                    pending.future.set_result(None)
+        finally:
+            del self.__workers[key]
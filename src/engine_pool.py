@@ -0,0 +1,111 @@
+"""This module runs the ai in a pool of worker threads or processes so a
+long search never blocks the event loop the bot runs on.
+
+Workers only get a snapshot of the board, which is cheap to send to
+another process, and rebuild the board on their side.
+"""
+
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+from .ai import SearchStats, get_best_move
+from .board import Board, BoardSnapshot
+
+
+def _best_move(
+    snapshot: BoardSnapshot, is_hard: bool, time_limit: Optional[float]
+) -> tuple:
+    """Runs in a worker: rebuilds the board and searches it"""
+    board = Board.from_snapshot(snapshot)
+    return get_best_move(board, is_hard, time_limit=time_limit)
+
+
+def _best_move_with_stats(
+    snapshot: BoardSnapshot, is_hard: bool, time_limit: Optional[float]
+) -> tuple:
+    """Runs in a worker: rebuilds the board and searches it, counting what
+    the search does"""
+    board = Board.from_snapshot(snapshot)
+    stats = SearchStats()
+    return get_best_move(board, is_hard, time_limit=time_limit, stats=stats), stats
+
+
+class EnginePool:
+    """Runs get_best_move off the event loop.
+
+    At most max_pending moves are handed to the pool at a time, callers
+    past that wait their turn on the event loop instead of piling work
+    into the executor's queue.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        use_processes: bool = True,
+        max_pending: int = 64,
+    ):
+        self.workers = workers
+        self.use_processes = use_processes
+        self.max_pending = max_pending
+        self.pending = 0
+
+        self.__executor: Optional[Executor] = None
+        self.__slots: Optional[asyncio.Semaphore] = None
+
+    def __get_executor(self) -> Executor:
+        # created on first use so importing the bot doesn't start any workers
+        if self.__executor is None:
+            if self.use_processes:
+                self.__executor = ProcessPoolExecutor(self.workers)
+            else:
+                self.__executor = ThreadPoolExecutor(
+                    self.workers, thread_name_prefix="engine"
+                )
+        return self.__executor
+
+    async def best_move(
+        self, board: Board, is_hard: bool = False, time_limit: Optional[float] = None
+    ) -> tuple:
+        """Gets the best move for a board without blocking the event loop
+
+        Args:
+            board (Board): the board to check, it isn't changed
+            is_hard (bool, optional): plays perfectly on 3x3 when true. Defaults to False.
+            time_limit (float, optional): the seconds a search on a bigger
+                board may take. Defaults to None.
+
+        Returns:
+            tuple: the positions of the best move
+        """
+        return await self.__run(_best_move, board, is_hard, time_limit)
+
+    async def best_move_with_stats(
+        self, board: Board, is_hard: bool = False, time_limit: Optional[float] = None
+    ) -> tuple:
+        """Gets the best move like best_move, along with the SearchStats of
+        the search that found it
+
+        Returns:
+            tuple: the positions of the best move and its SearchStats
+        """
+        return await self.__run(_best_move_with_stats, board, is_hard, time_limit)
+
+    async def __run(self, search, board: Board, *args):
+        if self.__slots is None:
+            self.__slots = asyncio.Semaphore(self.max_pending)
+
+        async with self.__slots:
+            self.pending += 1
+            try:
+                return await asyncio.get_running_loop().run_in_executor(
+                    self.__get_executor(), search, board.snapshot(), *args
+                )
+            finally:
+                self.pending -= 1
+
+    def shutdown(self):
+        """Stops the workers once they finish what they are doing"""
+        if self.__executor is not None:
+            self.__executor.shutdown()
+            self.__executor = None
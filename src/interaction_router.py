@@ -0,0 +1,116 @@
+"""This module matches button clicks to the prompts waiting for them.
+
+Every button of a prompt gets its own custom_id, so a click finds its
+prompt with one dict lookup no matter how many prompts are waiting.
+"""
+
+import asyncio
+from enum import Enum
+from itertools import count
+from typing import Iterable, Optional
+
+
+class DISPATCH(Enum):
+    """What happened to a dispatched click"""
+
+    RESOLVED = 1
+    NOT_FOUND = 0
+    WRONG_USER = -1
+
+
+class _Prompt:
+    __slots__ = ("custom_ids", "user_id", "future")
+
+    def __init__(self, custom_ids, user_id, future):
+        self.custom_ids = custom_ids
+        self.user_id = user_id
+        self.future = future
+
+
+class InteractionRouter:
+    """Routes button clicks to the prompts waiting for them"""
+
+    def __init__(self):
+        self.__prompts: dict[str, _Prompt] = {}
+        self.__futures: dict[asyncio.Future, _Prompt] = {}
+        self.__numbers = count()
+
+    @property
+    def pending(self) -> int:
+        """the number of prompts waiting for a click"""
+        return len(self.__futures)
+
+    def create(
+        self, values: Iterable[str], user_id: Optional[int] = None
+    ) -> tuple[dict, asyncio.Future]:
+        """Creates a prompt for a set of buttons
+
+        Args:
+            values (Iterable[str]): the value of every button
+            user_id (int, optional): the only user that may answer. Defaults to anyone.
+
+        Returns:
+            tuple: the custom_id for every value, and the future the value clicked is set on
+        """
+        number = next(self.__numbers)
+        custom_ids = {value: f"prompt:{number}:{value}" for value in values}
+        future = asyncio.get_running_loop().create_future()
+
+        prompt = _Prompt(tuple(custom_ids.values()), user_id, future)
+        for custom_id in prompt.custom_ids:
+            self.__prompts[custom_id] = prompt
+        self.__futures[future] = prompt
+
+        return custom_ids, future
+
+    def dispatch(self, custom_id: str, user_id: int) -> DISPATCH:
+        """Answers the prompt a clicked button belongs to
+
+        Args:
+            custom_id (str): the custom_id of the button
+            user_id (int): the id of the user that clicked it
+
+        Returns:
+            DISPATCH: whether the click answered a prompt
+        """
+        prompt = self.__prompts.get(custom_id)
+        if prompt is None:
+            return DISPATCH.NOT_FOUND
+        if prompt.user_id is not None and prompt.user_id != user_id:
+            return DISPATCH.WRONG_USER
+        # timed out, and wait hasn't closed it yet
+        if prompt.future.done():
+            return DISPATCH.NOT_FOUND
+
+        prompt.future.set_result(custom_id.split(":", 2)[-1])
+        self.__close(prompt)
+        return DISPATCH.RESOLVED
+
+    async def wait(self, future: asyncio.Future, timeout: Optional[float] = None):
+        """Waits for a prompt to be answered
+
+        Args:
+            future (asyncio.Future): the future create returned
+            timeout (float, optional): the seconds to wait. Defaults to forever.
+
+        Returns:
+            str | None: the value clicked, or None if nobody answered in time
+        """
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            self.close(future)
+
+    def close(self, future: asyncio.Future):
+        """Forgets a prompt without waiting for it, such as one whose
+        question couldn't be sent. wait closes the prompts it waited for"""
+        prompt = self.__futures.get(future)
+        if prompt is not None:
+            self.__close(prompt)
+
+    def __close(self, prompt: _Prompt):
+        for custom_id in prompt.custom_ids:
+            self.__prompts.pop(custom_id, None)
+        self.__futures.pop(prompt.future, None)
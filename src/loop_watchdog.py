@@ -0,0 +1,179 @@
+"""This module watches the event loop for code that blocks it.
+
+A heartbeat coroutine sleeps interval seconds at a time and measures how
+late it wakes up, keeping the latest lags for rolling percentiles. A
+thread checks the heartbeat, and once it is threshold seconds late it
+takes a sample of the stack the loop's thread is stuck in. The sample is
+attributed to the coroutines running on that stack, such as Game.update
+awaiting Game.start_computer, so a stutter can be traced to its cause.
+"""
+
+import asyncio
+import inspect
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from typing import Callable, NamedTuple, Optional
+
+# the most frames kept of a stack sample, the innermost ones
+STACK_LIMIT = 30
+
+
+class Stall(NamedTuple):
+    """A time the event loop was blocked"""
+
+    # time.time() when the loop got going again
+    at: float
+    # the seconds the loop woke up late
+    lag: float
+    # the qualified names of the coroutines on the stack, outermost first
+    coroutines: tuple
+    # the stack the loop was stuck in, formatted by traceback, innermost last
+    stack: tuple
+
+    @property
+    def coroutine(self) -> Optional[str]:
+        """the innermost coroutine, the one that was running when the loop
+        was blocked, or None if the loop wasn't running a coroutine"""
+        return self.coroutines[-1] if self.coroutines else None
+
+
+def sample_stack(frame) -> tuple:
+    """Gets the coroutines and the stack of the code a frame is running
+
+    Args:
+        frame (frame): the innermost frame of a thread
+
+    Returns:
+        tuple: the qualified names of the coroutines, outermost first, and
+        the formatted stack
+    """
+    coroutines = []
+    outer = frame
+    while outer is not None:
+        code = outer.f_code
+        if code.co_flags & inspect.CO_COROUTINE:
+            coroutines.append(getattr(code, "co_qualname", code.co_name))
+        outer = outer.f_back
+
+    stack = traceback.format_list(traceback.extract_stack(frame, STACK_LIMIT))
+    return tuple(reversed(coroutines)), tuple(stack)
+
+
+def percentile(values: list, fraction: float) -> float:
+    """Gets the value below which the fraction of the sorted values fall"""
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+class LoopWatchdog:
+    """Measures the lag of the event loop it runs on and samples what
+    blocks it. Start it with asyncio.create_task(watchdog.run())
+
+    Args:
+        interval (float, optional): the seconds between heartbeats. Defaults to 0.1.
+        threshold (float, optional): the seconds late a heartbeat has to be
+            for the stack to be sampled. Defaults to 0.25.
+        window (int, optional): the latest lags the percentiles are
+            taken over. Defaults to 1000.
+        max_stalls (int, optional): the latest stalls kept. Defaults to 50.
+        on_lag (callable, optional): called with the lag of every heartbeat.
+            Defaults to None.
+        on_stall (callable, optional): called with every Stall. Defaults to None.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.1,
+        threshold: float = 0.25,
+        window: int = 1000,
+        max_stalls: int = 50,
+        on_lag: Optional[Callable[[float], None]] = None,
+        on_stall: Optional[Callable[[Stall], None]] = None,
+    ):
+        self.interval = interval
+        self.threshold = threshold
+        self.on_lag = on_lag
+        self.on_stall = on_stall
+
+        self.lags = deque(maxlen=window)
+        self.stalls = deque(maxlen=max_stalls)
+        # innermost coroutine name (None for plain callbacks): stalls
+        self.stalls_by_coroutine = Counter()
+        self.stall_count = 0
+
+        # shared with the watching thread
+        self.__lock = threading.Lock()
+        self.__beat = 0.0
+        self.__sample: Optional[tuple] = None
+        self.__loop_thread: Optional[int] = None
+        self.__stopped = threading.Event()
+
+    def percentiles(self, fractions: tuple = (0.5, 0.9, 0.99)) -> dict:
+        """Gets the percentiles of the latest lags
+
+        Returns:
+            dict: the lag in seconds for every fraction, or 0 before the
+            first heartbeat
+        """
+        lags = sorted(self.lags)
+        if not lags:
+            return {fraction: 0.0 for fraction in fractions}
+        return {fraction: percentile(lags, fraction) for fraction in fractions}
+
+    async def run(self):
+        """Beats every interval seconds, forever, while a thread watches"""
+        self.__loop_thread = threading.get_ident()
+        self.__stopped.clear()
+        with self.__lock:
+            self.__beat = started = time.perf_counter()
+            self.__sample = None
+
+        watcher = threading.Thread(
+            target=self.__watch, name="loop-watchdog", daemon=True
+        )
+        watcher.start()
+
+        try:
+            while True:
+                await asyncio.sleep(self.interval)
+                with self.__lock:
+                    now = self.__beat = time.perf_counter()
+                    sample, self.__sample = self.__sample, None
+
+                lag = max(0.0, now - started - self.interval)
+                started = now
+                self.__record(lag, sample)
+        finally:
+            self.__stopped.set()
+
+    def __record(self, lag: float, sample: Optional[tuple]):
+        self.lags.append(lag)
+        if self.on_lag is not None:
+            self.on_lag(lag)
+
+        # a sample taken just as the loop woke up isn't of a stall
+        if sample is None or lag < self.threshold:
+            return
+
+        stall = Stall(time.time(), lag, *sample)
+        self.stalls.append(stall)
+        self.stalls_by_coroutine[stall.coroutine] += 1
+        self.stall_count += 1
+        if self.on_stall is not None:
+            self.on_stall(stall)
+
+    def __watch(self):
+        # runs in its own thread, so it gets to look while the loop is blocked
+        check_every = min(self.interval, self.threshold / 2)
+
+        while not self.__stopped.wait(check_every):
+            with self.__lock:
+                late = time.perf_counter() - self.__beat - self.interval
+                if late < self.threshold or self.__sample is not None:
+                    continue
+
+                frame = sys._current_frames().get(self.__loop_thread)
+                if frame is not None:
+                    self.__sample = sample_stack(frame)
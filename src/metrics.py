@@ -0,0 +1,255 @@
+"""This module serves the metrics of the bot in the Prometheus text format.
+
+Histograms are filled in as things happen. Gauges and counters are read
+from the objects that already keep them, such as len(games) or
+edits.errors, every time the metrics are scraped. The HTTP server is a
+small asyncio server on the loop the bot already runs, so nothing else
+has to be installed or run.
+"""
+
+import asyncio
+import time
+from bisect import bisect_left
+from math import inf
+from typing import Callable, Optional
+
+# the bucket upper bounds, in seconds, for latencies from a millisecond to a minute
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# the characters label values have to escape
+LABEL_ESCAPES = str.maketrans({"\\": "\\\\", '"': '\\"', "\n": "\\n"})
+
+# the most seconds a client may take to send its request
+REQUEST_TIMEOUT = 5.0
+
+
+def format_value(value: float) -> str:
+    """Writes a number the way Prometheus reads it"""
+    if value == inf:
+        return "+Inf"
+    if value == -inf:
+        return "-Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def format_labels(names: tuple, values: tuple) -> str:
+    """Writes a label set like {difficulty="hard"}, or nothing if it is empty"""
+    if not names:
+        return ""
+
+    labels = []
+    for name, value in zip(names, values):
+        value = str(value).translate(LABEL_ESCAPES)
+        labels.append(f'{name}="{value}"')
+    return "{" + ",".join(labels) + "}"
+
+
+class Histogram:
+    """Counts observed values into buckets, separately for every set of
+    label values
+
+    Args:
+        name (str): the name of the metric
+        help (str): what the metric measures
+        buckets (tuple, optional): the upper bounds of the buckets, sorted.
+            Defaults to DEFAULT_BUCKETS.
+        labels (tuple, optional): the names of the labels. Defaults to ().
+    """
+
+    def __init__(
+        self, name: str, help: str, buckets: tuple = DEFAULT_BUCKETS, labels=()
+    ):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.labels = tuple(labels)
+
+        # label values: [the count in every bucket and past the last one, sum]
+        self.__series = {}
+
+    def observe(self, value: float, *label_values):
+        """Counts a value, with one label value for every label name"""
+        series = self.__series.get(label_values)
+        if series is None:
+            if len(label_values) != len(self.labels):
+                raise ValueError(f"{self.name} takes the labels {self.labels}")
+            series = self.__series[label_values] = [[0] * (len(self.buckets) + 1), 0]
+
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def time(self, *label_values) -> "_Timer":
+        """Observes the seconds a with block takes"""
+        return _Timer(self, label_values)
+
+    def count(self, *label_values) -> int:
+        """Gets the number of values observed with the label values"""
+        series = self.__series.get(label_values)
+        return 0 if series is None else sum(series[0])
+
+    def render(self) -> list:
+        """Gets the lines of the metric in the text format"""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        names = self.labels + ("le",)
+
+        for label_values, (counts, total) in sorted(self.__series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (inf,), counts):
+                cumulative += count
+                labels = format_labels(names, label_values + (format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+
+            labels = format_labels(self.labels, label_values)
+            lines.append(f"{self.name}_sum{labels} {format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+
+        return lines
+
+
+class _Timer:
+    __slots__ = ("histogram", "label_values", "started")
+
+    def __init__(self, histogram, label_values):
+        self.histogram = histogram
+        self.label_values = label_values
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.started
+        self.histogram.observe(elapsed, *self.label_values)
+
+
+class Sampled:
+    """A gauge or counter whose value is read from a function when scraped
+
+    Args:
+        name (str): the name of the metric
+        help (str): what the metric measures
+        kind (str): "gauge" or "counter"
+        read (callable): gets the current value
+    """
+
+    def __init__(self, name: str, help: str, kind: str, read: Callable[[], float]):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.read = read
+
+    def render(self) -> list:
+        """Gets the lines of the metric in the text format"""
+        return [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} {self.kind}",
+            f"{self.name} {format_value(self.read())}",
+        ]
+
+
+class Metrics:
+    """The metrics of one process, and the HTTP server that serves them"""
+
+    def __init__(self):
+        self.__metrics = {}
+        self.__server: Optional[asyncio.AbstractServer] = None
+
+    def __add(self, metric):
+        if metric.name in self.__metrics:
+            raise ValueError(f"{metric.name} is already a metric")
+        self.__metrics[metric.name] = metric
+        return metric
+
+    def histogram(
+        self, name: str, help: str, buckets: tuple = DEFAULT_BUCKETS, labels=()
+    ) -> Histogram:
+        """Adds a Histogram"""
+        return self.__add(Histogram(name, help, buckets, labels))
+
+    def gauge(self, name: str, help: str, read: Callable[[], float]) -> Sampled:
+        """Adds a gauge read from a function when scraped"""
+        return self.__add(Sampled(name, help, "gauge", read))
+
+    def counter(self, name: str, help: str, read: Callable[[], float]) -> Sampled:
+        """Adds a counter read from a function when scraped"""
+        return self.__add(Sampled(name, help, "counter", read))
+
+    def render(self) -> str:
+        """Gets every metric in the Prometheus text format"""
+        lines = []
+        for metric in self.__metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 9090) -> int:
+        """Serves the metrics at http://host:port/metrics on the running loop
+
+        Returns:
+            int: the port the server listens on, useful when port is 0
+        """
+        self.__server = await asyncio.start_server(self.__handle, host, port)
+        return self.__server.sockets[0].getsockname()[1]
+
+    async def __handle(self, reader, writer):
+        try:
+            request = await asyncio.wait_for(
+                reader.readuntil(b"\r\n\r\n"), REQUEST_TIMEOUT
+            )
+            method, target, _ = request.split(b"\r\n", 1)[0].decode().split(" ", 2)
+        except (
+            asyncio.TimeoutError,
+            asyncio.IncompleteReadError,
+            asyncio.LimitOverrunError,
+            ValueError,
+        ):
+            writer.close()
+            return
+
+        if method not in ("GET", "HEAD"):
+            status, body = "405 Method Not Allowed", "only GET is allowed\n"
+        elif target.split("?")[0] != "/metrics":
+            status, body = "404 Not Found", "the metrics are at /metrics\n"
+        else:
+            status, body = "200 OK", self.render()
+
+        content = body.encode()
+        writer.write(
+            f"HTTP/1.1 {status}\r\n"
+            f"Content-Type: {CONTENT_TYPE}\r\n"
+            f"Content-Length: {len(content)}\r\n"
+            "Connection: close\r\n\r\n".encode()
+        )
+        if method != "HEAD":
+            writer.write(content)
+
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def close(self):
+        """Stops the HTTP server"""
+        if self.__server is not None:
+            self.__server.close()
+            self.__server = None
@@ -0,0 +1,191 @@
+"""This module profiles the running bot for a while without restarting it.
+
+A thread samples the stack of every other thread every interval seconds,
+which costs far less than tracing every call and sees the whole process,
+not just the thread that turned it on. Memory is traced with tracemalloc
+for the same window. The report lists the functions seen on the most
+samples, on the stack and running themselves, and the lines that
+allocated the most memory that was still held at the end.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Optional
+
+# the allocations of the profiler, tracemalloc and importlib, left out of the report
+_ALLOCATION_FILTERS = (
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def function_name(code) -> str:
+    """Names the function of a code object like file:line qualified_name"""
+    return f"{code.co_filename}:{code.co_firstlineno} " + getattr(
+        code, "co_qualname", code.co_name
+    )
+
+
+def format_size(size: int) -> str:
+    """Writes a number of bytes in the biggest unit that keeps it above 1"""
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+class SamplingProfiler:
+    """Samples where every thread of the process is and what it allocates.
+
+    Args:
+        interval (float, optional): the seconds between samples. Defaults to 0.01.
+        trace_allocations (bool, optional): traces memory with tracemalloc
+            too. Defaults to True.
+    """
+
+    def __init__(self, interval: float = 0.01, trace_allocations: bool = True):
+        self.interval = interval
+        self.trace_allocations = trace_allocations
+
+        # code object: samples it was on the stack of / was running in
+        self.cumulative = Counter()
+        self.own = Counter()
+        self.samples = 0
+        # how many times the threads were sampled, which can be less often
+        # than every interval when the sampler waits for the GIL
+        self.rounds = 0
+        self.threads = set()
+        self.elapsed = 0.0
+
+        self.__started = 0.0
+        self.__stopped = threading.Event()
+        self.__thread: Optional[threading.Thread] = None
+        self.__started_tracing = False
+        self.__before: Optional[tracemalloc.Snapshot] = None
+        self.__after: Optional[tracemalloc.Snapshot] = None
+
+    def start(self):
+        """Starts sampling"""
+        if self.trace_allocations:
+            self.__started_tracing = not tracemalloc.is_tracing()
+            if self.__started_tracing:
+                tracemalloc.start()
+            self.__before = tracemalloc.take_snapshot()
+
+        self.__started = time.perf_counter()
+        self.__stopped.clear()
+        self.__thread = threading.Thread(
+            target=self.__sample, name="profiler", daemon=True
+        )
+        self.__thread.start()
+
+    def stop(self):
+        """Stops sampling, and tracing memory if start turned it on"""
+        if self.__thread is None:
+            return
+
+        self.__stopped.set()
+        self.__thread.join()
+        self.__thread = None
+        self.elapsed += time.perf_counter() - self.__started
+
+        if self.trace_allocations:
+            self.__after = tracemalloc.take_snapshot()
+            if self.__started_tracing:
+                tracemalloc.stop()
+
+    async def run(self, seconds: float) -> str:
+        """Profiles the process for a number of seconds. The memory snapshot
+        and the report take longer the bigger the heap is, so they are made
+        in a worker thread while the loop keeps running
+
+        Returns:
+            str: the report
+        """
+        loop = asyncio.get_running_loop()
+        self.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            await loop.run_in_executor(None, self.stop)
+        return await loop.run_in_executor(None, self.report)
+
+    def __sample(self):
+        me = threading.get_ident()
+
+        while not self.__stopped.wait(self.interval):
+            self.rounds += 1
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == me:
+                    continue
+
+                self.samples += 1
+                self.threads.add(thread_id)
+                self.own[frame.f_code] += 1
+
+                # a recursive function counts once a sample
+                seen = set()
+                while frame is not None:
+                    code = frame.f_code
+                    if code not in seen:
+                        seen.add(code)
+                        self.cumulative[code] += 1
+                    frame = frame.f_back
+
+    def allocations(self, top: int = 20) -> list:
+        """Gets the lines that allocated the most memory still held when
+        sampling stopped
+
+        Returns:
+            list: tracemalloc.StatisticDiff of the top lines, biggest first
+        """
+        if self.__before is None or self.__after is None:
+            return []
+
+        before = self.__before.filter_traces(_ALLOCATION_FILTERS)
+        after = self.__after.filter_traces(_ALLOCATION_FILTERS)
+        statistics = after.compare_to(before, "lineno")
+        return [statistic for statistic in statistics if statistic.size_diff > 0][:top]
+
+    def report(self, top: int = 20) -> str:
+        """Writes the top functions by time and the top lines by memory"""
+        lines = [
+            f"profiled {self.elapsed:.1f}s, {self.samples:,} stack samples of"
+            f" {len(self.threads)} threads every {self.interval * 1000:g}ms",
+            "time is wall clock time, waiting included, estimated from the samples",
+        ]
+        seconds_per_round = self.elapsed / self.rounds if self.rounds else 0.0
+
+        for title, counts in (
+            ("by cumulative time", self.cumulative),
+            ("by own time", self.own),
+        ):
+            lines += ["", f"top functions {title}", "  samples  seconds  function"]
+            for code, samples in counts.most_common(top):
+                lines.append(
+                    f"{samples:>9,} {samples * seconds_per_round:>8.2f}"
+                    f"  {function_name(code)}"
+                )
+
+        if self.trace_allocations:
+            lines += [
+                "",
+                "top lines by memory allocated and still held",
+                "     size    blocks  line",
+            ]
+            for statistic in self.allocations(top):
+                frame = statistic.traceback[0]
+                lines.append(
+                    f"{format_size(statistic.size_diff):>9} {statistic.count_diff:>9,}"
+                    f"  {frame.filename}:{frame.lineno}"
+                )
+
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,69 @@
+"""This module renders the board part of a game message. It only depends
+on the position and the side the person plays, so renders are cached and
+shared between every game showing the same position.
+"""
+
+from functools import lru_cache
+from typing import NamedTuple
+
+EMOJI_DICT = {
+    "x": ":regional_indicator_x:",
+    "o": ":regional_indicator_o:",
+    " ": ":blue_square:",
+}
+
+# who a square belongs to, from the person's side
+EMPTY = 0
+PLAYER = 1
+COMPUTER = 2
+
+RENDER_CACHE_SIZE = 4096
+
+
+class RenderedBoard(NamedTuple):
+    """The emoji grid of a position and who owns each of its squares,
+    indexed by file + rank * width like the buttons"""
+
+    grid: str
+    owners: tuple
+
+
+@lru_cache(maxsize=RENDER_CACHE_SIZE)
+def render_board(
+    packed: int, player: str, width: int = 3, height: int = 3
+) -> RenderedBoard:
+    """Renders a position packed with Board.pack
+
+    Args:
+        packed (int): the packed position
+        player (str): the side the person plays, "x" or "o"
+        width (int, optional): the width of the board. Defaults to 3.
+        height (int, optional): the height of the board. Defaults to 3.
+
+    Returns:
+        RenderedBoard: the emoji grid and the owner of every square
+    """
+    size = width * height
+    pieces = []
+    owners = []
+
+    for square in range(size):
+        if packed >> square & 1:
+            piece = "x"
+        elif packed >> (square + size) & 1:
+            piece = "o"
+        else:
+            piece = " "
+
+        pieces.append(piece)
+        owners.append(
+            EMPTY if piece == " " else PLAYER if piece == player else COMPUTER
+        )
+
+    grid = "\n".join(
+        " | ".join(
+            EMOJI_DICT[piece] for piece in pieces[rank * width : (rank + 1) * width]
+        )
+        for rank in range(height)
+    )
+    return RenderedBoard(grid, tuple(owners))
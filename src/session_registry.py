@@ -0,0 +1,190 @@
+"""This module keeps the games being played, and ends the ones nobody
+has touched in a while or that don't fit any more, so abandoned games
+don't pile up for as long as the bot runs.
+"""
+
+import asyncio
+import logging
+import sys
+import time
+import types
+from collections import OrderedDict
+from enum import Enum
+from typing import Awaitable, Callable, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+# objects a session points to but doesn't own
+_NEVER_COUNTED = (
+    type,
+    types.ModuleType,
+    types.FunctionType,
+    types.BuiltinFunctionType,
+    types.MethodType,
+    Enum,
+    asyncio.AbstractEventLoop,
+    asyncio.Future,
+)
+
+
+def deep_sizeof(obj, shared: tuple = ()) -> int:
+    """Adds up the size of an object and everything it holds
+
+    Args:
+        obj (object): the object to measure
+        shared (tuple, optional): the types of objects to leave out
+            because they are shared with other objects. Defaults to ().
+
+    Returns:
+        int: the approximate size in bytes
+    """
+    shared = _NEVER_COUNTED + tuple(shared)
+    seen = set()
+    size = 0
+    stack = [obj]
+
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, shared):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif not isinstance(obj, (str, bytes, int, float)):
+            if hasattr(obj, "__dict__"):
+                stack.append(vars(obj))
+            for cls in type(obj).__mro__:
+                for slot in getattr(cls, "__slots__", ()):
+                    if hasattr(obj, slot):
+                        stack.append(getattr(obj, slot))
+
+    return size
+
+
+class SessionRegistry:
+    """A dict of sessions that ends the least recently used ones.
+
+    Sessions idle for longer than ttl seconds are ended by sweep, and
+    adding a session past max_size ends the least recently used one.
+    Reading a session with [] counts as using it.
+
+    Args:
+        ttl (float, optional): the seconds a session may sit idle. Defaults to forever.
+        max_size (int, optional): the most sessions kept. Defaults to no limit.
+        on_evict (callable, optional): awaited with the key and session of
+            every session ended. Defaults to None.
+        sizeof (callable, optional): measures a session in bytes. Defaults to deep_sizeof.
+        clock (callable, optional): the time in seconds. Defaults to time.monotonic.
+    """
+
+    # sessions measured for the approximate size of one
+    SIZE_SAMPLE = 16
+
+    def __init__(
+        self,
+        ttl: Optional[float] = None,
+        max_size: Optional[int] = None,
+        on_evict: Optional[Callable[[Hashable, object], Awaitable]] = None,
+        sizeof: Callable[[object], int] = deep_sizeof,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.on_evict = on_evict
+        self.sizeof = sizeof
+        self.clock = clock
+
+        # key: (session, last used), least recently used first
+        self.__sessions: OrderedDict = OrderedDict()
+        self.evictions = 0
+        # the on_evict tasks still running, the loop only keeps weak references
+        self.__ending: set = set()
+
+    def __len__(self) -> int:
+        return len(self.__sessions)
+
+    def __contains__(self, key) -> bool:
+        return key in self.__sessions
+
+    def __iter__(self):
+        return iter(list(self.__sessions))
+
+    def __getitem__(self, key):
+        session, _ = self.__sessions[key]
+        self.__sessions[key] = (session, self.clock())
+        self.__sessions.move_to_end(key)
+        return session
+
+    def __setitem__(self, key, session):
+        self.__sessions[key] = (session, self.clock())
+        self.__sessions.move_to_end(key)
+
+        if self.max_size is not None:
+            while len(self.__sessions) > self.max_size:
+                self.__evict(*self.__sessions.popitem(last=False))
+
+    def __delitem__(self, key):
+        del self.__sessions[key]
+
+    def get(self, key, default=None):
+        """Gets a session, counting it as used, or default if there is none"""
+        if key not in self.__sessions:
+            return default
+        return self[key]
+
+    def clear(self):
+        """Forgets every session without ending them"""
+        self.__sessions.clear()
+
+    def sweep(self) -> int:
+        """Ends every session idle for longer than ttl
+
+        Returns:
+            int: the number of sessions ended
+        """
+        if self.ttl is None:
+            return 0
+
+        oldest = self.clock() - self.ttl
+        evicted = 0
+        while self.__sessions:
+            key, (session, last_used) = next(iter(self.__sessions.items()))
+            if last_used > oldest:
+                break
+
+            del self.__sessions[key]
+            self.__evict(key, (session, last_used))
+            evicted += 1
+
+        return evicted
+
+    async def run(self, interval: float = 60.0):
+        """Sweeps every interval seconds, forever"""
+        while True:
+            await asyncio.sleep(interval)
+            self.sweep()
+
+    def approximate_bytes(self) -> int:
+        """Gets the approximate memory one session takes, measured on the
+        most recently used sessions"""
+        sessions = list(self.__sessions.values())[-self.SIZE_SAMPLE :]
+        if not sessions:
+            return 0
+        return sum(self.sizeof(session) for session, _ in sessions) // len(sessions)
+
+    def __evict(self, key, entry: tuple):
+        self.evictions += 1
+        if self.on_evict is not None:
+            task = asyncio.get_running_loop().create_task(self.on_evict(key, entry[0]))
+            self.__ending.add(task)
+            task.add_done_callback(lambda task: self.__ended(key, task))
+
+    def __ended(self, key, task: asyncio.Task):
+        self.__ending.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("ending session %r failed", key, exc_info=task.exception())
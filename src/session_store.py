@@ -0,0 +1,245 @@
+"""This module saves the games being played to a local SQLite database so
+they survive a restart of the bot.
+
+Saves and deletes are buffered and written together in one transaction,
+either every flush_interval seconds or once batch_size of them are
+waiting. Only the latest save of each game is written.
+
+Games are keyed by guild and user, since the processes of a sharded bot
+share the database and a user can be playing in guilds on two of them.
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+from typing import Callable, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = os.path.join(os.path.dirname(__file__), "..", "sessions.db")
+
+# the guild_id saved for games in direct messages, which have no guild.
+# It can't be NULL since it is part of the primary key
+NO_GUILD = -1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    user_id INTEGER NOT NULL,
+    player_name TEXT NOT NULL,
+    channel_id INTEGER NOT NULL,
+    message_id INTEGER NOT NULL,
+    packed INTEGER NOT NULL,
+    width INTEGER NOT NULL,
+    height INTEGER NOT NULL,
+    k INTEGER NOT NULL,
+    player TEXT NOT NULL,
+    is_hard INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    loses INTEGER NOT NULL,
+    draws INTEGER NOT NULL,
+    guild_id INTEGER NOT NULL,
+    PRIMARY KEY (guild_id, user_id)
+)
+"""
+
+
+class GameRecord(NamedTuple):
+    """Everything needed to bring a game back after a restart"""
+
+    user_id: int
+    player_name: str
+    channel_id: int
+    message_id: int
+    packed: int
+    width: int
+    height: int
+    k: int
+    player: str
+    is_hard: bool
+    wins: int
+    loses: int
+    draws: int
+    guild_id: Optional[int] = None
+
+
+COLUMNS = ", ".join(GameRecord._fields)
+
+
+class SessionStore:
+    """Stores a GameRecord for every user playing
+
+    Args:
+        path (str, optional): the database file. Defaults to DEFAULT_PATH.
+        flush_interval (float, optional): the most seconds a save waits
+            before it is written. Defaults to 1.
+        batch_size (int, optional): writes as soon as this many saves are
+            waiting. Defaults to 256.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_PATH,
+        flush_interval: float = 1.0,
+        batch_size: int = 256,
+    ):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+        # several bot processes can share the file when the bot is sharded,
+        # and run writes it from a worker thread
+        self.__connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.__connection.execute("PRAGMA journal_mode=WAL")
+        self.__connection.execute(SCHEMA)
+        self.__migrate()
+
+        # (guild_id, user_id): the record to write, or None to delete the game
+        self.__pending: dict[tuple, Optional[GameRecord]] = {}
+        self.__pending_lock = threading.Lock()
+        self.__connection_lock = threading.Lock()
+        # set by save and delete to have run write a full batch right away
+        self.__batch_full: Optional[asyncio.Event] = None
+        self.writes = 0
+
+    def __migrate(self):
+        """Rebuilds a games table saved before games were keyed by guild"""
+        connection = self.__connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            rows = connection.execute("PRAGMA table_info(games)").fetchall()
+            columns = [row[1] for row in rows]
+            # pk is the position of the column in the primary key, 0 if it isn't
+            pk = 5
+            key_rows = sorted((row for row in rows if row[pk]), key=lambda row: row[pk])
+            primary_key = [row[1] for row in key_rows]
+
+            if primary_key != ["guild_id", "user_id"]:
+                guild_id = f"COALESCE(guild_id, {NO_GUILD})"
+                if "guild_id" not in columns:
+                    guild_id = str(NO_GUILD)
+                old_columns = COLUMNS.replace("guild_id", guild_id)
+
+                connection.execute("ALTER TABLE games RENAME TO old_games")
+                connection.execute(SCHEMA)
+                connection.execute(
+                    f"INSERT INTO games ({COLUMNS}) SELECT {old_columns} FROM old_games"
+                )
+                connection.execute("DROP TABLE old_games")
+        except BaseException:
+            connection.rollback()
+            raise
+        connection.commit()
+
+    @property
+    def pending(self) -> int:
+        """the number of saves and deletes not written yet"""
+        return len(self.__pending)
+
+    def save(self, record: GameRecord):
+        """Saves a game, replacing any save of it still waiting"""
+        guild_id = NO_GUILD if record.guild_id is None else record.guild_id
+        self.__add((guild_id, record.user_id), record._replace(guild_id=guild_id))
+
+    def delete(self, user_id: int, guild_id: Optional[int] = None):
+        """Deletes the game of a user in a guild, or in direct messages"""
+        self.__add((NO_GUILD if guild_id is None else guild_id, user_id), None)
+
+    def __add(self, key: tuple, record: Optional[GameRecord]):
+        with self.__pending_lock:
+            self.__pending[key] = record
+            full = len(self.__pending) >= self.batch_size
+
+        if full:
+            if self.__batch_full is not None:
+                self.__batch_full.set()
+            else:
+                self.flush()
+
+    def flush(self):
+        """Writes every waiting save and delete in one transaction"""
+        with self.__pending_lock:
+            if not self.__pending:
+                return
+            pending, self.__pending = self.__pending, {}
+
+        try:
+            with self.__connection_lock, self.__connection:
+                self.__connection.executemany(
+                    "DELETE FROM games WHERE guild_id = ? AND user_id = ?",
+                    [key for key, record in pending.items() if record is None],
+                )
+                self.__connection.executemany(
+                    f"INSERT OR REPLACE INTO games ({COLUMNS})"
+                    f" VALUES ({', '.join('?' * len(GameRecord._fields))})",
+                    [record for record in pending.values() if record is not None],
+                )
+        except BaseException:
+            # keep the batch for the next flush, behind any newer saves and
+            # deletes of the same games made while it was being written
+            with self.__pending_lock:
+                pending.update(self.__pending)
+                self.__pending = pending
+            raise
+        self.writes += 1
+
+    def load_all(self, owns: Optional[Callable[[Optional[int]], bool]] = None) -> list:
+        """Gets every saved game, including the ones waiting to be written
+
+        Args:
+            owns (callable, optional): keeps only the games of the guilds
+                it returns true for. Defaults to keeping every game.
+
+        Returns:
+            list: the GameRecord of every game, by user id
+        """
+        self.flush()
+        with self.__connection_lock:
+            rows = self.__connection.execute(
+                f"SELECT {COLUMNS} FROM games ORDER BY user_id, guild_id"
+            ).fetchall()
+        records = [
+            GameRecord(
+                *row[:9],
+                bool(row[9]),
+                *row[10:13],
+                None if row[13] == NO_GUILD else row[13],
+            )
+            for row in rows
+        ]
+
+        if owns is None:
+            return records
+        return [record for record in records if owns(record.guild_id)]
+
+    async def run(self):
+        """Writes the waiting saves every flush_interval seconds, or as soon
+        as batch_size of them are waiting, forever. The writes run in a
+        worker thread, so waiting on a database another process has locked
+        never blocks the event loop"""
+        loop = asyncio.get_running_loop()
+        self.__batch_full = asyncio.Event()
+
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(
+                        self.__batch_full.wait(), self.flush_interval
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                self.__batch_full.clear()
+                try:
+                    await loop.run_in_executor(None, self.flush)
+                except Exception:
+                    # the batch is kept, the next flush tries it again
+                    logger.exception("writing the saved games failed")
+        finally:
+            self.__batch_full = None
+
+    def close(self):
+        """Writes the waiting saves and closes the database"""
+        self.flush()
+        with self.__connection_lock:
+            self.__connection.close()
@@ -0,0 +1,105 @@
+"""This module splits the bot over gateway shards and processes.
+
+Discord sends the events of a guild to shard (guild_id >> 22) % shard_count
+and direct messages to shard 0. Every process runs a block of the shards,
+so it only ever sees the games of the guilds on them and keeps them to
+itself.
+"""
+
+import os
+import subprocess
+import sys
+from typing import NamedTuple, Optional
+
+
+def shard_for(guild_id: Optional[int], shard_count: int) -> int:
+    """Gets the shard discord sends the events of a guild to
+
+    Args:
+        guild_id (int | None): the guild, or None for direct messages
+        shard_count (int): how many shards the bot has
+
+    Returns:
+        int: the id of the shard
+    """
+    if guild_id is None:
+        return 0
+    return (guild_id >> 22) % shard_count
+
+
+class ShardPlan(NamedTuple):
+    """The shards one process runs out of all of them"""
+
+    process_index: int = 0
+    process_count: int = 1
+    shard_count: int = 1
+
+    @classmethod
+    def from_env(cls, env=os.environ):
+        """Reads the plan from SHARD_COUNT, PROCESS_COUNT and PROCESS_INDEX
+
+        Raises:
+            ValueError: It is raised when the process has no shards to run
+
+        Returns:
+            ShardPlan: the plan of this process
+        """
+        process_count = int(env.get("PROCESS_COUNT", "1"))
+        plan = cls(
+            int(env.get("PROCESS_INDEX", "0")),
+            process_count,
+            int(env.get("SHARD_COUNT", str(process_count))),
+        )
+
+        if not 0 <= plan.process_index < plan.process_count <= plan.shard_count:
+            raise ValueError(f"{plan} leaves a process without shards")
+        return plan
+
+    @property
+    def shard_ids(self) -> tuple:
+        """the shards this process runs, an even block of all of them"""
+        start = self.process_index * self.shard_count // self.process_count
+        end = (self.process_index + 1) * self.shard_count // self.process_count
+        return tuple(range(start, end))
+
+    def bot_options(self) -> dict:
+        """the shard_count and shard_ids to make the bot with, none when the
+        bot isn't sharded"""
+        if self.shard_count == 1:
+            return {}
+        return {"shard_count": self.shard_count, "shard_ids": list(self.shard_ids)}
+
+    def port(self, base: int) -> int:
+        """Gets this process's port out of one for every process starting at
+        base, or 0 if base is 0 and nothing should be served"""
+        return base + self.process_index if base else 0
+
+    def owns(self, guild_id: Optional[int]) -> bool:
+        """Whether the events of a guild come to this process"""
+        shard_id = shard_for(guild_id, self.shard_count)
+        return self.shard_ids[0] <= shard_id <= self.shard_ids[-1]
+
+
+def launch(argv: list, process_count: int, shard_count: int) -> int:
+    """Runs a process for every block of shards and waits for them
+
+    Args:
+        argv (list): the command that runs one process
+        process_count (int): how many processes to run
+        shard_count (int): how many shards to split between them
+
+    Returns:
+        int: the first non-zero exit code, or 0 if every process exited cleanly
+    """
+    processes = []
+    for process_index in range(process_count):
+        env = dict(os.environ)
+        env.update(
+            PROCESS_INDEX=str(process_index),
+            PROCESS_COUNT=str(process_count),
+            SHARD_COUNT=str(shard_count),
+        )
+        processes.append(subprocess.Popen([sys.executable, *argv], env=env))
+
+    codes = [process.wait() for process in processes]
+    return next((code for code in codes if code), 0)
@@ -0,0 +1,175 @@
+"""This module contains the precomputed solution of tic tak toe.
+
+Every reachable position is solved once offline and written to a small
+binary file, which is then memory mapped so finding the best move is a
+single table lookup. Because the file is mapped read-only, every process
+that loads it shares the same pages.
+
+The file starts with MAGIC followed by one little-endian uint16 for each
+of the 3 ** 9 ways to fill the board, indexed by the position read as a
+base 3 number (0 empty, 1 x, 2 o, square file + rank * 3 being the
+3 ** square digit). The low 9 bits are a mask of the best moves and the
+high 7 bits hold the value from x's side plus VALUE_OFFSET. Terminal and
+unreachable positions have an empty move mask.
+
+Regenerate it with: python -m src.solution
+"""
+
+import mmap
+import os
+import struct
+from math import inf
+from typing import Optional
+
+from .board import Board, GAME_STATE, SQUARES
+
+MAGIC = b"TTT1"
+VALUE_OFFSET = 64
+ENTRY = struct.Struct("<H")
+ENTRY_COUNT = 3**9
+
+DEFAULT_PATH = os.path.join(os.path.dirname(__file__), "solutions.bin")
+
+# TERNARY[bits] is the base 3 number with a 1 in every digit set in bits
+TERNARY = tuple(
+    sum(3**square for square in range(9) if bits & (1 << square))
+    for bits in range(512)
+)
+
+
+def position_index(x_bits: int, o_bits: int) -> int:
+    """Gets the index of a position in the solution file"""
+    return TERNARY[x_bits] + 2 * TERNARY[o_bits]
+
+
+def solve_all() -> dict:
+    """Solves every reachable position that is still being played
+
+    Returns:
+        dict: (x_bits, o_bits) mapped to (value, best move mask)
+    """
+    # imported here since the ai itself loads the solution table
+    from .ai import minimax
+    from .transposition import TranspositionTable
+
+    table = TranspositionTable()
+    solved = {}
+
+    def visit(board: Board):
+        key = (board.x_bits, board.o_bits)
+        if key in solved or board.state == GAME_STATE.GAME_OVER:
+            return
+
+        sign = 1 if board.turn == "x" else -1
+        values = {}
+        for file, rank, bit in SQUARES:
+            if board.empty_bits & bit:
+                board.play(file, rank)
+                values[bit] = minimax(board, -inf, inf, board.turn == "x", False, table)
+                visit(board)
+                board.undo()
+
+        best = max(value * sign for value in values.values())
+        moves = sum(bit for bit, value in values.items() if value * sign == best)
+        solved[key] = (best * sign, moves)
+
+    visit(Board())
+    return solved
+
+
+def generate(path: str = DEFAULT_PATH) -> int:
+    """Solves the game and writes the solution file
+
+    Args:
+        path (str, optional): where to write the file. Defaults to DEFAULT_PATH.
+
+    Returns:
+        int: the number of positions solved
+    """
+    entries = bytearray(ENTRY.size * ENTRY_COUNT)
+    solved = solve_all()
+
+    for (x_bits, o_bits), (value, moves) in solved.items():
+        ENTRY.pack_into(
+            entries,
+            ENTRY.size * position_index(x_bits, o_bits),
+            moves | (value + VALUE_OFFSET) << 9,
+        )
+
+    with open(path, "wb") as file:
+        file.write(MAGIC)
+        file.write(entries)
+
+    return len(solved)
+
+
+class SolutionTable:
+    """A read-only memory mapped view of the solution file"""
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        with open(path, "rb") as file:
+            self.__map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        expected_size = len(MAGIC) + ENTRY.size * ENTRY_COUNT
+        if self.__map[: len(MAGIC)] != MAGIC or len(self.__map) != expected_size:
+            self.__map.close()
+            raise ValueError(f"{path} is not a tic tak toe solution file")
+
+    def lookup(self, x_bits: int, o_bits: int) -> Optional[tuple]:
+        """Gets the solution of a position
+
+        Args:
+            x_bits (int): the squares taken by x
+            o_bits (int): the squares taken by o
+
+        Returns:
+            tuple | None: the value from x's side and the mask of the best
+            moves, or None if the position is over or unreachable
+        """
+        (entry,) = ENTRY.unpack_from(
+            self.__map, len(MAGIC) + ENTRY.size * position_index(x_bits, o_bits)
+        )
+        moves = entry & 0b111_111_111
+        if moves == 0:
+            return None
+        return (entry >> 9) - VALUE_OFFSET, moves
+
+    def best_move(self, board: Board) -> Optional[tuple]:
+        """Gets the best move for a board. When several moves are equally
+        good it picks the one the search would have picked
+
+        Args:
+            board (Board): the board to check
+
+        Returns:
+            tuple | None: the positions of the best move or None if the game is over
+        """
+        solution = self.lookup(board.x_bits, board.o_bits)
+        if solution is None:
+            return None
+
+        moves = solution[1]
+        return [(file, rank) for file, rank, bit in SQUARES if moves & bit][-1]
+
+    def close(self):
+        """Unmaps the solution file"""
+        self.__map.close()
+
+
+def load_solutions(path: str = DEFAULT_PATH) -> Optional[SolutionTable]:
+    """Loads the solution file if it has been generated
+
+    Args:
+        path (str, optional): the file to load. Defaults to DEFAULT_PATH.
+
+    Returns:
+        SolutionTable | None: the table or None if there is no valid file
+    """
+    try:
+        return SolutionTable(path)
+    except (OSError, ValueError):
+        return None
+
+
+if __name__ == "__main__":
+    print(f"solved {generate()} positions into {DEFAULT_PATH}")
@@ -0,0 +1,237 @@
+"""This module contains the symmetries of the board (the rotations and
+reflections of the square, or just the reflections of a rectangle) and
+helpers to reduce a position to a single canonical key shared by all of
+its symmetric copies
+"""
+
+from functools import lru_cache
+
+
+def _transform_functions(width: int, height: int) -> tuple:
+    """Gets the functions mapping (file, rank) to its new (file, rank)
+    for every symmetry of a width x height board"""
+    last_file, last_rank = width - 1, height - 1
+    functions = (
+        lambda file, rank: (file, rank),  # identity
+        lambda file, rank: (last_file - file, last_rank - rank),  # rotate 180
+        lambda file, rank: (last_file - file, rank),  # mirror files
+        lambda file, rank: (file, last_rank - rank),  # mirror ranks
+    )
+    if width != height:
+        return functions
+
+    return (
+        functions[0],
+        lambda file, rank: (last_rank - rank, file),  # rotate 90
+        functions[1],
+        lambda file, rank: (rank, last_file - file),  # rotate 270
+        functions[2],
+        functions[3],
+        lambda file, rank: (rank, file),  # main diagonal
+        lambda file, rank: (last_rank - rank, last_file - file),  # anti diagonal
+    )
+
+
+class Symmetries:
+    """The symmetries of a board size. Get them with get_symmetries so
+    every board of the same size shares one instance.
+
+    Small boards transform a whole bitboard with one table lookup, bigger
+    boards look every rank up separately.
+    """
+
+    # boards up to this many squares get a lookup table for every bitboard
+    FULL_TABLE_SIZE = 12
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.size = width * height
+        self.full_board = (1 << self.size) - 1
+
+        # transforms[t][square] is the square that square is sent to by transform t
+        self.transforms = tuple(
+            tuple(
+                (lambda new: new[0] + new[1] * width)(
+                    function(square % width, square // width)
+                )
+                for square in range(self.size)
+            )
+            for function in _transform_functions(width, height)
+        )
+
+        # inverse_transforms[t] undoes transforms[t]
+        self.inverse_transforms = tuple(
+            tuple(transform.index(square) for square in range(self.size))
+            for transform in self.transforms
+        )
+
+        # the squares in the order available_positions uses
+        self.squares = tuple(
+            (file, rank, 1 << (file + rank * width))
+            for file in range(width)
+            for rank in range(height)
+        )
+
+        self.mask_tables = None
+        self.__rank_tables = None
+        if self.size <= self.FULL_TABLE_SIZE:
+            self.mask_tables = tuple(
+                tuple(self.__transform_slow(mask, t) for mask in range(1 << self.size))
+                for t in range(len(self.transforms))
+            )
+        else:
+            self.__rank_tables = tuple(
+                tuple(
+                    tuple(
+                        self.__transform_slow(row << (rank * width), t)
+                        for row in range(1 << width)
+                    )
+                    for rank in range(height)
+                )
+                for t in range(len(self.transforms))
+            )
+
+    def __transform_slow(self, mask: int, t: int) -> int:
+        transform = self.transforms[t]
+        result = 0
+        for square in range(self.size):
+            if mask & (1 << square):
+                result |= 1 << transform[square]
+        return result
+
+    def transform_bits(self, bits: int, t: int) -> int:
+        """Applies transform t to a bitboard
+
+        Args:
+            bits (int): the bitboard to transform
+            t (int): the index of the transform in transforms
+
+        Returns:
+            int: the transformed bitboard
+        """
+        if self.mask_tables is not None:
+            return self.mask_tables[t][bits]
+
+        width, row_mask = self.width, (1 << self.width) - 1
+        result = 0
+        for rank, table in enumerate(self.__rank_tables[t]):
+            row = (bits >> (rank * width)) & row_mask
+            if row:
+                result |= table[row]
+        return result
+
+    def canonical_key(self, x_bits: int, o_bits: int) -> int:
+        """Gets the key shared by the position and all of its rotations
+        and reflections. It is the smallest packed form of the copies
+
+        Args:
+            x_bits (int): the squares taken by x
+            o_bits (int): the squares taken by o
+
+        Returns:
+            int: the canonical packed position
+        """
+        size = self.size
+        if self.mask_tables is not None:
+            return min(
+                table[x_bits] | table[o_bits] << size for table in self.mask_tables
+            )
+
+        transform_bits = self.transform_bits
+        return min(
+            transform_bits(x_bits, t) | transform_bits(o_bits, t) << size
+            for t in range(len(self.transforms))
+        )
+
+    def canonical_transform(self, x_bits: int, o_bits: int) -> tuple:
+        """Gets the canonical key of the position together with the index
+        of a transform that turns the position into it
+
+        Args:
+            x_bits (int): the squares taken by x
+            o_bits (int): the squares taken by o
+
+        Returns:
+            tuple: the canonical packed position and the transform index
+        """
+        size = self.size
+        transform_bits = self.transform_bits
+        return min(
+            (transform_bits(x_bits, t) | transform_bits(o_bits, t) << size, t)
+            for t in range(len(self.transforms))
+        )
+
+    def stabilizer(self, x_bits: int, o_bits: int) -> tuple:
+        """Gets the transforms that leave the position unchanged
+
+        Args:
+            x_bits (int): the squares taken by x
+            o_bits (int): the squares taken by o
+
+        Returns:
+            tuple: the transforms that map the position onto itself
+        """
+        return tuple(
+            transform
+            for t, transform in enumerate(self.transforms)
+            if self.transform_bits(x_bits, t) == x_bits
+            and self.transform_bits(o_bits, t) == o_bits
+        )
+
+    def unique_moves(self, x_bits: int, o_bits: int, candidates: int = -1) -> list:
+        """Gets one move out of every group of moves that are the same
+        up to the symmetries of the position. On the empty 3x3 board that
+        is a corner, an edge and the center.
+
+        The move kept for each group is the last of the group in
+        available_positions order, so they are real coordinates on the
+        board and picking the last best move still picks the same move
+        as searching every available position would.
+
+        Args:
+            x_bits (int): the squares taken by x
+            o_bits (int): the squares taken by o
+            candidates (int, optional): a mask of the squares worth
+                considering. Defaults to every square.
+
+        Returns:
+            list: the (file, rank) of the distinct moves in available_positions order
+        """
+        symmetries = self.stabilizer(x_bits, o_bits)
+        empty = self.full_board & ~(x_bits | o_bits) & candidates
+        covered = 0
+        moves = []
+
+        for file, rank, bit in reversed(self.squares):
+            if empty & bit and not covered & bit:
+                moves.append((file, rank))
+                for transform in symmetries:
+                    covered |= 1 << transform[file + rank * self.width]
+
+        moves.reverse()
+        return moves
+
+
+@lru_cache(maxsize=None)
+def get_symmetries(width: int = 3, height: int = 3) -> Symmetries:
+    """Gets the shared Symmetries for a board size"""
+    return Symmetries(width, height)
+
+
+CLASSIC_SYMMETRIES = get_symmetries()
+
+# TRANSFORMS[t][square] is the square that square is sent to by transform t
+TRANSFORMS = CLASSIC_SYMMETRIES.transforms
+
+# MASK_TABLES[t][bits] is the 3x3 bitboard bits after transform t
+MASK_TABLES = CLASSIC_SYMMETRIES.mask_tables
+
+canonical_key = CLASSIC_SYMMETRIES.canonical_key
+stabilizer = CLASSIC_SYMMETRIES.stabilizer
+unique_moves = CLASSIC_SYMMETRIES.unique_moves
+
+
+def pack(x_bits: int, o_bits: int, size: int = 9) -> int:
+    """Packs both bitboards into a single integer"""
+    return x_bits | o_bits << size
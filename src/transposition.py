@@ -0,0 +1,109 @@
+"""This module contains the transposition table the ai uses to remember
+the scores of positions it has already searched
+"""
+
+from collections import OrderedDict
+from math import inf
+from typing import Optional
+
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+
+class TranspositionTable:
+    """Stores search results keyed by canonical position.
+
+    Every entry is a (value, flag, depth) triple where flag says whether
+    the value is exact or only a lower/upper bound because the search was
+    cut off, and depth is how many moves ahead the search looked. When
+    max_size is set the least recently used entries are evicted.
+    """
+
+    def __init__(self, max_size: Optional[int] = None):
+        self.max_size = max_size
+        self.__entries = OrderedDict()
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __contains__(self, key: int):
+        return key in self.__entries
+
+    def probe(
+        self, key: int, alpha: float, beta: float, depth: float = 0
+    ) -> Optional[float]:
+        """Looks up a position and returns its value if the stored entry
+        is enough to answer a search with the given window and depth
+
+        Args:
+            key (int): the canonical key of the position
+            alpha (float): the lower end of the search window
+            beta (float): the upper end of the search window
+            depth (float, optional): how many moves ahead the search has to
+                look. Defaults to 0.
+
+        Returns:
+            float | None: the value to use or None if the position must be searched
+        """
+        if self.max_size is None:
+            entry = self.__entries.get(key)
+            if entry is None:
+                return None
+        else:
+            # pop and put back in one step, threads sharing the table can
+            # evict the key between a get and a move_to_end
+            try:
+                entry = self.__entries.pop(key)
+            except KeyError:
+                return None
+            self.__entries[key] = entry
+
+        value, flag, entry_depth = entry
+        if entry_depth < depth:
+            return None
+        if flag == EXACT:
+            return value
+        if flag == LOWER_BOUND and value >= beta:
+            return value
+        if flag == UPPER_BOUND and value <= alpha:
+            return value
+        return None
+
+    def store(
+        self, key: int, value: float, alpha: float, beta: float, depth: float = inf
+    ):
+        """Stores the result of searching a position
+
+        Args:
+            key (int): the canonical key of the position
+            value (float): the value the search returned
+            alpha (float): the lower end of the window the position was searched with
+            beta (float): the upper end of the window the position was searched with
+            depth (float, optional): how many moves ahead the search looked.
+                Defaults to inf, a search to the end of the game.
+        """
+        if value <= alpha:
+            flag = UPPER_BOUND
+        elif value >= beta:
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT
+
+        if self.max_size is None:
+            self.__entries[key] = (value, flag, depth)
+            return
+
+        # removed and added again so it is the most recently used, without
+        # a move_to_end another thread's eviction could make fail
+        self.__entries.pop(key, None)
+        self.__entries[key] = (value, flag, depth)
+        while len(self.__entries) > self.max_size:
+            try:
+                self.__entries.popitem(last=False)
+            except KeyError:
+                break
+
+    def clear(self):
+        """Removes every entry from the table"""
+        self.__entries.clear()
@@ -25,3 +25,11 @@ class PositionAlreadyPlayedOnError(IndexError):
 
     def __init__(self, position: tuple):
         super().__init__(f"position {position} is already filled")
+
+
+class SearchBudgetExceededError(Exception):
+    """Custom Exception for when a search runs out of time or nodes.
+    The search catches it itself and falls back to its last finished depth"""
+
+    def __init__(self):
+        super().__init__("The search ran out of its time or node budget!")
@@ -0,0 +1,134 @@
+"""This module classifies whole arrays of positions at once with numpy,
+for when there are far too many to put on a Board one at a time.
+
+A position is a row of size int8 values, square file + rank * width
+being X (1), O (-1) or EMPTY (0). The win check is a single matrix
+product with the line matrix, which has a row of ones for every line.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+from .board import GAME_STATE, get_geometry
+
+EMPTY = 0
+X = 1
+O = -1
+
+
+@lru_cache(maxsize=None)
+def line_matrix(width: int = 3, height: int = 3, k: int = 3) -> np.ndarray:
+    """Gets the (lines, squares) matrix with a 1 wherever a line covers a square
+
+    Args:
+        width (int, optional): the width of the board. Defaults to 3.
+        height (int, optional): the height of the board. Defaults to 3.
+        k (int, optional): how many in a row win. Defaults to 3.
+
+    Returns:
+        np.ndarray: the read-only int8 line matrix
+    """
+    geometry = get_geometry(width, height, k)
+    matrix = np.array(
+        [
+            [(mask >> square) & 1 for square in range(geometry.size)]
+            for mask in geometry.win_masks
+        ],
+        dtype=np.int8,
+    )
+    matrix.flags.writeable = False
+    return matrix
+
+
+LINE_MATRIX = line_matrix()
+
+
+def from_boards(boards: list) -> np.ndarray:
+    """Turns a list of boards of the same size into an (N, size) position array"""
+    pieces = {"x": X, "o": O, " ": EMPTY}
+    return np.array(
+        [
+            [pieces[piece] for row in board.get_board() for piece in row]
+            for board in boards
+        ],
+        dtype=np.int8,
+    )
+
+
+def from_packed(packed, size: int = 9) -> np.ndarray:
+    """Turns positions packed with Board.pack into an (N, size) position
+    array. Both bitboards have to fit in 64 bits, so boards can have at
+    most 32 squares
+
+    Args:
+        packed (iterable): the packed positions
+        size (int, optional): the number of squares on the board. Defaults to 9.
+
+    Raises:
+        ValueError: It is raised when the board has more than 32 squares
+
+    Returns:
+        np.ndarray: the position array
+    """
+    if size > 32:
+        raise ValueError(f"packed {size} square boards don't fit in 64 bits")
+
+    packed = np.asarray(packed, dtype=np.uint64).reshape(-1, 1)
+    bits = np.uint64(1) << np.arange(size, dtype=np.uint64)
+    x_squares = (packed & bits) != 0
+    o_squares = ((packed >> np.uint64(size)) & bits) != 0
+    return (x_squares.astype(np.int8) - o_squares.astype(np.int8)).astype(np.int8)
+
+
+def classify(
+    positions: np.ndarray, width: int = 3, height: int = 3, k: int = 3
+) -> tuple:
+    """Finds the winner and game state of every position, the same way
+    Board.check_state does
+
+    Args:
+        positions (np.ndarray): the (N, size) int8 position array
+        width (int, optional): the width of the board. Defaults to 3.
+        height (int, optional): the height of the board. Defaults to 3.
+        k (int, optional): how many in a row win. Defaults to 3.
+
+    Returns:
+        tuple: the int8 winners (X, O or EMPTY for nobody) and the int8
+        states (the GAME_STATE values) of every position
+    """
+    positions = np.asarray(positions, dtype=np.int8)
+    totals = positions.astype(np.int16) @ line_matrix(width, height, k).T.astype(
+        np.int16
+    )
+
+    winners = np.where(
+        (totals == k).any(axis=1), X, np.where((totals == -k).any(axis=1), O, EMPTY)
+    ).astype(np.int8)
+
+    is_over = (winners != EMPTY) | (positions != EMPTY).all(axis=1)
+    states = np.where(
+        is_over, GAME_STATE.GAME_OVER.value, GAME_STATE.PLAYING.value
+    ).astype(np.int8)
+
+    return winners, states
+
+
+def legal_moves(
+    positions: np.ndarray, width: int = 3, height: int = 3, k: int = 3
+) -> np.ndarray:
+    """Finds the squares that can be played on in every position, which is
+    none of them once the game is over
+
+    Args:
+        positions (np.ndarray): the (N, size) int8 position array
+        width (int, optional): the width of the board. Defaults to 3.
+        height (int, optional): the height of the board. Defaults to 3.
+        k (int, optional): how many in a row win. Defaults to 3.
+
+    Returns:
+        np.ndarray: an (N, size) bool mask of the legal moves
+    """
+    positions = np.asarray(positions, dtype=np.int8)
+    _, states = classify(positions, width, height, k)
+    return (positions == EMPTY) & (states == GAME_STATE.PLAYING.value)[:, None]
@@ -1,10 +1,39 @@
 import unittest
 from .test_board import BoardTestSuite
 from .test_ai import AiTestSuite
+from .test_transposition import TranspositionTestSuite
+from .test_solution import SolutionTestSuite
+from .test_vectorized import VectorizedTestSuite
+from .test_engine_pool import EnginePoolTestSuite
+from .test_edit_scheduler import EditSchedulerTestSuite
+from .test_render import RenderTestSuite
+from .test_interaction_router import InteractionRouterTestSuite
+from .test_session_store import SessionStoreTestSuite
+from .test_sharding import ShardingTestSuite
+from .test_session_registry import SessionRegistryTestSuite
+from .test_metrics import MetricsTestSuite
+from .test_loop_watchdog import LoopWatchdogTestSuite
+from .test_profiler import ProfilerTestSuite
 
 
 def run_mytests():
-    test_classes = [BoardTestSuite, AiTestSuite]
+    test_classes = [
+        BoardTestSuite,
+        AiTestSuite,
+        TranspositionTestSuite,
+        SolutionTestSuite,
+        VectorizedTestSuite,
+        EnginePoolTestSuite,
+        EditSchedulerTestSuite,
+        RenderTestSuite,
+        InteractionRouterTestSuite,
+        SessionStoreTestSuite,
+        ShardingTestSuite,
+        SessionRegistryTestSuite,
+        MetricsTestSuite,
+        LoopWatchdogTestSuite,
+        ProfilerTestSuite,
+    ]
 
     loader = unittest.TestLoader()
     test_suites = []
@@ -1,8 +1,22 @@
 import unittest
+from math import inf
 from random import randint
+from unittest import mock
 
-from src.ai import evaluate_board, get_best_move
-from src.board import Board
+from src.ai import (
+    SearchContext,
+    SearchStats,
+    evaluate_board,
+    get_best_move,
+    minimax,
+    negamax,
+)
+from src.ai import count_lines, get_best_moves, iterative_deepening, search_best_move
+from src.board import Board, GAME_STATE
+from src.solution import SolutionTable
+from src.symmetry import MASK_TABLES, unique_moves
+from src.transposition import TranspositionTable
+from src.utils import PlayingAfterGameOverError
 
 
 class AiTestSuite(unittest.TestCase):
@@ -59,6 +73,214 @@ class AiTestSuite(unittest.TestCase):
         self.assertEqual("x", self.board.winner)
         self.assertEqual(Board.GAME_STATE.GAME_OVER, self.board.state)
 
+    def test_unique_moves_collapse_symmetric_moves(self):
+        """3. Only moves that differ up to symmetry are searched at the root"""
+        self.assertEqual([(1, 1), (2, 1), (2, 2)], unique_moves(0, 0))
+        self.assertEqual([(2, 1), (2, 2)], unique_moves(1 << 4, 0))
+        self.assertEqual(7, len(unique_moves(1 << 0, 1 << 5)))
+
+    @mock.patch("src.ai.SOLUTION_TABLE", None)
+    def test_symmetry_pruned_moves_are_optimal(self):
+        """4. The searched move is always one of the best moves"""
+        solutions = SolutionTable()
+        seen = set()
+
+        def check(board):
+            key = (board.x_bits, board.o_bits)
+            if key in seen or board.state == GAME_STATE.GAME_OVER:
+                return
+            seen.add(key)
+
+            file, rank = get_best_move(board, True)
+            _, best_moves = solutions.lookup(board.x_bits, board.o_bits)
+            self.assertTrue(best_moves & (1 << (file + rank * 3)))
+
+            for position in board.available_positions():
+                board.play(*position)
+                check(board)
+                board.undo()
+
+        check(Board())
+        solutions.close()
+        self.assertEqual(4520, len(seen))
+
+    def test_negamax_scores_match_minimax(self):
+        """5. Negamax gives every reachable position the same score as minimax"""
+        table = TranspositionTable()
+        minimax_table = TranspositionTable()
+        seen = set()
+
+        def check(board):
+            key = (board.x_bits, board.o_bits)
+            if key in seen:
+                return
+            seen.add(key)
+
+            sign = 1 if board.turn == "x" else -1
+            expected = minimax(board, -inf, inf, sign == 1, False, minimax_table)
+            value = negamax(board, -inf, inf, SearchContext(table))
+            self.assertEqual(expected * sign, value)
+
+            if board.state == GAME_STATE.GAME_OVER:
+                return
+
+            for position in board.available_positions():
+                board.play(*position)
+                check(board)
+                board.undo()
+
+        check(Board())
+        self.assertEqual(5478, len(seen))
+
+    def test_negamax_searches_fewer_nodes(self):
+        """6. Ordered alpha beta visits a fraction of the nodes of plain minimax"""
+        context = SearchContext()
+        move, value = search_best_move(Board(), context)
+
+        self.assertEqual(0, value)
+        self.assertIn(move, Board().available_positions())
+        self.assertLess(context.nodes, 549946 // 50)
+
+    def test_big_boards_win_and_block(self):
+        """7. On bigger boards the ai completes its own lines and blocks the other side"""
+        for is_hard in (False, True):
+            board = Board(7, 7, 5)
+            for move in [
+                (1, 1),
+                (1, 5),
+                (2, 1),
+                (2, 5),
+                (3, 1),
+                (3, 5),
+                (0, 5),
+                (0, 1),
+                (4, 1),
+            ]:
+                board.play(*move)
+
+            # o has to block x's four in a row
+            self.assertEqual((5, 1), get_best_move(board, is_hard))
+
+            # x wins rather than blocking o's four
+            board.play(4, 5)
+            self.assertEqual((5, 1), get_best_move(board, is_hard))
+
+    def test_count_lines_is_scored_for_the_side_to_move(self):
+        """8. The horizon score flips with the side to move"""
+        board = Board(5, 5, 4)
+        board.play(2, 2)
+        self.assertLess(count_lines(board), 0)
+
+        board.play(0, 0)
+        self.assertGreater(count_lines(board), 0)
+
+    def test_iterative_deepening_stops_at_its_budget(self):
+        """9. Deepening searches return their deepest finished result in budget"""
+        board = Board(7, 7, 5)
+        board.play(3, 3)
+
+        result = iterative_deepening(board, max_depth=2, table=TranspositionTable())
+        self.assertEqual(2, result.depth)
+        self.assertIn(result.move, board.available_positions())
+
+        result = iterative_deepening(board, node_limit=500, table=TranspositionTable())
+        self.assertTrue(0 < result.depth < board.size)
+        self.assertLessEqual(result.nodes, 500)
+
+        result = iterative_deepening(board, time_limit=0, table=TranspositionTable())
+        self.assertEqual(0, result.depth)
+        self.assertIn(result.move, board.available_positions())
+
+        self.assertEqual(1, board.depth)
+        self.assertEqual((3, 3), board.last_move)
+        self.assertEqual((1 << 24, 0), (board.x_bits, board.o_bits))
+
+    @mock.patch("src.ai.SOLUTION_TABLE", None)
+    def test_batched_moves_fit_every_position(self):
+        """10. Batched moves are legal and, when hard, optimal for every copy"""
+        solutions = SolutionTable()
+
+        for is_hard in (False, True):
+            boards = []
+            for t in range(8):
+                board = Board.from_packed(
+                    MASK_TABLES[t][0b000_000_001] | MASK_TABLES[t][0b000_000_010] << 9
+                )
+                boards.extend([board, board.pack()])
+            moves = get_best_moves(boards, is_hard)
+
+            self.assertEqual(16, len(moves))
+            for board, move in zip(boards[::2], moves[::2]):
+                self.assertIn(move, board.available_positions())
+                if is_hard:
+                    _, best_moves = solutions.lookup(board.x_bits, board.o_bits)
+                    self.assertTrue(best_moves & (1 << (move[0] + move[1] * 3)))
+            self.assertEqual(moves[1::2], moves[::2])
+
+            big_board = Board(5, 5, 4)
+            big_board.play(0, 0)
+            self.assertIn(
+                get_best_moves([big_board], is_hard)[0],
+                big_board.available_positions(),
+            )
+
+            snapshots = [
+                big_board.snapshot(),
+                big_board.snapshot(),
+                boards[0].snapshot(),
+            ]
+            snapshot_moves = get_best_moves(snapshots, is_hard)
+            self.assertEqual(snapshot_moves[0], snapshot_moves[1])
+            self.assertIn(snapshot_moves[0], big_board.available_positions())
+            self.assertIn(snapshot_moves[2], boards[0].available_positions())
+
+        solutions.close()
+        self.assertRaises(
+            PlayingAfterGameOverError,
+            get_best_moves,
+            [0b000_000_111 | 0b000_011_000 << 9],
+        )
+
+    @mock.patch("src.ai.SOLUTION_TABLE", None)
+    def test_search_stats(self):
+        """11. SearchStats counts what every kind of search did"""
+        root_moves = set(unique_moves(0, 0))
+
+        context = SearchContext(TranspositionTable())
+        move, _ = search_best_move(Board(), context)
+        stats = SearchStats()
+        self.assertEqual(
+            move, get_best_move(Board(), True, TranspositionTable(), stats=stats)
+        )
+
+        self.assertEqual("negamax", stats.method)
+        self.assertEqual(context.nodes, stats.nodes)
+        self.assertTrue(0 < stats.leaves < stats.nodes)
+        self.assertGreater(stats.cutoffs, 0)
+        self.assertGreater(stats.cache_hits, 0)
+        self.assertGreater(stats.cache_misses, 0)
+        self.assertTrue(0 < stats.max_depth <= 9)
+        self.assertEqual(root_moves, set(stats.root_moves))
+        self.assertGreaterEqual(stats.elapsed, sum(stats.root_moves.values()))
+
+        stats = SearchStats()
+        get_best_move(Board(), False, stats=stats)
+        self.assertEqual("minimax", stats.method)
+        self.assertTrue(0 < stats.leaves < stats.nodes)
+        self.assertGreater(stats.cutoffs, 0)
+        self.assertEqual(0, stats.cache_hits)
+        self.assertEqual(9, stats.max_depth)
+        self.assertEqual(root_moves, set(stats.root_moves))
+
+        stats = SearchStats()
+        board = Board(5, 5, 4)
+        board.play(2, 2)
+        get_best_move(board, True, TranspositionTable(), node_limit=500, stats=stats)
+        self.assertEqual("iterative deepening", stats.method)
+        self.assertTrue(0 < stats.nodes <= 500)
+        self.assertTrue(0 < stats.max_depth < board.size)
+        self.assertEqual(1, board.depth)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,5 +1,5 @@
 import unittest
-from src.board import Board
+from src.board import Board, GAME_STATE, SQUARES, WIN_MASKS
 from src.utils import InvalidPositionError
 from random import randint
 
@@ -106,6 +106,127 @@ class BoardTestSuite(unittest.TestCase):
         for (file, rank) in self.valid_board_positions:
             self.assertEqual(" ", self.board.get_position(file, rank))
 
+    def test_bitboards_follow_moves(self):
+        """9. Make sure the bitboards and get_board follow the played moves"""
+        self.board.play(1, 1)
+        self.board.play(2, 0)
+
+        self.assertEqual(1 << 4, self.board.x_bits)
+        self.assertEqual(1 << 2, self.board.o_bits)
+        self.assertEqual(0b111_111_111 & ~(1 << 4 | 1 << 2), self.board.empty_bits)
+        self.assertEqual(
+            [[" ", " ", "o"], [" ", "x", " "], [" ", " ", " "]],
+            self.board.get_board(),
+        )
+        self.assertNotIn((1, 1), self.board.available_positions())
+        self.assertEqual(7, len(self.board.available_positions()))
+
+    def test_every_win_mask_ends_the_game(self):
+        """10. Make sure filling any of the 8 lines wins the game"""
+        for mask in WIN_MASKS:
+            self.board.reset_board()
+            line = [(file, rank) for file, rank, bit in SQUARES if mask & bit]
+            others = [(file, rank) for file, rank, bit in SQUARES if not mask & bit]
+
+            for index, position in enumerate(line):
+                self.board.play(*position)
+                if index < 2:
+                    self.board.play(*others[index])
+
+            self.assertEqual("x", self.board.winner)
+            self.assertEqual(Board.GAME_STATE.GAME_OVER, self.board.state)
+
+    def test_undo_restores_previous_state(self):
+        """11. Undoing the winning move puts the game back into play"""
+        for move in [(0, 0), (1, 0), (0, 1), (1, 1), (0, 2)]:
+            self.board.play(*move)
+
+        self.board.undo()
+        self.assertEqual(None, self.board.winner)
+        self.assertEqual(Board.GAME_STATE.PLAYING, self.board.state)
+        self.assertEqual("x", self.board.turn)
+
+    def test_incremental_state_matches_full_scan(self):
+        """12. The state tracked by play matches a full check_state scan"""
+        for _ in range(200):
+            self.board.reset_board()
+            while self.board.state == Board.GAME_STATE.PLAYING:
+                moves = self.board.available_positions()
+                self.board.play(*moves[randint(0, len(moves) - 1)])
+
+                tracked = (self.board.state, self.board.winner)
+                self.board.check_state()
+                self.assertEqual(tracked, (self.board.state, self.board.winner))
+
+    def test_variant_geometry(self):
+        """13. Bigger boards have the right number of lines and squares"""
+        variants = [((3, 3, 3), 8), ((4, 4, 4), 10), ((5, 5, 4), 28), ((7, 7, 5), 60)]
+
+        for variant, lines in variants:
+            board = Board(*variant)
+
+            self.assertEqual(lines, len(board.geometry.win_masks))
+            self.assertEqual(variant[0] * variant[1], len(board.available_positions()))
+            self.assertEqual(
+                [[" "] * variant[0] for _ in range(variant[1])], board.get_board()
+            )
+            self.assertRaises(InvalidPositionError, board.get_position, variant[0], 0)
+
+    def test_variant_needs_k_in_a_row(self):
+        """14. A line is only won once it is k long"""
+        board = Board(5, 5, 4)
+        for move in [(0, 0), (0, 1), (1, 0), (1, 1), (2, 0), (2, 1)]:
+            board.play(*move)
+        self.assertEqual(Board.GAME_STATE.PLAYING, board.state)
+
+        board.play(3, 0)
+        self.assertEqual("x", board.winner)
+        self.assertEqual(Board.GAME_STATE.GAME_OVER, board.state)
+
+        self.assertRaises(ValueError, Board, 3, 3, 4)
+
+    def test_pack_round_trip(self):
+        """15. A packed board unpacks to the same position"""
+        for move in [(1, 1), (0, 0), (2, 0)]:
+            self.board.play(*move)
+
+        board = Board.from_packed(self.board.pack())
+        self.assertEqual(self.board.get_board(), board.get_board())
+        self.assertEqual(("o", 3), (board.turn, board.depth))
+        self.assertEqual(self.board.state, board.state)
+
+        big_board = Board(5, 5, 4)
+        big_board.play(4, 4)
+        self.assertEqual(
+            "x", Board.from_packed(big_board.pack(), 5, 5, 4).get_position(4, 4)
+        )
+
+        for packed in [1 | 1 << 9, 1 << 9, 0b11]:
+            self.assertRaises(ValueError, Board.from_packed, packed)
+
+    def test_snapshot_round_trip(self):
+        """16. A snapshot restores the position and is hashable"""
+        for move in [(1, 1), (0, 0)]:
+            self.board.play(*move)
+
+        snapshot = self.board.snapshot()
+        self.assertEqual((self.board.pack(), "x", 3, 3, 3), snapshot)
+        self.assertEqual(1, {snapshot: 1}[Board.from_snapshot(snapshot).snapshot()])
+
+        self.board.play(2, 2)
+        board = Board.from_snapshot(snapshot)
+        self.assertEqual(" ", board.get_position(2, 2))
+        self.assertEqual(("x", 2), (board.turn, board.depth))
+        self.assertEqual(GAME_STATE.PLAYING, board.state)
+
+        big_board = Board(5, 5, 4)
+        big_board.play(4, 4)
+        self.assertEqual(
+            "x", Board.from_snapshot(big_board.snapshot()).get_position(4, 4)
+        )
+
+        self.assertRaises(ValueError, Board.from_snapshot, snapshot._replace(turn="o"))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,112 @@
+import asyncio
+import time
+import unittest
+
+from src.edit_scheduler import EditScheduler, TokenBucket
+
+
+class Message:
+    """Records the edits made to it"""
+
+    def __init__(self):
+        self.edits = []
+
+    def editor(self, content):
+        async def send():
+            self.edits.append(content)
+
+        return send
+
+
+class EditSchedulerTestSuite(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = EditScheduler()
+        self.message = Message()
+
+    def test_token_bucket(self):
+        """1. The bucket allows a burst, then refills at its rate"""
+        now = 0.0
+        bucket = TokenBucket(2, 3, clock=lambda: now)
+
+        self.assertEqual([0, 0, 0], [bucket.reserve() for _ in range(3)])
+        self.assertAlmostEqual(0.5, bucket.reserve())
+
+        now = 0.25
+        self.assertAlmostEqual(0.25, bucket.reserve())
+        now = 0.5
+        self.assertEqual(0, bucket.reserve())
+
+    def test_edits_are_merged(self):
+        """2. Edits made before the message is edited become one edit of the latest state"""
+
+        async def main():
+            futures = [
+                self.scheduler.edit(
+                    "message", "route", state, self.message.editor(state)
+                )
+                for state in range(5)
+            ]
+            self.assertEqual(1, self.scheduler.queue_depth)
+            await asyncio.gather(*futures)
+
+        asyncio.run(main())
+        self.assertEqual([4], self.message.edits)
+        self.assertEqual(
+            (1, 4, 0),
+            (
+                self.scheduler.sent,
+                self.scheduler.merged,
+                self.scheduler.queue_depth,
+            ),
+        )
+
+    def test_unchanged_edits_are_skipped(self):
+        """3. An edit showing what the message already shows is only sent when forced"""
+
+        async def main():
+            for state, force in [("a", False), ("a", False), ("b", False), ("b", True)]:
+                await self.scheduler.edit(
+                    "message", "route", state, self.message.editor(state), force
+                )
+
+        asyncio.run(main())
+        self.assertEqual(["a", "b", "b"], self.message.edits)
+        self.assertEqual((3, 1), (self.scheduler.sent, self.scheduler.skipped))
+
+    def test_routes_are_rate_limited(self):
+        """4. Messages on one route share its rate limit, other routes don't wait"""
+        scheduler = EditScheduler(rate=10, burst=1)
+
+        async def edit(key, route):
+            await scheduler.edit(key, route, key, self.message.editor(key))
+            return time.perf_counter()
+
+        async def main():
+            start = time.perf_counter()
+            times = await asyncio.gather(
+                edit("first", "channel"),
+                edit("second", "channel"),
+                edit("third", "other channel"),
+            )
+            return [finished - start for finished in times]
+
+        first, second, third = asyncio.run(main())
+        self.assertLess(first, 0.05)
+        self.assertLess(third, 0.05)
+        self.assertGreaterEqual(second, 0.09)
+        self.assertEqual(["first", "second", "third"], sorted(self.message.edits))
+
+    def test_failed_edits(self):
+        """5. A failed edit reaches the caller and the next edit is still sent"""
+
+        async def fail():
+            raise RuntimeError("discord is down")
+
+        async def main():
+            with self.assertRaises(RuntimeError):
+                await self.scheduler.edit("message", "route", "a", fail)
+            await self.scheduler.edit("message", "route", "a", self.message.editor("a"))
+
+        asyncio.run(main())
+        self.assertEqual(["a"], self.message.edits)
+        self.assertEqual((1, 1), (self.scheduler.sent, self.scheduler.errors))
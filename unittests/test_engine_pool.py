@@ -0,0 +1,97 @@
+import asyncio
+import time
+import unittest
+
+from src.ai import get_best_move
+from src.board import Board
+from src.engine_pool import EnginePool
+
+
+class EnginePoolTestSuite(unittest.TestCase):
+    def setUp(self):
+        self.pool = EnginePool(workers=2, use_processes=False, max_pending=2)
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_matches_get_best_move(self):
+        """1. The pool answers the same move get_best_move does"""
+        board = Board()
+        board.play(0, 0)
+
+        move = asyncio.run(self.pool.best_move(board, True))
+        self.assertEqual(get_best_move(board, True), move)
+
+    def test_board_is_not_changed(self):
+        """2. Asking for a move leaves the board as it was"""
+        board = Board(5, 5, 4)
+        board.play(2, 2)
+        packed = board.pack()
+
+        asyncio.run(self.pool.best_move(board, True, time_limit=0.1))
+        self.assertEqual(packed, board.pack())
+        self.assertEqual("o", board.turn)
+        self.assertEqual((2, 2), board.last_move)
+
+    def test_pending_is_bounded(self):
+        """3. No more than max_pending moves are handed to the pool at once"""
+        most_pending = 0
+
+        async def watch():
+            nonlocal most_pending
+            while True:
+                most_pending = max(most_pending, self.pool.pending)
+                await asyncio.sleep(0)
+
+        async def main():
+            watcher = asyncio.create_task(watch())
+            boards = [Board(5, 5, 4) for _ in range(6)]
+            moves = await asyncio.gather(
+                *(self.pool.best_move(board, True, time_limit=0.05) for board in boards)
+            )
+            watcher.cancel()
+            return moves
+
+        moves = asyncio.run(main())
+        self.assertEqual(6, len(moves))
+        self.assertEqual(2, most_pending)
+        self.assertEqual(0, self.pool.pending)
+
+    def test_event_loop_keeps_running(self):
+        """4. The event loop keeps running while the pool searches"""
+        longest_gap = 0
+
+        async def tick():
+            nonlocal longest_gap
+            last = time.perf_counter()
+            while True:
+                await asyncio.sleep(0.01)
+                now = time.perf_counter()
+                longest_gap = max(longest_gap, now - last)
+                last = now
+
+        async def main():
+            ticker = asyncio.create_task(tick())
+            await self.pool.best_move(Board(7, 7, 5), True, time_limit=0.5)
+            ticker.cancel()
+
+        asyncio.run(main())
+        self.assertLess(longest_gap, 0.25)
+
+    def test_process_pool(self):
+        """5. The position gets to a worker process and the move gets back"""
+        engine = EnginePool(workers=1)
+        board = Board()
+        board.play(1, 1)
+
+        try:
+            move = asyncio.run(engine.best_move(board, True))
+            counted_move, stats = asyncio.run(engine.best_move_with_stats(board, False))
+        finally:
+            engine.shutdown()
+
+        self.assertIn(move, board.available_positions())
+        self.assertEqual(get_best_move(board, True), move)
+        self.assertEqual(get_best_move(board, False), counted_move)
+        self.assertEqual("minimax", stats.method)
+        self.assertGreater(stats.nodes, 0)
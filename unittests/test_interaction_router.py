@@ -0,0 +1,102 @@
+import asyncio
+import unittest
+
+from src.interaction_router import DISPATCH, InteractionRouter
+
+
+class InteractionRouterTestSuite(unittest.TestCase):
+    def setUp(self):
+        self.router = InteractionRouter()
+
+    def test_click_answers_prompt(self):
+        """1. A click answers its prompt with the button's value and closes it"""
+
+        async def main():
+            custom_ids, answer = self.router.create(["yes", "no"], 1)
+            self.assertEqual(1, self.router.pending)
+
+            self.assertEqual(
+                DISPATCH.RESOLVED, self.router.dispatch(custom_ids["no"], 1)
+            )
+            self.assertEqual("no", await self.router.wait(answer, 1))
+            self.assertEqual(
+                DISPATCH.NOT_FOUND, self.router.dispatch(custom_ids["yes"], 1)
+            )
+
+        asyncio.run(main())
+        self.assertEqual(0, self.router.pending)
+
+    def test_other_users_are_rejected(self):
+        """2. Only the user asked can answer, unless anyone may"""
+
+        async def main():
+            custom_ids, answer = self.router.create(["x", "o"], 1)
+            self.assertEqual(
+                DISPATCH.WRONG_USER, self.router.dispatch(custom_ids["x"], 2)
+            )
+            self.assertFalse(answer.done())
+            self.assertEqual(
+                DISPATCH.RESOLVED, self.router.dispatch(custom_ids["o"], 1)
+            )
+            self.assertEqual("o", await self.router.wait(answer))
+
+            custom_ids, answer = self.router.create(["x", "o"])
+            self.assertEqual(
+                DISPATCH.RESOLVED, self.router.dispatch(custom_ids["x"], 2)
+            )
+            self.assertEqual("x", await self.router.wait(answer))
+
+        asyncio.run(main())
+
+    def test_unanswered_prompts_time_out(self):
+        """3. A prompt nobody answers gives None and is cleaned up"""
+
+        async def main():
+            custom_ids, answer = self.router.create(["yes", "no"], 1)
+            self.assertIsNone(await self.router.wait(answer, 0.01))
+            self.assertEqual(
+                DISPATCH.NOT_FOUND, self.router.dispatch(custom_ids["yes"], 1)
+            )
+
+        asyncio.run(main())
+        self.assertEqual(0, self.router.pending)
+
+    def test_many_prompts(self):
+        """4. Every click reaches its own prompt among thousands"""
+
+        async def main():
+            prompts = [self.router.create(["a", "b"], user) for user in range(2000)]
+            for user, (custom_ids, _) in enumerate(prompts):
+                value = "ab"[user % 2]
+                self.assertEqual(
+                    DISPATCH.RESOLVED, self.router.dispatch(custom_ids[value], user)
+                )
+
+            answers = await asyncio.gather(
+                *(self.router.wait(answer) for _, answer in prompts)
+            )
+            self.assertEqual(["a", "b"] * 1000, answers)
+
+        asyncio.run(main())
+        self.assertEqual(0, self.router.pending)
+
+    def test_late_clicks_and_closed_prompts(self):
+        """5. A click on a prompt that timed out but isn't closed yet, or on
+        one closed without waiting, finds nothing"""
+
+        async def main():
+            custom_ids, answer = self.router.create(["yes", "no"], 1)
+            answer.cancel()
+            self.assertEqual(
+                DISPATCH.NOT_FOUND, self.router.dispatch(custom_ids["yes"], 1)
+            )
+            self.assertEqual(1, self.router.pending)
+
+            self.router.close(answer)
+            self.router.close(answer)
+            self.assertEqual(
+                DISPATCH.NOT_FOUND, self.router.dispatch(custom_ids["yes"], 1)
+            )
+
+        asyncio.run(main())
+        self.assertEqual(0, self.router.pending)
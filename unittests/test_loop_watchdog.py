@@ -0,0 +1,91 @@
+import asyncio
+import sys
+import time
+import unittest
+
+from src.loop_watchdog import LoopWatchdog, Stall, sample_stack
+from src.metrics import Metrics
+
+
+class Game:
+    async def update(self):
+        await self.start_computer()
+
+    async def start_computer(self):
+        time.sleep(0.3)
+
+
+async def on_reaction_add():
+    await Game().update()
+
+
+def watch(watchdog: LoopWatchdog, blocking):
+    """Runs the watchdog around a coroutine"""
+
+    async def main():
+        watcher = asyncio.create_task(watchdog.run())
+        await asyncio.sleep(0.05)
+        await blocking()
+        await asyncio.sleep(0.05)
+        watcher.cancel()
+
+    asyncio.run(main())
+
+
+class LoopWatchdogTestSuite(unittest.TestCase):
+    def test_stall_is_attributed(self):
+        """1. A stall is sampled and attributed to the coroutines blocking the loop"""
+        stalls = []
+        watchdog = LoopWatchdog(0.01, 0.1, on_stall=stalls.append)
+        watch(watchdog, on_reaction_add)
+
+        self.assertEqual(1, watchdog.stall_count)
+        self.assertEqual(list(watchdog.stalls), stalls)
+        stall = stalls[0]
+        self.assertGreaterEqual(stall.lag, 0.2)
+        self.assertEqual(
+            ("on_reaction_add", "Game.update", "Game.start_computer"),
+            stall.coroutines[-3:],
+        )
+        self.assertEqual("Game.start_computer", stall.coroutine)
+        self.assertIn("time.sleep(0.3)", stall.stack[-1])
+        self.assertEqual({"Game.start_computer": 1}, watchdog.stalls_by_coroutine)
+
+    def test_short_pauses_are_not_stalls(self):
+        """2. Lags under the threshold only count towards the percentiles"""
+        watchdog = LoopWatchdog(0.01, 0.5)
+        self.assertEqual({0.5: 0.0, 0.9: 0.0, 0.99: 0.0}, watchdog.percentiles())
+
+        async def pause():
+            time.sleep(0.1)
+
+        watch(watchdog, pause)
+        self.assertEqual(0, watchdog.stall_count)
+        self.assertFalse(watchdog.stalls)
+        self.assertGreaterEqual(len(watchdog.lags), 5)
+        percentiles = watchdog.percentiles((0.5, 1.0))
+        self.assertLess(percentiles[0.5], 0.05)
+        self.assertTrue(0.05 <= percentiles[1.0] < 0.5)
+
+    def test_callbacks_have_no_coroutine(self):
+        """3. A stack without coroutines is blamed on no coroutine"""
+        coroutines, stack = sample_stack(sys._getframe())
+        self.assertEqual((), coroutines)
+        self.assertIn("sample_stack(sys._getframe())", stack[-1])
+        self.assertIsNone(Stall(0, 1, coroutines, stack).coroutine)
+
+    def test_lag_is_observed(self):
+        """4. Every heartbeat's lag goes to on_lag, blocking shows up as lag"""
+        metrics = Metrics()
+        lag = metrics.histogram("lag", "Loop lag", (0.05,))
+        watchdog = LoopWatchdog(0.01, 1.0, on_lag=lag.observe)
+        watch(watchdog, on_reaction_add)
+
+        buckets = dict(line.split() for line in metrics.render().splitlines()[2:4])
+        self.assertEqual(len(watchdog.lags), lag.count())
+        self.assertEqual(lag.count(), int(buckets['lag_bucket{le="+Inf"}']))
+        self.assertLess(int(buckets['lag_bucket{le="0.05"}']), lag.count())
+
+
+if __name__ == "__main__":
+    unittest.main()
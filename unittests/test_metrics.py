@@ -0,0 +1,71 @@
+import asyncio
+import unittest
+
+from src.metrics import Metrics
+
+
+class MetricsTestSuite(unittest.TestCase):
+    def test_histogram_buckets(self):
+        """1. A histogram renders cumulative buckets, sum and count for every label set"""
+        metrics = Metrics()
+        latency = metrics.histogram("latency", "How long", (0.1, 1.0), ("difficulty",))
+        for value in (0.05, 0.5, 5.0):
+            latency.observe(value, "hard")
+        latency.observe(0.1, "easy")
+
+        lines = metrics.render().splitlines()
+        self.assertEqual(
+            ["# HELP latency How long", "# TYPE latency histogram"], lines[:2]
+        )
+        self.assertIn('latency_bucket{difficulty="easy",le="0.1"} 1', lines)
+        self.assertIn('latency_bucket{difficulty="hard",le="0.1"} 1', lines)
+        self.assertIn('latency_bucket{difficulty="hard",le="1"} 2', lines)
+        self.assertIn('latency_bucket{difficulty="hard",le="+Inf"} 3', lines)
+        self.assertIn('latency_sum{difficulty="hard"} 5.55', lines)
+        self.assertIn('latency_count{difficulty="hard"} 3', lines)
+        self.assertEqual(3, latency.count("hard"))
+
+    def test_sampled_metrics_are_read_when_rendered(self):
+        """2. Gauges and counters show the value their function has when rendered"""
+        metrics = Metrics()
+        games = {}
+        metrics.gauge("games", "Games being played", lambda: len(games))
+        metrics.counter("edits_total", "Edits sent", lambda: 2.0)
+
+        games[1] = "game"
+        text = metrics.render()
+        self.assertIn("# TYPE games gauge\ngames 1\n", text)
+        self.assertIn("# TYPE edits_total counter\nedits_total 2\n", text)
+
+    def test_http_endpoint(self):
+        """3. The metrics are served over HTTP on the running loop"""
+        metrics = Metrics()
+        metrics.gauge("answer", "The answer", lambda: 42)
+
+        async def get(port, target):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(f"GET {target} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+            response = await reader.read()
+            writer.close()
+            return response.decode()
+
+        async def main():
+            port = await metrics.serve("127.0.0.1", 0)
+            try:
+                return await get(port, "/metrics"), await get(port, "/")
+            finally:
+                metrics.close()
+
+        found, not_found = asyncio.run(main())
+        self.assertTrue(found.startswith("HTTP/1.1 200 OK\r\n"))
+        self.assertIn("Content-Type: text/plain; version=0.0.4", found)
+        self.assertTrue(
+            found.endswith(
+                "\r\n\r\n# HELP answer The answer\n# TYPE answer gauge\nanswer 42\n"
+            )
+        )
+        self.assertTrue(not_found.startswith("HTTP/1.1 404 Not Found\r\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+
+from src.board import Board
+from src.render import COMPUTER, EMPTY, PLAYER, render_board
+
+
+class RenderTestSuite(unittest.TestCase):
+    def test_render_matches_board(self):
+        """1. The grid shows every piece and the owners follow the person's side"""
+        board = Board()
+        for move in [(1, 1), (0, 0), (2, 0)]:
+            board.play(*move)
+
+        rendered = render_board(board.pack(), "o")
+        self.assertEqual(
+            ":regional_indicator_o: | :blue_square: | :regional_indicator_x:\n"
+            ":blue_square: | :regional_indicator_x: | :blue_square:\n"
+            ":blue_square: | :blue_square: | :blue_square:",
+            rendered.grid,
+        )
+        self.assertEqual(
+            (PLAYER, EMPTY, COMPUTER, EMPTY, COMPUTER) + (EMPTY,) * 4,
+            rendered.owners,
+        )
+        self.assertEqual(
+            (COMPUTER, EMPTY, PLAYER), render_board(board.pack(), "x").owners[:3]
+        )
+
+    def test_render_bigger_board(self):
+        """2. Bigger boards render a row for every rank"""
+        board = Board(5, 5, 4)
+        board.play(4, 4)
+
+        rendered = render_board(board.pack(), "x", 5, 5)
+        self.assertEqual(4, rendered.grid.count("\n"))
+        self.assertTrue(rendered.grid.endswith(":regional_indicator_x:"))
+        self.assertEqual((EMPTY,) * 24 + (PLAYER,), rendered.owners)
+
+    def test_renders_are_cached(self):
+        """3. Rendering the same position again is a cache hit"""
+        render_board.cache_clear()
+        first = render_board(0b1, "x")
+        second = render_board(0b1, "x")
+
+        self.assertIs(first, second)
+        self.assertEqual(1, render_board.cache_info().hits)
+        self.assertIsNot(first, render_board(0b1, "o"))
@@ -0,0 +1,118 @@
+import asyncio
+import sys
+import unittest
+
+from src.board import Board, Geometry
+from src.session_registry import SessionRegistry, deep_sizeof
+
+
+class Clock:
+    """A clock that only moves when told to"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class SessionRegistryTestSuite(unittest.TestCase):
+    def setUp(self):
+        self.ended = []
+
+    async def on_evict(self, key, session):
+        self.ended.append((key, session))
+
+    def test_works_like_a_dict(self):
+        """1. Sessions are added, read, checked and removed like in a dict"""
+        sessions = SessionRegistry()
+        sessions[1] = "a"
+        sessions[2] = "b"
+
+        self.assertEqual(
+            (True, False, 2), (1 in sessions, 3 in sessions, len(sessions))
+        )
+        self.assertEqual(("a", None), (sessions[1], sessions.get(3)))
+        self.assertEqual([2, 1], list(sessions))
+
+        del sessions[1]
+        self.assertEqual([2], list(sessions))
+        sessions.clear()
+        self.assertEqual((0, 0), (len(sessions), sessions.evictions))
+
+    def test_idle_sessions_are_ended(self):
+        """2. Sweeping ends the sessions idle past the ttl, and reading one keeps it"""
+        clock = Clock()
+
+        async def main():
+            sessions = SessionRegistry(ttl=10, on_evict=self.on_evict, clock=clock)
+            sessions[1] = "a"
+            clock.now = 5
+            sessions[2] = "b"
+            clock.now = 9
+            sessions[1]
+
+            clock.now = 16
+            self.assertEqual(1, sessions.sweep())
+            await asyncio.sleep(0)
+            self.assertEqual([1], list(sessions))
+            return sessions
+
+        sessions = asyncio.run(main())
+        self.assertEqual([(2, "b")], self.ended)
+        self.assertEqual(1, sessions.evictions)
+
+    def test_least_recently_used_is_ended(self):
+        """3. Adding a session past max_size ends the least recently used one"""
+
+        async def main():
+            sessions = SessionRegistry(max_size=2, on_evict=self.on_evict)
+            sessions[1] = "a"
+            sessions[2] = "b"
+            sessions[1]
+            sessions[3] = "c"
+            await asyncio.sleep(0)
+            return sessions
+
+        sessions = asyncio.run(main())
+        self.assertEqual([(2, "b")], self.ended)
+        self.assertEqual([1, 3], list(sessions))
+        self.assertEqual(1, sessions.evictions)
+
+    def test_session_size(self):
+        """4. A session's size counts what it holds but not what it shares"""
+        board = Board()
+        with_geometry = deep_sizeof(board)
+        without_geometry = deep_sizeof(board, (Geometry,))
+        self.assertGreater(with_geometry, without_geometry)
+        self.assertGreater(without_geometry, sys.getsizeof(board))
+
+        loop = []
+        loop.append(loop)
+        self.assertEqual(sys.getsizeof(loop), deep_sizeof(loop))
+
+        sessions = SessionRegistry(sizeof=lambda board: deep_sizeof(board, (Geometry,)))
+        self.assertEqual(0, sessions.approximate_bytes())
+        sessions[1] = board
+        sessions[2] = Board()
+        self.assertEqual(without_geometry, sessions.approximate_bytes())
+
+    def test_failed_endings_are_logged(self):
+        """5. An on_evict that raises is logged instead of lost"""
+
+        async def on_evict(key, session):
+            raise RuntimeError("quit failed")
+
+        async def main():
+            sessions = SessionRegistry(max_size=1, on_evict=on_evict)
+            sessions[1] = "a"
+            sessions[2] = "b"
+            await asyncio.sleep(0)
+
+        with self.assertLogs("src.session_registry", "ERROR") as logs:
+            asyncio.run(main())
+
+        self.assertEqual(
+            ["ending session 1 failed"], [r.getMessage() for r in logs.records]
+        )
+        self.assertIs(RuntimeError, logs.records[0].exc_info[0])
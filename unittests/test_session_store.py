@@ -0,0 +1,177 @@
+import asyncio
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from src.session_store import GameRecord, SessionStore
+
+# the games table before games had a guild
+OLD_SCHEMA = """
+CREATE TABLE games (
+    user_id INTEGER PRIMARY KEY,
+    player_name TEXT NOT NULL,
+    channel_id INTEGER NOT NULL,
+    message_id INTEGER NOT NULL,
+    packed INTEGER NOT NULL,
+    width INTEGER NOT NULL,
+    height INTEGER NOT NULL,
+    k INTEGER NOT NULL,
+    player TEXT NOT NULL,
+    is_hard INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    loses INTEGER NOT NULL,
+    draws INTEGER NOT NULL
+)
+"""
+
+# makes every write of a game fail, like a locked database or a full disk
+FAILING_INSERTS = """
+CREATE TRIGGER fail_inserts BEFORE INSERT ON games
+BEGIN SELECT RAISE(ABORT, 'disk I/O error'); END
+"""
+
+
+def record(user_id: int, packed: int = 0, wins: int = 0) -> GameRecord:
+    return GameRecord(user_id, "player", 10, 20, packed, 3, 3, 3, "x", True, wins, 0, 0)
+
+
+class SessionStoreTestSuite(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "sessions.db")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def saved_rows(self) -> list:
+        """Reads the games table the way another process would"""
+        connection = sqlite3.connect(self.path)
+        rows = connection.execute("SELECT user_id, wins FROM games").fetchall()
+        connection.close()
+        return rows
+
+    def test_round_trip(self):
+        """1. A saved game loads back exactly"""
+        store = SessionStore(self.path)
+        store.save(record(1, packed=0b1 | 0b10 << 9))
+
+        self.assertEqual([record(1, packed=0b1 | 0b10 << 9)], store.load_all())
+        self.assertIs(True, store.load_all()[0].is_hard)
+        store.close()
+
+    def test_saves_are_written_behind(self):
+        """2. Saves wait to be written together, and only the latest save counts"""
+        store = SessionStore(self.path)
+        for wins in range(5):
+            store.save(record(1, wins=wins))
+        store.save(record(2))
+
+        self.assertEqual([], self.saved_rows())
+        self.assertEqual(2, store.pending)
+
+        store.flush()
+        self.assertEqual([(1, 4), (2, 0)], sorted(self.saved_rows()))
+        self.assertEqual((0, 1), (store.pending, store.writes))
+        store.close()
+
+    def test_batches_and_deletes(self):
+        """3. A full batch is written at once and deleted games are removed"""
+        store = SessionStore(self.path, batch_size=2)
+        store.save(record(1))
+        self.assertEqual([], self.saved_rows())
+        store.save(record(2))
+        self.assertEqual([(1, 0), (2, 0)], sorted(self.saved_rows()))
+
+        store.delete(1)
+        store.flush()
+        self.assertEqual([(2, 0)], self.saved_rows())
+        store.close()
+
+    def test_games_survive_restart(self):
+        """4. The games waiting to be written when the store closes are there when it opens"""
+        store = SessionStore(self.path)
+        store.save(record(7, wins=3))
+        store.close()
+
+        store = SessionStore(self.path)
+        self.assertEqual([record(7, wins=3)], store.load_all())
+        store.close()
+
+    def test_old_databases_are_migrated(self):
+        """5. A database saved before games were keyed by guild keeps its games"""
+        connection = sqlite3.connect(self.path)
+        connection.execute(OLD_SCHEMA)
+        connection.execute(
+            "INSERT INTO games VALUES (1, 'p', 1, 2, 0, 3, 3, 3, 'x', 0, 0, 0, 0)"
+        )
+        connection.commit()
+        connection.close()
+
+        store = SessionStore(self.path)
+        self.assertEqual(
+            [GameRecord(1, "p", 1, 2, 0, 3, 3, 3, "x", False, 0, 0, 0)],
+            store.load_all(),
+        )
+        store.save(record(1)._replace(guild_id=5 << 22))
+        self.assertEqual([None, 5 << 22], [game.guild_id for game in store.load_all()])
+
+        store.delete(1)
+        self.assertEqual([record(1)._replace(guild_id=5 << 22)], store.load_all())
+        store.close()
+
+    def test_run_writes_off_the_loop(self):
+        """6. run writes a full batch right away, from a worker thread"""
+        store = SessionStore(self.path, flush_interval=60, batch_size=2)
+
+        async def main():
+            runner = asyncio.create_task(store.run())
+            await asyncio.sleep(0)
+            store.save(record(1))
+            store.save(record(2))
+            self.assertEqual([], self.saved_rows())
+
+            for _ in range(100):
+                if store.writes:
+                    break
+                await asyncio.sleep(0.01)
+            runner.cancel()
+
+        asyncio.run(main())
+        self.assertEqual([(1, 0), (2, 0)], sorted(self.saved_rows()))
+        store.close()
+
+    def test_failed_writes_are_kept(self):
+        """7. A batch that fails to write is written by the next flush, behind
+        newer saves, and run logs the failure and keeps going"""
+        store = SessionStore(self.path, flush_interval=0.01)
+        other = sqlite3.connect(self.path)
+        other.execute(FAILING_INSERTS)
+        other.commit()
+
+        store.save(record(1))
+        store.save(record(2))
+        with self.assertRaises(sqlite3.DatabaseError):
+            store.flush()
+        self.assertEqual(2, store.pending)
+
+        store.save(record(1, wins=3))
+
+        async def main():
+            runner = asyncio.create_task(store.run())
+            while not logs.records:
+                await asyncio.sleep(0.01)
+
+            other.execute("DROP TRIGGER fail_inserts")
+            other.commit()
+            while store.pending:
+                await asyncio.sleep(0.01)
+            runner.cancel()
+
+        with self.assertLogs("src.session_store", "ERROR") as logs:
+            asyncio.run(main())
+
+        self.assertEqual("writing the saved games failed", logs.records[0].getMessage())
+        self.assertEqual([(1, 3), (2, 0)], sorted(self.saved_rows()))
+        other.close()
+        store.close()
@@ -0,0 +1,208 @@
+import os
+import random
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from src.session_store import GameRecord, SessionStore
+from src.sharding import ShardPlan, launch, shard_for
+
+
+class FakeGateway:
+    """Stands in for discord's gateway: every process connects the shards
+    it made its bot with, and every event goes to shard
+    (guild_id >> 22) % shard_count, or shard 0 for direct messages"""
+
+    def __init__(self, test: unittest.TestCase, shard_count: int):
+        self.test = test
+        self.shard_count = shard_count
+        self.connections = {}
+
+    def connect(self, bot_options: dict, process: dict):
+        self.test.assertEqual(self.shard_count, bot_options.get("shard_count", 1))
+        for shard_id in bot_options.get("shard_ids", [0]):
+            self.test.assertNotIn(shard_id, self.connections, "shard connected twice")
+            self.connections[shard_id] = process
+
+    def dispatch(self, guild_id, user_id: int):
+        shard_id = 0 if guild_id is None else (guild_id >> 22) % self.shard_count
+        self.connections[shard_id][user_id] = guild_id
+
+
+class FakePopen:
+    """Records the processes launch starts instead of starting them"""
+
+    def __init__(self, exit_codes: list):
+        self.exit_codes = exit_codes
+        self.started = []
+
+    def __call__(self, args: list, env: dict):
+        process = mock.Mock(args=args, env=env)
+        process.wait.return_value = self.exit_codes[len(self.started)]
+        self.started.append(process)
+        return process
+
+
+def guild_id(rng: random.Random) -> int:
+    """Makes up a snowflake like discord's guild ids, which fit in 63 bits"""
+    return rng.getrandbits(41) << 22 | rng.getrandbits(22)
+
+
+class ShardingTestSuite(unittest.TestCase):
+    def test_shard_for(self):
+        """1. Guilds go to discord's shard for them and direct messages to shard 0"""
+        self.assertEqual(
+            (81384788765712384 >> 22) % 16, shard_for(81384788765712384, 16)
+        )
+        self.assertEqual(1, shard_for(5 << 22, 4))
+        self.assertEqual(0, shard_for(None, 4))
+
+    def test_every_shard_runs_once(self):
+        """2. The processes split the shards between them with none left over"""
+        for process_count, shard_count in [(1, 1), (2, 4), (3, 7)]:
+            plans = [
+                ShardPlan(index, process_count, shard_count)
+                for index in range(process_count)
+            ]
+            shard_ids = [shard_id for plan in plans for shard_id in plan.shard_ids]
+            sizes = [len(plan.shard_ids) for plan in plans]
+
+            self.assertEqual(list(range(shard_count)), shard_ids)
+            self.assertLessEqual(max(sizes) - min(sizes), 1)
+
+    def test_launched_processes_partition_games(self):
+        """3. The processes launch starts make bots whose shards get every
+        game, and each restores only the games the gateway sent it"""
+        popen = FakePopen([0, 0, 0])
+        with mock.patch("src.sharding.subprocess.Popen", popen):
+            self.assertEqual(0, launch(["bot.py"], 3, 6))
+        self.assertEqual(
+            [[sys.executable, "bot.py"]] * 3,
+            [process.args for process in popen.started],
+        )
+        plans = [ShardPlan.from_env(process.env) for process in popen.started]
+        self.assertEqual([9090, 9091, 9092], [plan.port(9090) for plan in plans])
+        self.assertEqual(0, plans[0].port(0))
+
+        rng = random.Random(0)
+        gateway = FakeGateway(self, 6)
+        processes = [{} for _ in plans]
+        for plan, process in zip(plans, processes):
+            gateway.connect(plan.bot_options(), process)
+
+        guilds = [guild_id(rng) for _ in range(50)] + [None]
+        for user_id in range(3000):
+            gateway.dispatch(rng.choice(guilds), user_id)
+        self.assertEqual(3000, sum(map(len, processes)))
+        self.assertTrue(all(processes))
+
+        # every process saves the games it was sent, then they all restart
+        with tempfile.TemporaryDirectory() as directory:
+            store = SessionStore(
+                os.path.join(directory, "sessions.db"), batch_size=5000
+            )
+            for process in processes:
+                for user_id, guild in process.items():
+                    store.save(
+                        GameRecord(
+                            user_id, "p", 1, 2, 0, 3, 3, 3, "x", False, 0, 0, 0, guild
+                        )
+                    )
+            for plan, process in zip(plans, processes):
+                restored = {
+                    record.user_id: record.guild_id
+                    for record in store.load_all(plan.owns)
+                }
+                self.assertEqual(process, restored)
+            store.close()
+
+    def test_launch_exit_code(self):
+        """4. launch gives the first process's error, and one process isn't sharded"""
+        popen = FakePopen([0, 3, 4])
+        with mock.patch("src.sharding.subprocess.Popen", popen):
+            self.assertEqual(3, launch(["bot.py"], 3, 3))
+        self.assertEqual(
+            ["0", "1", "2"], [process.env["PROCESS_INDEX"] for process in popen.started]
+        )
+        self.assertEqual({}, ShardPlan.from_env({}).bot_options())
+
+    def test_restore_only_own_games(self):
+        """5. Processes sharing a database each restore only their guilds' games"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "sessions.db")
+            plans = [ShardPlan(index, 2, 4) for index in range(2)]
+            guilds = [shard << 22 for shard in range(4)] + [None]
+
+            store = SessionStore(path)
+            for user_id, guild in enumerate(guilds):
+                store.save(
+                    GameRecord(
+                        user_id, "p", 1, 2, 0, 3, 3, 3, "x", False, 0, 0, 0, guild
+                    )
+                )
+            store.close()
+
+            stores = [SessionStore(path) for _ in plans]
+            restored = [
+                [record.guild_id for record in store.load_all(plan.owns)]
+                for plan, store in zip(plans, stores)
+            ]
+            for store in stores:
+                store.close()
+
+        self.assertEqual([[0 << 22, 1 << 22, None], [2 << 22, 3 << 22]], restored)
+
+    def test_plan_from_env(self):
+        """6. The plan is read from the environment and must give every process a shard"""
+        self.assertEqual(ShardPlan(0, 1, 1), ShardPlan.from_env({}))
+        plan = ShardPlan.from_env(
+            {"PROCESS_INDEX": "1", "PROCESS_COUNT": "2", "SHARD_COUNT": "8"}
+        )
+        self.assertEqual((4, 5, 6, 7), plan.shard_ids)
+
+        for env in [
+            {"PROCESS_COUNT": "3", "SHARD_COUNT": "2"},
+            {"PROCESS_INDEX": "2", "PROCESS_COUNT": "2"},
+        ]:
+            self.assertRaises(ValueError, ShardPlan.from_env, env)
+
+    def test_processes_keep_their_own_games(self):
+        """7. A user playing in guilds on two processes has a game saved in each"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "sessions.db")
+            plans = [ShardPlan(index, 2, 4) for index in range(2)]
+            stores = [SessionStore(path) for _ in plans]
+            gateway = FakeGateway(self, 4)
+            processes = [{} for _ in plans]
+            for plan, process in zip(plans, processes):
+                gateway.connect(plan.bot_options(), process)
+
+            # the same user plays in guilds on shard 0 and shard 3
+            for guild in (0 << 22, 3 << 22):
+                gateway.dispatch(guild, 7)
+            for store, process in zip(stores, processes):
+                for user_id, guild in process.items():
+                    store.save(
+                        GameRecord(
+                            user_id, "p", 1, 2, 0, 3, 3, 3, "x", False, 0, 0, 0, guild
+                        )
+                    )
+                store.flush()
+
+            # a later save and a delete in one process leave the other's game alone
+            first, second = stores
+            saved = first.load_all(plans[0].owns)[0]
+            first.save(saved._replace(wins=1))
+            first.flush()
+            self.assertEqual(0, second.load_all(plans[1].owns)[0].wins)
+
+            first.delete(7, 0 << 22)
+            first.flush()
+            self.assertEqual([], first.load_all(plans[0].owns))
+            self.assertEqual(
+                [3 << 22], [game.guild_id for game in second.load_all(plans[1].owns)]
+            )
+
+            for store in stores:
+                store.close()
@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+from math import inf
+
+from src.ai import minimax
+from src.board import Board, GAME_STATE
+from src.solution import DEFAULT_PATH, SolutionTable, generate, load_solutions
+from src.transposition import TranspositionTable
+
+
+class SolutionTestSuite(unittest.TestCase):
+    def setUp(self):
+        self.solutions = SolutionTable()
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "solutions.bin")
+
+    def tearDown(self):
+        self.solutions.close()
+        self.directory.cleanup()
+
+    def reachable_positions(self, board: Board, seen: set):
+        """Plays every game and yields each position still being played once"""
+        key = (board.x_bits, board.o_bits)
+        if key in seen or board.state == GAME_STATE.GAME_OVER:
+            return
+        seen.add(key)
+        yield board
+
+        for move in board.available_positions():
+            board.play(*move)
+            yield from self.reachable_positions(board, seen)
+            board.undo()
+
+    def test_shipped_file_is_up_to_date(self):
+        """1. The shipped solution file is exactly what the generator writes"""
+        self.assertEqual(4520, generate(self.path))
+
+        with open(self.path, "rb") as generated, open(DEFAULT_PATH, "rb") as shipped:
+            self.assertEqual(shipped.read(), generated.read())
+
+    def test_best_moves_are_optimal(self):
+        """2. Every stored value and best move matches a full search"""
+        table = TranspositionTable()
+
+        for board in self.reachable_positions(Board(), set()):
+            value, _ = self.solutions.lookup(board.x_bits, board.o_bits)
+            is_x = board.turn == "x"
+            self.assertEqual(value, minimax(board, -inf, inf, is_x, False, table))
+
+            board.play(*self.solutions.best_move(board))
+            is_x = board.turn == "x"
+            self.assertEqual(value, minimax(board, -inf, inf, is_x, False, table))
+            board.undo()
+
+    def test_finished_games_have_no_move(self):
+        """3. There is nothing to look up once the game is over"""
+        board = Board()
+        for move in [(0, 0), (1, 0), (0, 1), (1, 1), (0, 2)]:
+            board.play(*move)
+
+        self.assertIsNone(self.solutions.best_move(board))
+
+    def test_invalid_files_are_not_loaded(self):
+        """4. Missing or corrupt files are ignored"""
+        self.assertIsNone(load_solutions(self.path))
+
+        with open(self.path, "wb") as file:
+            file.write(b"not a solution file")
+        self.assertIsNone(load_solutions(self.path))
+
+
+if __name__ == "__main__":
+    unittest.main()
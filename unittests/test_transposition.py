@@ -0,0 +1,113 @@
+import random
+import sys
+import threading
+import unittest
+from math import inf
+
+from src.ai import get_best_move, minimax
+from src.board import Board
+from src.symmetry import MASK_TABLES, canonical_key
+from src.transposition import TranspositionTable
+
+
+class TranspositionTestSuite(unittest.TestCase):
+    def setUp(self):
+        self.table = TranspositionTable()
+
+    def tearDown(self):
+        del self.table
+
+    def test_symmetric_positions_share_a_key(self):
+        """1. All 8 rotations and reflections of a position have the same key"""
+        x_bits, o_bits = 0b000_010_001, 0b100_000_000
+        keys = {canonical_key(table[x_bits], table[o_bits]) for table in MASK_TABLES}
+
+        self.assertEqual({canonical_key(x_bits, o_bits)}, keys)
+        self.assertNotEqual(
+            canonical_key(x_bits, o_bits), canonical_key(o_bits, x_bits)
+        )
+
+    def test_exact_and_bound_entries(self):
+        """2. Bounds are only used when they settle the search window"""
+        self.table.store(1, 5, -inf, inf)
+        self.assertEqual(5, self.table.probe(1, 0, 1))
+
+        self.table.store(2, 7, -inf, 6)
+        self.assertEqual(7, self.table.probe(2, -inf, 6))
+        self.assertIsNone(self.table.probe(2, -inf, 10))
+
+        self.table.store(3, -4, -2, inf)
+        self.assertEqual(-4, self.table.probe(3, -2, inf))
+        self.assertIsNone(self.table.probe(3, -10, inf))
+
+        self.assertIsNone(self.table.probe(4, -inf, inf))
+
+    def test_size_cap_evicts_least_recently_used(self):
+        """3. A capped table drops the entry that was used the longest ago"""
+        table = TranspositionTable(max_size=2)
+        table.store(1, 0, -inf, inf)
+        table.store(2, 0, -inf, inf)
+        table.probe(1, -inf, inf)
+        table.store(3, 0, -inf, inf)
+
+        self.assertEqual(2, len(table))
+        self.assertIn(1, table)
+        self.assertIn(3, table)
+        self.assertNotIn(2, table)
+
+    def test_table_does_not_change_scores(self):
+        """4. Searching with a table gives the same scores as without one"""
+        board = Board()
+        board.play(0, 0)
+        board.play(1, 1)
+
+        for move in board.available_positions():
+            board.play(*move)
+            expected = minimax(board, -inf, inf, board.turn == "x", False)
+            self.assertEqual(
+                expected,
+                minimax(board, -inf, inf, board.turn == "x", False, self.table),
+            )
+            board.undo()
+
+        self.assertIn(
+            get_best_move(board, True, self.table), board.available_positions()
+        )
+        self.assertGreater(len(self.table), 0)
+
+    def test_threads_can_share_a_capped_table(self):
+        """5. Threads probing and storing in one capped table never see a
+        key another thread evicted"""
+        table = TranspositionTable(max_size=100)
+        errors = []
+
+        def search(seed):
+            rng = random.Random(seed)
+            try:
+                for _ in range(50000):
+                    key = rng.randrange(300)
+                    if table.probe(key, -inf, inf) is None:
+                        table.store(key, 0, -inf, inf)
+            except Exception as error:
+                errors.append(error)
+
+        interval = sys.getswitchinterval()
+        # switch threads as often as possible, to land between two steps
+        sys.setswitchinterval(1e-6)
+        try:
+            threads = [
+                threading.Thread(target=search, args=(seed,)) for seed in range(8)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(interval)
+
+        self.assertEqual([], errors)
+        self.assertEqual(100, len(table))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+
+from src.board import Board, GAME_STATE
+
+try:
+    import numpy as np
+    from src.vectorized import LINE_MATRIX, O, X, classify, from_boards
+    from src.vectorized import from_packed, legal_moves
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class VectorizedTestSuite(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        boards = {}
+
+        def visit(board):
+            key = board.pack()
+            if key in boards:
+                return
+            boards[key] = Board.from_packed(key)
+
+            if board.state == GAME_STATE.PLAYING:
+                for move in board.available_positions():
+                    board.play(*move)
+                    visit(board)
+                    board.undo()
+
+        visit(Board())
+        cls.reachable_boards = list(boards.values())
+
+    def test_line_matrix_covers_every_line(self):
+        """1. The line matrix has a row of three ones for each of the 8 lines"""
+        self.assertEqual((8, 9), LINE_MATRIX.shape)
+        self.assertTrue((LINE_MATRIX.sum(axis=1) == 3).all())
+        self.assertEqual([3, 2, 3, 2, 4, 2, 3, 2, 3], LINE_MATRIX.sum(axis=0).tolist())
+
+    def test_classify_matches_check_state(self):
+        """2. Every reachable position gets the winner and state check_state gives"""
+        positions = from_boards(self.reachable_boards)
+        winners, states = classify(positions)
+        moves = legal_moves(positions)
+
+        self.assertEqual(5478, len(self.reachable_boards))
+        for board, winner, state, legal in zip(
+            self.reachable_boards, winners, states, moves
+        ):
+            board.check_state()
+            self.assertEqual({"x": X, "o": O, None: 0}[board.winner], winner)
+            self.assertEqual(board.state.value, state)
+
+            expected = [False] * 9
+            if board.state == GAME_STATE.PLAYING:
+                for file, rank in board.available_positions():
+                    expected[file + rank * 3] = True
+            self.assertEqual(expected, legal.tolist())
+
+    def test_packed_positions_and_bigger_boards(self):
+        """3. Packed positions and other board sizes classify the same way"""
+        packed = [board.pack() for board in self.reachable_boards]
+        self.assertTrue(
+            (from_packed(packed) == from_boards(self.reachable_boards)).all()
+        )
+
+        board = Board(5, 5, 4)
+        for move in [(0, 0), (0, 1), (1, 0), (1, 1), (2, 0), (2, 1), (3, 0)]:
+            board.play(*move)
+        winners, states = classify(from_packed([board.pack()], 25), 5, 5, 4)
+        self.assertEqual((X, GAME_STATE.GAME_OVER.value), (winners[0], states[0]))
+
+        self.assertRaises(ValueError, from_packed, [0], 49)
+
+
+if __name__ == "__main__":
+    unittest.main()